@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks of reading, normalizing, projecting, and encoding synthetic images at
+production scale. Run with asv, see asv.conf.json.
+"""
+
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import dask
+
+from . import synthetic
+
+###############################################################################
+
+# The Dask schedulers benchmarked: local (single threaded), threaded, and process
+SCHEDULERS = ["synchronous", "threads", "processes"]
+
+###############################################################################
+
+
+@contextmanager
+def use_scheduler(scheduler: str) -> Iterator[None]:
+    with dask.config.set(scheduler=scheduler):
+        yield
+
+
+class SyntheticBenchmark:
+    """
+    Base of every benchmark of a synthetic image. Writes the image spec to a temporary
+    directory and runs the benchmark with the requested Dask scheduler.
+    """
+
+    params = (list(synthetic.SIZES), SCHEDULERS)
+    param_names = ["size", "scheduler"]
+
+    def setup(self, size: str, scheduler: str = "synchronous"):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.img = synthetic.write_synthetic_file(
+            self.tmpdir / f"{size}", synthetic.SIZES[size]
+        )
+
+        self._stack = ExitStack()
+        self._stack.enter_context(use_scheduler(scheduler))
+
+    def teardown(self, size: str, scheduler: str = "synchronous"):
+        self._stack.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import shutil
+import tempfile
+from itertools import product
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from timelapse_tools import generate_movies
+from timelapse_tools.utils.instrumentation import record_run
+
+from . import SCHEDULERS, synthetic, use_scheduler
+from .synthetic import SyntheticCziFile
+
+###############################################################################
+
+# The projections of the movies generated
+PROJECTIONS = {"single": None, "multi": ["max", "mean", "argmax"]}
+
+###############################################################################
+
+
+def _generate(size: str, scheduler: str, projections: Optional[List[str]], queue: Any):
+    # Generate a single scene and channel movie and send back its run report
+    tmpdir = Path(tempfile.mkdtemp())
+    try:
+        img = synthetic.write_synthetic_file(tmpdir / size, synthetic.SIZES[size])
+        kwargs = {} if projections is None else {"projections": projections}
+        with use_scheduler(scheduler), record_run() as recorder:
+            generate_movies(
+                img,
+                save_path=tmpdir / "movies",
+                overwrite=True,
+                S=0,
+                C=0,
+                reader=SyntheticCziFile,
+                **kwargs,
+            )
+
+        queue.put(recorder.report())
+    except Exception as e:
+        # Send back the error rather than leave the benchmark waiting on a report
+        queue.put(e)
+        raise
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _run_report(
+    size: str, scheduler: str, projections: Optional[List[str]]
+) -> Dict[str, Any]:
+    # Run in a fresh process so the peak memory of the report is of this run alone
+    context = get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_generate, args=(size, scheduler, projections, queue)
+    )
+    process.start()
+    report = queue.get()
+    process.join()
+    if isinstance(report, Exception):
+        raise report
+
+    return report
+
+
+class GenerateMovies:
+    """
+    End to end generation of a single scene and channel movie, including reading,
+    normalizing, projecting, and encoding every frame.
+
+    Every movie is generated once, in setup_cache, and every tracked value is taken
+    from the run report of that generation.
+    """
+
+    params = (list(synthetic.SIZES), SCHEDULERS, list(PROJECTIONS))
+    param_names = ["size", "scheduler", "projections"]
+
+    def setup_cache(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{size}-{scheduler}-{projections}": _run_report(
+                size, scheduler, PROJECTIONS[projections]
+            )
+            for size, scheduler, projections in product(*self.params)
+        }
+
+    setup_cache.timeout = 4 * 3600
+
+    def track_wall_seconds(self, reports, size, scheduler, projections):
+        return reports[f"{size}-{scheduler}-{projections}"]["wall_seconds"]
+
+    track_wall_seconds.unit = "seconds"
+
+    def track_peak_memory(self, reports, size, scheduler, projections):
+        return reports[f"{size}-{scheduler}-{projections}"]["process_peak_memory_bytes"]
+
+    track_peak_memory.unit = "bytes"
+
+    def track_movies_per_hour(self, reports, size, scheduler, projections):
+        return 3600 / reports[f"{size}-{scheduler}-{projections}"]["wall_seconds"]
+
+    track_movies_per_hour.unit = "movies/hour"
+
+    def track_frames_per_second(self, reports, size, scheduler, projections):
+        return reports[f"{size}-{scheduler}-{projections}"]["frames_per_second"]
+
+    track_frames_per_second.unit = "frames/second"
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask
+
+from timelapse_tools import daread
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    percentile_norm_by,
+    single_channel_percentile_norm,
+)
+from timelapse_tools.projection.multi_projection import multi_project
+from timelapse_tools.projection.single_channel_max_project import (
+    single_channel_max_project,
+)
+
+from . import SyntheticBenchmark
+from .synthetic import SyntheticCziFile
+
+###############################################################################
+
+
+class _MovieData(SyntheticBenchmark):
+    timeout = 1800
+
+    def setup(self, size, scheduler):
+        super().setup(size, scheduler)
+
+        # The TZYX data of a single scene and channel movie
+        data, dims = daread(self.img, reader=SyntheticCziFile)
+        self.data = data[0, 0, :, 0]
+
+
+class PercentileNorm(_MovieData):
+    params = (_MovieData.params[0], _MovieData.params[1], ["histogram", "dask"])
+    param_names = ["size", "scheduler", "method"]
+
+    def setup(self, size, scheduler, method):
+        super().setup(size, scheduler)
+
+    def teardown(self, size, scheduler, method):
+        super().teardown(size, scheduler)
+
+    def time_percentile_norm_by(self, size, scheduler, method):
+        percentile_norm_by(self.data, method=method).compute()
+
+    def time_sampled_percentile_norm_by(self, size, scheduler, method):
+        percentile_norm_by(self.data, method=method, sample_planes=64).compute()
+
+
+class FrameLatency(_MovieData):
+    def setup(self, size, scheduler):
+        super().setup(size, scheduler)
+        self.norm_by = percentile_norm_by(self.data).compute()
+
+    def _frame(self, t):
+        # Normalize and project a single timepoint, as generate_movies does for every
+        # frame of a movie
+        normed = single_channel_percentile_norm(data=self.data[t], norm_by=self.norm_by)
+        return single_channel_max_project(data=normed, dims="ZYX")
+
+    def time_frame(self, size, scheduler):
+        self._frame(0).compute()
+
+    def time_frame_batch(self, size, scheduler):
+        dask.compute(*[self._frame(t) for t in range(min(8, self.data.shape[0]))])
+
+
+class MultiProjection(_MovieData):
+    def time_multi_project_frame(self, size, scheduler):
+        projections = multi_project(
+            self.data[0], "ZYX", projections=["max", "mean", "std", "argmax"]
+        )
+        dask.compute(*projections.values())
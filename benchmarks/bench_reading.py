@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from timelapse_tools import daread
+
+from . import SyntheticBenchmark, synthetic
+from .synthetic import SyntheticCziFile
+
+###############################################################################
+
+
+class DareadGraph(SyntheticBenchmark):
+    # Graph construction doesn't depend on the scheduler
+    params = list(synthetic.SIZES)
+    param_names = ["size"]
+
+    def time_graph_build(self, size):
+        daread(self.img, reader=SyntheticCziFile)
+
+    def time_graph_build_z_chunks(self, size):
+        daread(self.img, reader=SyntheticCziFile, chunks={"Z": -1})
+
+    def time_graph_build_downsampled(self, size):
+        daread(self.img, reader=SyntheticCziFile, roi=(0, 0, 64, 64), scale_factor=4)
+
+
+class DareadCompute(SyntheticBenchmark):
+    timeout = 600
+
+    def setup(self, size, scheduler):
+        super().setup(size, scheduler)
+
+        # The Z stack of the first timepoint of a single scene and channel
+        data, dims = daread(self.img, reader=SyntheticCziFile, chunks={"Z": -1})
+        self.timepoint = data[0, 0, 0, 0]
+
+    def time_read_timepoint(self, size, scheduler):
+        self.timepoint.compute()
+
+    def peakmem_read_timepoint(self, size, scheduler):
+        self.timepoint.compute()
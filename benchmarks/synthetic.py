@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+###############################################################################
+
+# Suffix of synthetic image spec files
+SYNTHETIC_SUFFIX = ".synth"
+
+# Dimension sizes of the synthetic images benchmarked, Y and X last
+SIZES = {
+    # A quick sanity check size
+    "small": {"B": 1, "S": 1, "T": 8, "C": 1, "Z": 4, "Y": 128, "X": 128},
+    # A typical multi scene, multi channel timelapse acquisition
+    "production": {"B": 1, "S": 2, "T": 200, "C": 2, "Z": 32, "Y": 512, "X": 512},
+}
+
+###############################################################################
+
+
+class BBox:
+    def __init__(self, x: int, y: int, w: int, h: int):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+
+class SyntheticCziFile:
+    """
+    A stand in for aicspylibczi.CziFile that generates planes rather than decoding
+    them, implementing the parts of the CziFile interface used by daread.
+
+    Every plane is a fixed random plane offset by the plane's index, so planes differ
+    from each other but cost little more than a copy to produce.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        Path to a JSON spec written by write_synthetic_file.
+    """
+
+    def __init__(self, img: Union[str, Path]):
+        with open(img, "r") as read_in:
+            spec = json.load(read_in)
+
+        self.dims = spec["dims"]
+        self.size = tuple(spec["shape"])
+        self.dtype = np.dtype(spec["dtype"])
+        self.pixel_type = {np.dtype(np.uint8): "Gray8", np.dtype(np.uint16): "Gray16"}[
+            self.dtype
+        ]
+
+        # The plane every generated plane is offset from
+        rng = np.random.RandomState(spec["seed"])
+        self._plane = rng.randint(0, 200, self.size[-2:]).astype(self.dtype)
+
+    def is_mosaic(self) -> bool:
+        return False
+
+    def dims_shape(self) -> Dict[str, Tuple[int, int]]:
+        return {dim: (0, size) for dim, size in zip(self.dims[:-2], self.size[:-2])}
+
+    def get_tile_bounding_box(self, **read_dims) -> BBox:
+        return BBox(0, 0, self.size[-1], self.size[-2])
+
+    def read_image(self, **read_dims) -> Tuple[np.ndarray, List[Tuple[str, int]]]:
+        # Read the full range of every dimension not provided
+        ranges = [
+            (read_dims[dim], read_dims[dim] + 1) if dim in read_dims else (0, size)
+            for dim, size in zip(self.dims[:-2], self.size[:-2])
+        ]
+        shape = tuple(end - begin for begin, end in ranges)
+        data = np.empty(shape + self.size[-2:], dtype=self.dtype)
+
+        # Offset the plane by the flat index of each plane read
+        plane_indices = np.ravel_multi_index(
+            np.meshgrid(*(np.arange(*r) for r in ranges), indexing="ij"),
+            self.size[:-2],
+        )
+        for location, plane_index in np.ndenumerate(plane_indices):
+            np.add(self._plane, self.dtype.type(plane_index % 50), out=data[location])
+
+        return data, list(zip(self.dims, shape + self.size[-2:]))
+
+
+def write_synthetic_file(
+    path: Union[str, Path],
+    sizes: Dict[str, int],
+    dtype: str = "uint16",
+    seed: int = 0,
+) -> Path:
+    """
+    Write the spec of a synthetic image, read by passing reader=SyntheticCziFile to
+    daread.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path to write the spec to. The synthetic suffix is added if missing.
+    sizes: Dict[str, int]
+        The size of every dimension, in order, with Y and X last. See SIZES.
+    dtype: str
+        The pixel type, "uint8" or "uint16".
+        Default: "uint16"
+    seed: int
+        The seed of the generated planes.
+        Default: 0
+
+    Returns
+    -------
+    path: Path
+        The path to the written spec.
+    """
+    path = Path(path).with_suffix(SYNTHETIC_SUFFIX)
+    with open(path, "w") as write_out:
+        json.dump(
+            {
+                "dims": "".join(sizes),
+                "shape": list(sizes.values()),
+                "dtype": dtype,
+                "seed": seed,
+            },
+            write_out,
+        )
+
+    return path
@@ -50,6 +50,15 @@ distributed_requirements = [
     "bokeh<=1.4.0",
 ]
 
+zarr_requirements = [
+    "zarr>=2.3.2,<3",
+]
+
+benchmark_requirements = [
+    "asv>=0.4.1",
+    "virtualenv",
+]
+
 requirements = [
     "aicspylibczi==2.2.0",
     "dask==2.9.0",
@@ -70,6 +79,8 @@ extra_requirements = {
     "dev": dev_requirements,
     "interactive": interactive_requirements,
     "distributed": distributed_requirements,
+    "zarr": zarr_requirements,
+    "benchmark": benchmark_requirements,
     "all": [
         *requirements,
         *test_requirements,
@@ -77,6 +88,8 @@ extra_requirements = {
         *dev_requirements,
         *interactive_requirements,
         *distributed_requirements,
+        *zarr_requirements,
+        *benchmark_requirements,
     ],
 }
 
@@ -100,7 +113,9 @@ setup(
     include_package_data=True,
     keywords="timelapse_tools",
     name="timelapse_tools",
-    packages=find_packages(exclude=["tests", "*.tests", "*.tests.*"]),
+    packages=find_packages(
+        exclude=["tests", "*.tests", "*.tests.*", "benchmarks", "benchmarks.*"]
+    ),
     python_requires=">=3.6",
     setup_requires=setup_requirements,
     test_suite="timelapse_tools/tests",
@@ -9,8 +9,9 @@ __email__ = "jacksonb@alleninstitute.org, cdavew@alleninstitute.org"
 __version__ = "0.1.0"
 
 
-from .conversion import generate_movies  # noqa: F401
+from .conversion import generate_movies, generate_movies_batch  # noqa: F401
 from .utils import daread  # noqa: F401
+from .zarr_conversion import convert_to_zarr  # noqa: F401
 
 
 def get_module_version():
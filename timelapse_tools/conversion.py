@@ -1,20 +1,38 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import inspect
 import logging
-from itertools import product
+import os
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import dask
 import dask.array as da
-import imageio
 import numpy as np
-from prefect import Flow, task, unmapped
+import pandas as pd
+from prefect import Flow, Task, task, unmapped
 
 from .constants import AVAILABLE_OPERATING_DIMENSIONS, Dimensions
+from .exceptions import ConflictingArgumentsError
+from .monotone import can_project_first, finalize_normalization_fit
+from .monotone import get_normalization_fit
 from .normalization.single_channel_percentile_norm import single_channel_percentile_norm
+from .projection.composite import composite, get_channel_colors
+from .projection.montage import downsample, montage
+from .projection.multi_projection import DISPLAY_READY_PROJECTIONS, multi_project
+from .projection.orthoview_max_project import orthoview_max_project
+from .projection.pyramid import get_pyramid_method
 from .projection.single_channel_max_project import single_channel_max_project
-from .utils.czi_reading import daread
+from .utils import czi_metadata, instrumentation, manifest
+from .utils.czi_reading import daread, get_czi_file
+from .utils.frame_cache import FrameCache
+from .utils.instrumentation import Stages, timer
+from .utils.movie_writing import clean_partial_files, get_writer_kwargs, pad_frame
+from .utils.movie_writing import partial_file, write_movies
+from .utils.movie_writing import write_segmented_frame_streams
+from .utils.selection import generate_getitem_indicies, generate_selected_dims_list
+from .utils.selection import get_output_file, select_dimension
 
 ###############################################################################
 
@@ -29,7 +47,10 @@ ImageDetails = Tuple[da.core.Array, str]
 
 @task
 def _get_save_path(
-    save_path: Optional[Union[str, Path, None]], overwrite: bool, fname: str
+    save_path: Optional[Union[str, Path, None]],
+    overwrite: bool,
+    fname: str,
+    resume: bool = False,
 ) -> Path:
     # If save_path was provided just double check it is valid
     if save_path is not None:
@@ -40,20 +61,39 @@ def _get_save_path(
         save_path = Path(fname).expanduser().resolve()
 
     # Check that no directory or file exists at this location
-    if save_path.exists() and not overwrite:
+    # Resuming only needs the location to be a directory of previous outputs
+    if resume and save_path.is_file():
+        raise FileExistsError(
+            f"The save path provided points to an existing file and can't be resumed. "
+            f"Provided: {save_path}"
+        )
+    if save_path.exists() and not overwrite and not resume:
         raise FileExistsError(
             f"The save path provided already points to an existing resource and "
-            f"overwrite wasn't specified. "
+            f"neither overwrite nor resume were specified. "
             f"Provided: {save_path}"
         )
 
+    # Remove movies left partially written by any previous interrupted run
+    if save_path.is_dir():
+        clean_partial_files(save_path)
+
     return save_path
 
 
 @task
-def _img_prep(img: Union[str, Path], operating_dim: str) -> ImageDetails:
+def _img_prep(
+    img: Union[str, Path],
+    operating_dim: str,
+    chunks: Optional[Dict[str, int]] = None,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    scale_factor: int = 1,
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> ImageDetails:
     # Convert to dask.array
-    img, dims = daread(img)
+    img, dims = daread(
+        img, chunks=chunks, roi=roi, scale_factor=scale_factor, reader=reader
+    )
 
     # Get valid operating dimensions for this image by using set intersection
     valid_op_dims = set([d for d in dims]) & AVAILABLE_OPERATING_DIMENSIONS
@@ -76,40 +116,12 @@ def _select_dimension(
     dim_name: str,
     dim_indicies_selected: Optional[Union[int, slice]] = None,
 ) -> ImageDetails:
-    # Select which dimensions to process
-    if dim_name in dims:
-        # If specific dimension indicies were provided select them
-        if dim_indicies_selected is not None:
-            if not isinstance(dim_indicies_selected, (int, slice)):
-                raise TypeError(
-                    f"{dim_name} selection may only be done by providing either an "
-                    f"integer or slice. Received: {type(dim_indicies_selected)}."
-                )
-
-            # Generate operations required to select the data
-            ops = []
-            for dim in dims:
-                if dim is dim_name:
-                    ops.append(dim_indicies_selected)
-                else:
-                    ops.append(slice(None, None, None))
-
-            # Select the specified data
-            img = img[tuple(ops)]
-
-            # Remove the dimension from the dims if a specific integer was requested
-            if isinstance(dim_indicies_selected, int):
-                dims = dims.replace(dim_name, "")
-
-    # Dimension not present dims
-    else:
-        if dim_indicies_selected is not None:
-            log.warn(
-                f"Ignoring the specified {dim_name} dimension(s) "
-                f"({dim_indicies_selected}) as it was not found in the file."
-            )
-
-    return img, dims
+    return select_dimension(
+        img=img,
+        dims=dims,
+        dim_name=dim_name,
+        dim_indicies_selected=dim_indicies_selected,
+    )
 
 
 @task
@@ -119,61 +131,14 @@ def _get_image_shape(img: da.core.Array) -> Tuple[int]:
 
 @task
 def _generate_getitem_indicies(
-    img_shape: tuple, dims: str
+    img_shape: tuple, dims: str, split_channels: bool = True, split_scenes: bool = True
 ) -> List[Tuple[Union[int, slice]]]:
-    getitem_indicies = []
-
-    # Generate getitem ops to process for each scene x channel pair
-    if Dimensions.Scene in dims and Dimensions.Channel in dims:
-        sc_indicies = list(
-            product(
-                range(img_shape[dims.index(Dimensions.Scene)]),
-                range(img_shape[dims.index(Dimensions.Channel)]),
-            )
-        )
-        for sc_index_pair in sc_indicies:
-            this_pair_getitem_indices = []
-            for dim in dims:
-                if dim is Dimensions.Scene:
-                    this_pair_getitem_indices.append(sc_index_pair[0])
-                elif dim is Dimensions.Channel:
-                    this_pair_getitem_indices.append(sc_index_pair[1])
-                else:
-                    this_pair_getitem_indices.append(slice(None, None, None))
-
-            getitem_indicies.append(tuple(this_pair_getitem_indices))
-
-    # Generate getitem ops to process for each scene
-    elif Dimensions.Scene in dims:
-        s_indicies = list(range(img_shape[dims.index(Dimensions.Scene)]))
-        for s_index in s_indicies:
-            this_index_getitem_indices = []
-            for dim in dims:
-                if dim is Dimensions.Scene:
-                    this_index_getitem_indices.append(s_index)
-                else:
-                    this_index_getitem_indices.append(slice(None, None, None))
-
-            getitem_indicies.append(tuple(this_index_getitem_indices))
-
-    # Generate getitem ops to process for each channel
-    elif Dimensions.Channel in dims:
-        c_indicies = list(range(img_shape[dims.index(Dimensions.Channel)]))
-        for c_index in c_indicies:
-            this_index_getitem_indices = []
-            for dim in dims:
-                if dim is Dimensions.Channel:
-                    this_index_getitem_indices.append(c_index)
-                else:
-                    this_index_getitem_indices.append(slice(None, None, None))
-
-            getitem_indicies.append(tuple(this_index_getitem_indices))
-
-    # Just pass through a list of a single getitem all
-    else:
-        getitem_indicies.append(tuple([slice(None, None, None) for dim in dims]))
-
-    return getitem_indicies
+    return generate_getitem_indicies(
+        img_shape=img_shape,
+        dims=dims,
+        split_channels=split_channels,
+        split_scenes=split_scenes,
+    )
 
 
 @task
@@ -187,16 +152,469 @@ def _generate_process_list(
 def _generate_selected_dims_list(
     dims: str, getitem_indicies: List[Tuple[Union[int, slice]]]
 ) -> List[Dict[str, int]]:
-    selected_dims = []
-    for getitem_selection in getitem_indicies:
-        this_set_dims = {}
-        for i, dim in enumerate(dims):
-            if isinstance(getitem_selection[i], int):
-                this_set_dims[dim] = getitem_selection[i]
+    return generate_selected_dims_list(dims=dims, getitem_indicies=getitem_indicies)
+
+
+def _get_frame_getitem_indicies(
+    data_shape: Tuple[int], dims: str, operating_dim: str
+) -> List[Tuple[Union[int, slice]]]:
+    # Generate getitem ops for each index of the operating dim
+    frame_getitem_indicies = []
+    for i in range(data_shape[dims.index(operating_dim)]):
+        this_frame_set = []
+        for dim in dims:
+            if dim == operating_dim:
+                this_frame_set.append(i)
+            else:
+                this_frame_set.append(slice(None, None, None))
+        frame_getitem_indicies.append(tuple(this_frame_set))
+
+    return frame_getitem_indicies
+
+
+def _multi_project_frames(
+    data: da.core.Array,
+    dims: str,
+    operating_dim: str,
+    projections: List[str],
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_kwargs: Dict[str, Any],
+    single_pass: bool = True,
+    frame_cache: Optional[FrameCache] = None,
+    cache_params: Optional[Dict[str, Any]] = None,
+    pyramid_level: int = 0,
+) -> Dict[str, List[da.core.Array]]:
+    # Project every frame with every projection from the same raw data
+    projected = [
+        multi_project(
+            data=data[frame_getitem_set],
+            dims=dims.replace(operating_dim, ""),
+            projections=projections,
+            **projection_kwargs,
+        )
+        for frame_getitem_set in _get_frame_getitem_indicies(
+            data.shape, dims, operating_dim
+        )
+    ]
+    streams = {
+        projection: [frame_projections[projection] for frame_projections in projected]
+        for projection in projections
+    }
+
+    # Store every projection's raw frames together and read them back from the cache
+    if frame_cache is not None:
+        keys = {
+            projection: FrameCache.key({**cache_params, "projection": projection})
+            for projection in projections
+        }
+        cached = frame_cache.load_or_store(
+            {keys[projection]: streams[projection] for projection in projections},
+            methods={
+                keys[projection]: get_pyramid_method(projection)
+                for projection in projections
+            },
+            level=pyramid_level,
+        )
+        streams = {projection: cached[keys[projection]] for projection in projections}
+
+    # Otherwise every raw projected frame is computed up front, in the same read of
+    # the data as the normalization values, unless the values are fitted in a
+    # separate pass to hold less in memory
+    elif single_pass:
+        with timer(Stages.Compute) as measurement:
+            computed = dask.compute(
+                *[streams[projection] for projection in projections]
+            )
+            measurement.frames = sum(len(frames) for frames in computed)
+        streams = dict(zip(projections, [list(frames) for frames in computed]))
+
+    # Each projection is normalized by values computed from all of its own frames
+    to_normalize = [
+        projection
+        for projection in projections
+        if projection not in DISPLAY_READY_PROJECTIONS
+    ]
+    normed = _normalize_streams(
+        streams=[streams[projection] for projection in to_normalize],
+        normalization_func=normalization_func,
+        normalization_kwargs=normalization_kwargs,
+    )
+    streams.update(zip(to_normalize, normed))
+
+    return streams
+
+
+def _normalize_streams(
+    streams: List[List[Union[da.core.Array, np.ndarray]]],
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+) -> List[List[Union[da.core.Array, np.ndarray]]]:
+    # Compute the normalization values of every stream together so that the data
+    # is only read once
+    fit = get_normalization_fit(normalization_func)
+    if fit is not None:
+        with timer(Stages.Normalize):
+            norm_bys = dask.compute(
+                *[
+                    fit(data=da.stack(frames), **normalization_kwargs)
+                    for frames in streams
+                ]
+            )
+        norm_bys = [
+            finalize_normalization_fit(
+                normalization_func, norm_by, **normalization_kwargs
+            )
+            for norm_by in norm_bys
+        ]
+        return [
+            [
+                normalization_func(data=frame, norm_by=norm_by, **normalization_kwargs)
+                for frame in frames
+            ]
+            for frames, norm_by in zip(streams, norm_bys)
+        ]
+
+    # Otherwise normalize each stream's frames as a whole
+    normed_streams = []
+    for frames in streams:
+        normed = normalization_func(data=da.stack(frames), **normalization_kwargs)
+        normed_streams.append([normed[i] for i in range(normed.shape[0])])
+
+    return normed_streams
+
+
+def _project_frames(
+    data: da.core.Array,
+    dims: str,
+    operating_dim: str,
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    project_first: bool = False,
+    single_pass: bool = False,
+) -> List[Union[da.core.Array, np.ndarray]]:
+    # Normalize the data
+    if not project_first:
+        data = normalization_func(data=data, **normalization_kwargs)
+
+    # Project all frames
+    frames = []
+    for frame_getitem_set in _get_frame_getitem_indicies(
+        data.shape, dims, operating_dim
+    ):
+        frames.append(
+            projection_func(
+                data=data[frame_getitem_set],
+                dims=dims.replace(operating_dim, ""),
+                **projection_kwargs,
+            )
+        )
+
+    # When projecting first, the frames are raw projections that need to be
+    # normalized by values computed from the entire movie data
+    if project_first:
+        fit = get_normalization_fit(normalization_func)
+        if fit is None:
+            raise ValueError(
+                f"Projecting before normalizing requires a registered monotone "
+                f"normalization function. "
+                f"Provided normalization function: {normalization_func}"
+            )
+        norm_by = fit(data=data, **normalization_kwargs)
+
+        # Compute the normalization values and raw projections together so that the
+        # data is only read once
+        with timer(Stages.Normalize):
+            if single_pass:
+                norm_by, *frames = dask.compute(norm_by, *frames)
+            else:
+                norm_by = norm_by.compute()
+        norm_by = finalize_normalization_fit(
+            normalization_func, norm_by, **normalization_kwargs
+        )
+
+        # Normalize each projected frame
+        frames = [
+            normalization_func(data=frame, norm_by=norm_by, **normalization_kwargs)
+            for frame in frames
+        ]
+
+    return frames
+
+
+def _split_dim(
+    data: da.core.Array, dims: str, dim: str
+) -> Tuple[List[da.core.Array], str]:
+    # Select each index of a dimension, data without the dimension is a single index
+    if dim not in dims:
+        return [data], dims
 
-        selected_dims.append(this_set_dims)
+    axis = dims.index(dim)
+    return (
+        [data[(slice(None),) * axis + (i,)] for i in range(data.shape[axis])],
+        dims.replace(dim, ""),
+    )
 
-    return selected_dims
+
+def _project_frame_groups(
+    groups: List[da.core.Array],
+    dims: str,
+    operating_dim: str,
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    project_first: bool = False,
+    single_pass: bool = False,
+    frame_cache: Optional[FrameCache] = None,
+    cache_params: Optional[Dict[str, Any]] = None,
+    pyramid_level: int = 0,
+) -> List[List[Union[da.core.Array, np.ndarray]]]:
+    # Read each group's raw projected frames from the cache, only projecting the
+    # groups not cached yet
+    if frame_cache is not None:
+        frame_getitem_indicies = _get_frame_getitem_indicies(
+            groups[0].shape, dims, operating_dim
+        )
+        keys = [
+            FrameCache.key({**cache_params, "group": i}) for i in range(len(groups))
+        ]
+
+        # Fit the normalization values on the source data, as without a cache, rather
+        # than on projected frames that can include padding, when the groups are
+        # first cached
+        fit = get_normalization_fit(normalization_func)
+        fit_name = manifest.params_hash(
+            {
+                "normalization_func": normalization_func,
+                "normalization_kwargs": normalization_kwargs,
+            }
+        )
+        source_fits = {}
+        if fit is not None:
+            source_fits = {
+                key: {fit_name: fit(data=data, **normalization_kwargs)}
+                for key, data in zip(keys, groups)
+            }
+
+        cached = frame_cache.load_or_store(
+            {
+                key: [
+                    projection_func(
+                        data=data[frame_getitem_set],
+                        dims=dims.replace(operating_dim, ""),
+                        **projection_kwargs,
+                    )
+                    for frame_getitem_set in frame_getitem_indicies
+                ]
+                for key, data in zip(keys, groups)
+            },
+            methods={key: get_pyramid_method(projection_func) for key in keys},
+            level=pyramid_level,
+            values=source_fits,
+        )
+
+        # Normalize each group's frames as a whole without a fit
+        if fit is None:
+            return _normalize_streams(
+                streams=[cached[key] for key in keys],
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+            )
+
+        # Values for normalization settings not used when the groups were cached are
+        # fitted on the source data once and stored for later renders
+        norm_bys = [frame_cache.load_values(key).get(fit_name) for key in keys]
+        missing = [key for key, norm_by in zip(keys, norm_bys) if norm_by is None]
+        if len(missing) > 0:
+            with timer(Stages.Normalize):
+                fitted = dask.compute(*[source_fits[key][fit_name] for key in missing])
+            for key, norm_by in zip(missing, fitted):
+                frame_cache.store_values(key, {fit_name: norm_by})
+            fitted = dict(zip(missing, fitted))
+            norm_bys = [
+                fitted[key] if norm_by is None else norm_by
+                for key, norm_by in zip(keys, norm_bys)
+            ]
+        norm_bys = [
+            finalize_normalization_fit(
+                normalization_func, np.asarray(norm_by), **normalization_kwargs
+            )
+            for norm_by in norm_bys
+        ]
+
+        # Normalize each group's cached frames
+        return [
+            [
+                normalization_func(data=frame, norm_by=norm_by, **normalization_kwargs)
+                for frame in cached[key]
+            ]
+            for key, norm_by in zip(keys, norm_bys)
+        ]
+
+    # Normalize each group's data as a whole then project
+    if not project_first:
+        return [
+            _project_frames(
+                data=data,
+                dims=dims,
+                operating_dim=operating_dim,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_func=projection_func,
+                projection_kwargs=projection_kwargs,
+            )
+            for data in groups
+        ]
+
+    # Project the raw data of every group and compute every group's normalization
+    # values together so that each block of data is read once for all groups
+    fit = get_normalization_fit(normalization_func)
+    if fit is None:
+        raise ValueError(
+            f"Projecting before normalizing requires a registered monotone "
+            f"normalization function. "
+            f"Provided normalization function: {normalization_func}"
+        )
+
+    frame_getitem_indicies = _get_frame_getitem_indicies(
+        groups[0].shape, dims, operating_dim
+    )
+    group_frames = [
+        [
+            projection_func(
+                data=data[frame_getitem_set],
+                dims=dims.replace(operating_dim, ""),
+                **projection_kwargs,
+            )
+            for frame_getitem_set in frame_getitem_indicies
+        ]
+        for data in groups
+    ]
+    norm_bys = [fit(data=data, **normalization_kwargs) for data in groups]
+
+    # Compute the raw projections along with the normalization values
+    with timer(Stages.Normalize):
+        if single_pass:
+            norm_bys, group_frames = dask.compute(norm_bys, group_frames)
+        else:
+            norm_bys = dask.compute(*norm_bys)
+    norm_bys = [
+        finalize_normalization_fit(normalization_func, norm_by, **normalization_kwargs)
+        for norm_by in norm_bys
+    ]
+
+    # Normalize each group's projected frames
+    return [
+        [
+            normalization_func(data=frame, norm_by=norm_by, **normalization_kwargs)
+            for frame in frames
+        ]
+        for frames, norm_by in zip(group_frames, norm_bys)
+    ]
+
+
+def _composite_frames(
+    movies: List[da.core.Array],
+    dims: str,
+    operating_dim: str,
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    channel_colors: Optional[List[Any]] = None,
+    project_first: bool = False,
+    single_pass: bool = False,
+    frame_cache: Optional[FrameCache] = None,
+    cache_params: Optional[Dict[str, Any]] = None,
+    pyramid_level: int = 0,
+) -> List[List[Union[da.core.Array, np.ndarray]]]:
+    # Split out every channel of every movie
+    channels = []
+    for data in movies:
+        movie_channels, channel_dims = _split_dim(data, dims, Dimensions.Channel)
+        channels.append(movie_channels)
+    colors = get_channel_colors(len(channels[0]), channel_colors)
+
+    # Project and normalize every channel of every movie together
+    channel_frames = _project_frame_groups(
+        groups=[channel for movie_channels in channels for channel in movie_channels],
+        dims=channel_dims,
+        operating_dim=operating_dim,
+        normalization_func=normalization_func,
+        normalization_kwargs=normalization_kwargs,
+        projection_func=projection_func,
+        projection_kwargs=projection_kwargs,
+        project_first=project_first,
+        single_pass=single_pass,
+        frame_cache=frame_cache,
+        cache_params=cache_params,
+        pyramid_level=pyramid_level,
+    )
+
+    # Blend the channels of each frame of each movie
+    n_channels = len(colors)
+    return [
+        [
+            composite(frame_channels, colors)
+            for frame_channels in zip(*channel_frames[i : i + n_channels])
+        ]
+        for i in range(0, len(channel_frames), n_channels)
+    ]
+
+
+def _montage_frames(
+    data: da.core.Array,
+    dims: str,
+    operating_dim: str,
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    composite: bool = False,
+    channel_colors: Optional[List[Any]] = None,
+    montage_columns: Optional[int] = None,
+    montage_downsample: int = 1,
+    project_first: bool = False,
+    single_pass: bool = False,
+    frame_cache: Optional[FrameCache] = None,
+    cache_params: Optional[Dict[str, Any]] = None,
+    pyramid_level: int = 0,
+) -> List[da.core.Array]:
+    # Split out every scene
+    scenes, scene_dims = _split_dim(data, dims, Dimensions.Scene)
+
+    # Generate every scene's frames
+    frame_kwargs = dict(
+        dims=scene_dims,
+        operating_dim=operating_dim,
+        normalization_func=normalization_func,
+        normalization_kwargs=normalization_kwargs,
+        projection_func=projection_func,
+        projection_kwargs=projection_kwargs,
+        project_first=project_first,
+        single_pass=single_pass,
+        frame_cache=frame_cache,
+        cache_params=cache_params,
+        pyramid_level=pyramid_level,
+    )
+    if composite:
+        scene_frames = _composite_frames(
+            movies=scenes, channel_colors=channel_colors, **frame_kwargs
+        )
+    else:
+        scene_frames = _project_frame_groups(groups=scenes, **frame_kwargs)
+
+    # Tile the downsampled scenes of each frame
+    return [
+        montage(
+            [downsample(frame, montage_downsample) for frame in frame_scenes],
+            columns=montage_columns,
+        )
+        for frame_scenes in zip(*scene_frames)
+    ]
 
 
 @task
@@ -212,59 +630,523 @@ def _generate_movie(
     normalization_kwargs: Dict[str, Any],
     projection_func: Callable,
     projection_kwargs: Dict[str, Any],
+    project_first: bool = False,
+    single_pass: Optional[bool] = None,
+    frame_batch_size: int = 8,
+    frame_queue_depth: int = 16,
+    projections: Optional[List[str]] = None,
+    source: Optional[Dict[str, Any]] = None,
+    params_digest: Optional[str] = None,
+    resume: bool = False,
+    writer_kwargs: Dict[str, Any] = {},
+    segment_frames: Optional[int] = None,
+    segment_workers: Optional[int] = None,
+    composite: bool = False,
+    channel_colors: Optional[List[Any]] = None,
+    montage: bool = False,
+    montage_columns: Optional[int] = None,
+    montage_downsample: int = 1,
+    frame_cache: Optional[FrameCache] = None,
+    frame_cache_params: Optional[Dict[str, Any]] = None,
+    pyramid_level: int = 0,
 ) -> da.core.Array:
-    # Normalize the data
-    data = normalization_func(data=data, **normalization_kwargs)
-
     # Get the dims for this movie
     dims = "".join(dim for dim in dims if dim not in selected_indices)
 
-    # Generate projections for each index of the operating dim
-    frame_getitem_indicies = []
-    for i in range(data.shape[dims.index(operating_dim)]):
-        this_frame_set = []
-        for dim in dims:
-            if dim is operating_dim:
-                this_frame_set.append(i)
+    # Cached frames are identified by the selected data of this movie
+    cache_kwargs = {}
+    if frame_cache is not None:
+        cache_kwargs = dict(
+            frame_cache=frame_cache,
+            cache_params={**frame_cache_params, "selected_indices": selected_indices},
+            pyramid_level=pyramid_level,
+        )
+
+    # Get the movie files to produce
+    suffix = "-".join(
+        name for name, used in [("composite", composite), ("montage", montage)] if used
+    )
+    suffix = suffix or None
+    if projections is not None:
+        output_files = [
+            get_output_file(save_path, selected_indices, save_format, projection)
+            for projection in projections
+        ]
+    else:
+        output_files = [
+            get_output_file(save_path, selected_indices, save_format, suffix)
+        ]
+
+    # Skip movies already generated from the same source and parameters
+    record_path = get_output_file(
+        save_path / manifest.MANIFEST_DIR, selected_indices, "json", suffix
+    )
+    if resume and manifest.is_complete(
+        record_path, source, params_digest, output_files
+    ):
+        log.info(f"Skipping already completed movie(s): {output_files}")
+        return
+
+    # Time the movie in any recorded run
+    with instrumentation.movie_timer(f"{save_path.name}/{record_path.stem}"):
+        # Generate a movie for every projection from the same reads of the data
+        if projections is not None:
+            streams = _multi_project_frames(
+                data=data,
+                dims=dims,
+                operating_dim=operating_dim,
+                projections=projections,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_kwargs=projection_kwargs,
+                single_pass=single_pass is not False,
+                **cache_kwargs,
+            )
+            streams = list(streams.values())
+
+        # Generate a single movie with the channels blended into RGB frames
+        elif composite and not montage:
+            frames = _composite_frames(
+                movies=[data],
+                dims=dims,
+                operating_dim=operating_dim,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_func=projection_func,
+                projection_kwargs=projection_kwargs,
+                channel_colors=channel_colors,
+                project_first=project_first,
+                single_pass=bool(single_pass),
+                **cache_kwargs,
+            )[0]
+            streams = [frames]
+
+        # Generate a single movie with every scene tiled into each frame
+        elif montage:
+            frames = _montage_frames(
+                data=data,
+                dims=dims,
+                operating_dim=operating_dim,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_func=projection_func,
+                projection_kwargs=projection_kwargs,
+                composite=composite,
+                channel_colors=channel_colors,
+                montage_columns=montage_columns,
+                montage_downsample=montage_downsample,
+                project_first=project_first,
+                single_pass=bool(single_pass),
+                **cache_kwargs,
+            )
+            streams = [frames]
+
+        # Generate a single movie from cached frames of the projection function
+        elif frame_cache is not None:
+            frames = _project_frame_groups(
+                groups=[data],
+                dims=dims,
+                operating_dim=operating_dim,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_func=projection_func,
+                projection_kwargs=projection_kwargs,
+                **cache_kwargs,
+            )[0]
+            streams = [frames]
+
+        # Generate a single movie with the projection function
+        else:
+            frames = _project_frames(
+                data=data,
+                dims=dims,
+                operating_dim=operating_dim,
+                normalization_func=normalization_func,
+                normalization_kwargs=normalization_kwargs,
+                projection_func=projection_func,
+                projection_kwargs=projection_kwargs,
+                project_first=project_first,
+                single_pass=bool(single_pass),
+            )
+            streams = [frames]
+
+        # Pad frames to the encoder's macro block size rather than letting the writer
+        # resample them
+        macro_block_size = writer_kwargs.get("macro_block_size")
+        streams = [
+            [pad_frame(frame, macro_block_size) for frame in frames]
+            for frames in streams
+        ]
+
+        # Make save dir if doesn't exist yet
+        save_path.mkdir(parents=True, exist_ok=True)
+
+        # Record that the movie is being generated, records are only kept for
+        # resuming
+        if resume:
+            manifest.write_record(
+                record_path,
+                source,
+                params_digest,
+                manifest.MovieStatus.InProgress,
+                output_files,
+            )
+
+        # Write every movie to a temporary file so that a partial movie never exists
+        # under its output name
+        partial_files = [partial_file(output_file) for output_file in output_files]
+
+        try:
+            # Encode segments of the movies concurrently and join them
+            if segment_frames is not None:
+                write_segmented_frame_streams(
+                    movie_files=partial_files,
+                    streams=streams,
+                    segment_size=segment_frames,
+                    fps=fps,
+                    writer_kwargs=writer_kwargs,
+                    batch_size=frame_batch_size,
+                    queue_depth=frame_queue_depth,
+                    max_workers=segment_workers,
+                )
+
+            # Compute frames and append them to the writers
             else:
-                this_frame_set.append(slice(None, None, None))
-        frame_getitem_indicies.append(tuple(this_frame_set))
+                write_movies(
+                    movie_files=partial_files,
+                    streams=streams,
+                    fps=fps,
+                    writer_kwargs=writer_kwargs,
+                    batch_size=frame_batch_size,
+                    queue_depth=frame_queue_depth,
+                )
 
-    # Project all frames
-    frames = []
-    for frame_getitem_set in frame_getitem_indicies:
-        frames.append(
-            projection_func(
-                data=data[frame_getitem_set],
-                dims=dims.replace(operating_dim, ""),
-                **projection_kwargs,
+            # Move the finished movies to their output names
+            for partial, output_file in zip(partial_files, output_files):
+                os.replace(partial, output_file)
+
+        # Remove any partial movies, record the failure, and pass the error on
+        except BaseException:
+            for partial in partial_files:
+                if partial.exists():
+                    partial.unlink()
+            if resume:
+                manifest.write_record(
+                    record_path,
+                    source,
+                    params_digest,
+                    manifest.MovieStatus.Failed,
+                    output_files,
+                )
+            raise
+
+        # Record the completed movie
+        if resume:
+            manifest.write_record(
+                record_path,
+                source,
+                params_digest,
+                manifest.MovieStatus.Complete,
+                output_files,
             )
+
+
+def _get_executor(
+    distributed_executor_port: Optional[Union[str, int]] = None,
+    max_concurrency: Optional[int] = None,
+) -> Any:
+    if distributed_executor_port:
+        from prefect.engine.executors import DaskExecutor
+
+        return DaskExecutor(address=f"tcp://localhost:{distributed_executor_port}")
+
+    # Run tasks concurrently, with every computation run by the tasks sharing one
+    # bounded thread pool
+    if max_concurrency is not None:
+        from .utils.executors import BoundedLocalDaskExecutor
+
+        return BoundedLocalDaskExecutor(max_concurrency)
+
+    from prefect.engine.executors import LocalExecutor
+
+    return LocalExecutor()
+
+
+def _resolve_project_first(
+    normalization_func: Callable,
+    projection_func: Callable,
+    project_first: Optional[bool],
+    single_pass: Optional[bool],
+    projections: Optional[List[str]],
+) -> bool:
+    # Determine if frames can be projected before normalization
+    if project_first is None:
+        project_first = can_project_first(normalization_func, projection_func)
+    elif (
+        project_first
+        and projections is None
+        and not can_project_first(normalization_func, projection_func)
+    ):
+        raise ConflictingArgumentsError(
+            f"Projecting before normalizing requires a normalization function "
+            f"registered as monotone and a projection function registered as "
+            f"commuting with monotone normalizations. Either the normalization "
+            f"function ({normalization_func}) or projection function "
+            f"({projection_func}) is not registered."
+        )
+    if single_pass and projections is None and not project_first:
+        raise ConflictingArgumentsError(
+            f"Single pass movie generation requires projecting before normalizing. "
+            f"Either the normalization function ({normalization_func}) or projection "
+            f"function ({projection_func}) is not registered as monotone, or "
+            f"project_first was set to False."
         )
 
-    # Generate output file name
-    this_file = []
-    for dim, selected in selected_indices.items():
-        this_file.append(dim),
-        this_file.append(str(selected))
-    this_file = "_".join(this_file)
+    return project_first
 
-    # Remove any leading period from save format
-    if save_format[0] == ".":
-        save_format = save_format[1:]
-    output_file = save_path / f"dims-{this_file}.{save_format}"
 
-    # Make save dir if doesn't exist yet
-    save_path.mkdir(parents=True, exist_ok=True)
+def _get_projection_kwargs(
+    img: Path,
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    scale_factor: int = 1,
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> Dict[str, Any]:
+    # Display orthogonal side views with the physical aspect ratio of the file unless
+    # a Z scale was provided
+    if projection_func is not orthoview_max_project or "z_scale" in projection_kwargs:
+        return projection_kwargs
 
-    # Init writer
-    writer = imageio.get_writer(output_file, fps=fps)
+    czi = get_czi_file(img, reader)
+    if not hasattr(czi, "meta"):
+        return projection_kwargs
 
-    # Iter over frames and append to writer
-    for frame in frames:
-        writer.append_data(frame.compute().astype(np.uint8))
+    z_scale = czi_metadata.z_anisotropy(czi)
+    if z_scale is None:
+        return projection_kwargs
 
-    # Close writer
-    writer.close()
+    # Downsampled planes have larger X pixels
+    return {**projection_kwargs, "z_scale": z_scale / scale_factor}
+
+
+def _add_movie_tasks(
+    img: Union[str, Path],
+    save_path: Optional[Union[str, Path]],
+    operating_dim: str,
+    overwrite: bool,
+    fps: int,
+    quality: float,
+    save_format: str,
+    normalization_func: Callable,
+    normalization_kwargs: Dict[str, Any],
+    projection_func: Callable,
+    projection_kwargs: Dict[str, Any],
+    S: Optional[Union[int, slice]],
+    C: Optional[Union[int, slice]],
+    B: Union[int, slice],
+    project_first: bool,
+    single_pass: Optional[bool],
+    frame_batch_size: int,
+    frame_queue_depth: int,
+    projections: Optional[List[str]],
+    resume: bool,
+    encoder_options: Dict[str, Any],
+    segment_frames: Optional[int],
+    segment_workers: Optional[int],
+    composite: bool,
+    channel_colors: Optional[List[Any]],
+    montage: bool,
+    montage_columns: Optional[int],
+    montage_downsample: int,
+    roi: Optional[Tuple[int, int, int, int]],
+    scale_factor: int,
+    frame_cache_dir: Optional[Union[str, Path]],
+    pyramid_levels: int,
+    pyramid_level: int,
+    reader: Optional[Callable[[Path], Any]],
+) -> Tuple[Task, Task]:
+    # Convert img to Path
+    img = Path(img).expanduser().resolve(strict=True)
+
+    # Check the encoder options before scheduling any work
+    writer_kwargs = get_writer_kwargs(quality=quality, encoder_options=encoder_options)
+    if segment_frames is not None and segment_frames < 1:
+        raise ValueError(
+            f"The number of frames per segment must be a positive integer. "
+            f"Received: {segment_frames}."
+        )
+    if (composite or montage) and projections is not None:
+        raise ConflictingArgumentsError(
+            "Composite and montage movies are not available for multiple projections."
+        )
+    if montage_downsample < 1:
+        raise ValueError(
+            f"The montage downsample factor must be a positive integer. "
+            f"Received: {montage_downsample}."
+        )
+    if pyramid_level < 0:
+        raise ValueError(
+            f"The pyramid level must be a non-negative integer. "
+            f"Received: {pyramid_level}."
+        )
+    if pyramid_level > 0 and frame_cache_dir is None:
+        raise ConflictingArgumentsError(
+            "Pyramid levels are rendered from cached frames, provide a frame_cache_dir."
+        )
+    frame_cache = None
+    if frame_cache_dir is not None:
+        frame_cache = FrameCache(frame_cache_dir, pyramid_levels=pyramid_levels)
+
+    # Fill in projection arguments read from the file metadata
+    projection_kwargs = _get_projection_kwargs(
+        img=img,
+        projection_func=projection_func,
+        projection_kwargs=projection_kwargs,
+        scale_factor=scale_factor,
+        reader=reader,
+    )
+
+    # Determine save path
+    save_path = _get_save_path(
+        save_path=save_path,
+        overwrite=overwrite,
+        fname=img.with_suffix("").name,
+        resume=resume,
+    )
+
+    # Identify the source file and every parameter that changes the produced movies
+    # so that completed movies can be recognized when resuming
+    source = manifest.source_fingerprint(img)
+    params_digest = manifest.params_hash(
+        {
+            "operating_dim": operating_dim,
+            "fps": fps,
+            "quality": quality,
+            "encoder_options": encoder_options,
+            "save_format": save_format,
+            "normalization_func": normalization_func,
+            "normalization_kwargs": normalization_kwargs,
+            "projection_func": projection_func,
+            "projection_kwargs": projection_kwargs,
+            "B": B,
+            "projections": projections,
+            "composite": composite,
+            "channel_colors": channel_colors,
+            "montage": montage,
+            "montage_columns": montage_columns,
+            "montage_downsample": montage_downsample,
+            "roi": roi,
+            "scale_factor": scale_factor,
+            "frame_cache": frame_cache is not None,
+            "pyramid_level": pyramid_level,
+        }
+    )
+
+    # Identify the raw projected frames, these don't change with any display settings
+    frame_cache_params = {
+        "source": source,
+        "operating_dim": operating_dim,
+        "projection_func": projection_func,
+        "projection_kwargs": projection_kwargs,
+        "S": S,
+        "C": C,
+        "B": B,
+        "composite": composite,
+        "montage": montage,
+        "roi": roi,
+        "scale_factor": scale_factor,
+    }
+
+    # Setup and check image and operating dimension provided
+    img_details = _img_prep(
+        img=img,
+        operating_dim=operating_dim,
+        # Read all channels of a plane together for composites
+        chunks={Dimensions.Channel: -1} if composite else None,
+        roi=roi,
+        scale_factor=scale_factor,
+        reader=reader,
+        # Don't run if save path checking failed
+        upstream_tasks=[save_path],
+    )
+
+    # Select scene data
+    img_details = _select_dimension(
+        img=img_details[0],
+        dims=img_details[1],
+        dim_name=Dimensions.Scene,
+        dim_indicies_selected=S,
+    )
+
+    # Select channel data
+    img_details = _select_dimension(
+        img=img_details[0],
+        dims=img_details[1],
+        dim_name=Dimensions.Channel,
+        dim_indicies_selected=C,
+    )
+
+    # Select 'B' data
+    img_details = _select_dimension(
+        img=img_details[0],
+        dims=img_details[1],
+        dim_name=Dimensions.B,
+        dim_indicies_selected=B,
+    )
+
+    # Generate all the indicie sets we will need to process
+    getitem_indicies = _generate_getitem_indicies(
+        img_shape=_get_image_shape(img_details[0]),
+        dims=img_details[1],
+        split_channels=not composite,
+        split_scenes=not montage,
+    )
+
+    # Generate all the movie selections
+    to_process = _generate_process_list(
+        img=img_details[0], getitem_indicies=getitem_indicies
+    )
+
+    # Generate a list of dictionaries that map dimension to selected data
+    selected_indices = _generate_selected_dims_list(
+        dims=img_details[1], getitem_indicies=getitem_indicies
+    )
+
+    # Generate movies for each
+    movies = _generate_movie.map(
+        data=to_process,
+        selected_indices=selected_indices,
+        dims=unmapped(img_details[1]),
+        operating_dim=unmapped(operating_dim),
+        save_path=unmapped(save_path),
+        fps=unmapped(fps),
+        save_format=unmapped(save_format),
+        normalization_func=unmapped(normalization_func),
+        normalization_kwargs=unmapped(normalization_kwargs),
+        projection_func=unmapped(projection_func),
+        projection_kwargs=unmapped(projection_kwargs),
+        project_first=unmapped(project_first),
+        single_pass=unmapped(single_pass),
+        frame_batch_size=unmapped(frame_batch_size),
+        frame_queue_depth=unmapped(frame_queue_depth),
+        projections=unmapped(projections),
+        source=unmapped(source),
+        params_digest=unmapped(params_digest),
+        resume=unmapped(resume),
+        writer_kwargs=unmapped(writer_kwargs),
+        segment_frames=unmapped(segment_frames),
+        segment_workers=unmapped(segment_workers),
+        composite=unmapped(composite),
+        channel_colors=unmapped(channel_colors),
+        montage=unmapped(montage),
+        montage_columns=unmapped(montage_columns),
+        montage_downsample=unmapped(montage_downsample),
+        frame_cache=unmapped(frame_cache),
+        frame_cache_params=unmapped(frame_cache_params),
+        pyramid_level=unmapped(pyramid_level),
+    )
+
+    return save_path, movies
 
 
 def generate_movies(
@@ -274,7 +1156,7 @@ def generate_movies(
     operating_dim: str = Dimensions.Time,
     overwrite: bool = False,
     fps: int = 12,
-    quality: int = 6,
+    quality: Optional[float] = 6,
     save_format: str = "mp4",
     save_workflow: bool = False,
     normalization_func: Callable = single_channel_percentile_norm,
@@ -284,6 +1166,27 @@ def generate_movies(
     S: Optional[Union[int, slice]] = None,
     C: Optional[Union[int, slice]] = None,
     B: Union[int, slice] = 0,
+    project_first: Optional[bool] = None,
+    single_pass: Optional[bool] = None,
+    frame_batch_size: int = 8,
+    frame_queue_depth: int = 16,
+    projections: Optional[List[str]] = None,
+    resume: bool = False,
+    encoder_options: Dict[str, Any] = {},
+    segment_frames: Optional[int] = None,
+    segment_workers: Optional[int] = None,
+    composite: bool = False,
+    channel_colors: Optional[List[Union[str, Tuple[int, int, int]]]] = None,
+    montage: bool = False,
+    montage_columns: Optional[int] = None,
+    montage_downsample: int = 1,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    scale_factor: int = 1,
+    frame_cache_dir: Optional[Union[str, Path]] = None,
+    pyramid_levels: int = 1,
+    pyramid_level: int = 0,
+    reader: Optional[Callable[[Path], Any]] = None,
+    save_run_report: bool = False,
 ) -> Path:
     """
     Generate a movie for every scene and channel pair found in a file through an
@@ -309,8 +1212,9 @@ def generate_movies(
     fps: int
         Frames per second of each produces movie.
         Default: 12
-    quality: int
+    quality: Optional[float]
         ImageIO's compression system. 0 is high compression, 10 is no compression.
+        Ignored when a "crf" or "bitrate" encoder option is provided.
         Default: 6
     save_format: str
         Which movie format should be used for each produced file.
@@ -331,7 +1235,9 @@ def generate_movies(
         A function to project the data for at each frame of the movie.
         Default: timelapse_tools.projection.single_channel_max_project
     projection_kwargs: Dict[str, Any]
-        Any extra arguments to pass to the projection function.
+        Any extra arguments to pass to the projection function. The "z_scale" of
+        timelapse_tools.projection.orthoview_max_project defaults to the Z anisotropy
+        of the file, divided by the scale_factor.
         Default: {}
     S: Optional[Union[int, slice]]
         A specific integer or slice to use for selecting down the scenes to process.
@@ -342,101 +1248,428 @@ def generate_movies(
     B: Union[int, slice]
         A specific integer or slice to use for selecting down the channels to process.
         Default: 0
+    project_first: Optional[bool]
+        Project the raw data and then normalize only the projected frames. This is only
+        valid when normalizing then projecting gives the same result as projecting then
+        normalizing, which is known for normalization functions registered with
+        timelapse_tools.monotone.monotone_normalization and projection functions
+        registered with timelapse_tools.monotone.monotone_commuting_projection.
+        Default: None (project first if both functions are registered)
+    single_pass: Optional[bool]
+        Compute the normalization values and the raw projected frames in the same pass
+        over the data when projecting first or generating multiple projections. This
+        reads the data once rather than twice but holds every raw projected frame of a
+        movie in memory. Set to False to fit multiple projections in a separate pass,
+        for low memory runs.
+        Default: None (a single pass for multiple projections, two passes when
+        projecting first)
+    frame_batch_size: int
+        The number of frames of each movie to compute together.
+        Default: 8
+    frame_queue_depth: int
+        The maximum number of computed frames of each movie waiting to be encoded.
+        Frame computation and encoding run concurrently, this caps the memory used by
+        frames computed ahead of the encoder.
+        Default: 16
+    projections: Optional[List[str]]
+        Generate a movie for each of these projections, in place of the projection
+        function. Any of: "max", "mean", "sum", "min", "std", and "argmax". Each batch
+        of frames is read once for all projections. Each projection, other than the
+        depth coded "argmax", is normalized by values computed from all of its own
+        frames, fitted for every projection together in the same read of the data as
+        the frames (see single_pass to fit in a separate pass). Movies are suffixed
+        with the projection name, e.g. "dims-S_0_C_0-max.mp4".
+        See timelapse_tools.projection.multi_projection.multi_project for details.
+        Default: None (generate a single movie with the projection function)
+    resume: bool
+        Continue a previous run into an existing save path, only generating movies
+        that aren't recorded as completed from the same source file and parameters.
+        Every movie's source file path, modification time, size, parameters hash, and
+        status is recorded in a JSON file under the save path's ".manifest" directory.
+        Runs without resume don't write records, so a later resumed run regenerates
+        their movies.
+        Default: False
+    encoder_options: Dict[str, Any]
+        Any encoder tuning options: "codec", "preset", "crf", "bitrate", "threads",
+        "pixelformat", "macro_block_size", and "output_params". For example,
+        {"preset": "ultrafast"} for quick QC movies or {"preset": "slow", "crf": 18}
+        for publication movies. Frames are padded with zeros to a multiple of the
+        macro block size (default 16).
+        See timelapse_tools.utils.movie_writing.get_writer_kwargs for details.
+        Default: {} (imageio defaults)
+    segment_frames: Optional[int]
+        Split each movie into segments of this many frames, encode the segments
+        concurrently, and join them without re-encoding. Long movies are then encoded
+        across multiple cores instead of by a single encoder.
+        Default: None (encode each movie as a whole)
+    segment_workers: Optional[int]
+        The maximum number of segments of a movie to encode at the same time.
+        Default: None (based on the number of CPUs)
+    composite: bool
+        Generate a single RGB movie for every scene, rather than a movie for every
+        scene and channel pair, with each channel normalized on its own and additively
+        blended in its channel color. Every plane is read once for all channels.
+        Movies are suffixed with "composite", e.g. "dims-S_0-composite.mp4".
+        Default: False
+    channel_colors: Optional[List[Union[str, Tuple[int, int, int]]]]
+        The color of each channel in composite movies, as a name (e.g. "magenta"), a
+        hex string (e.g. "#ff00ff"), or RGB values between 0 and 255.
+        See timelapse_tools.projection.composite.parse_color for details.
+        Default: None (magenta, green, cyan, yellow, red, blue, white)
+    montage: bool
+        Generate a single movie tiling every scene into a grid, rather than a movie for
+        every scene. Each scene is normalized on its own. Can be combined with
+        composite. Movies are suffixed with "montage", e.g. "dims-C_0-montage.mp4".
+        Default: False
+    montage_columns: Optional[int]
+        The number of scenes in each row of the montage grid.
+        Default: None (the smallest square grid that fits every scene)
+    montage_downsample: int
+        Average blocks of this many pixels along Y and X of each scene's frames before
+        tiling them.
+        Default: 1 (no downsampling)
+    roi: Optional[Tuple[int, int, int, int]]
+        Only read this region of interest of each YX plane, as (x, y, width, height)
+        in pixels from the top left of the plane.
+        Default: None (read the full plane)
+    scale_factor: int
+        Downsample each YX plane by averaging blocks of this many pixels along Y and X
+        as it is read, so every later step works on the smaller planes.
+        Default: 1 (no downsampling)
+    frame_cache_dir: Optional[Union[str, Path]]
+        A directory to cache the raw projected frames of every movie in, as Zarr
+        arrays keyed by the source file, the selected data, and the projection
+        parameters. Generating movies again with only different display settings (fps,
+        quality, encoder options, normalization, colors, montage layout) reads the
+        cached frames rather than the source file. With a cache, frames are always
+        projected from the raw data. Single projection movies are normalized by values
+        fitted on the source data, as without a cache, which are stored with the
+        cached frames; new normalization settings are fitted on the source data once.
+        Multiple projection movies are normalized by values computed from each
+        projection's own frames. Requires zarr, install with:
+        pip install timelapse_tools[zarr]
+        See timelapse_tools.utils.frame_cache.FrameCache for details.
+        Default: None (don't cache frames)
+    pyramid_levels: int
+        The number of pyramid levels of every movie's frames to store in the frame
+        cache, including the full resolution frames. Each level is downsampled by 2
+        from the level before it, averaging blocks of pixels, or keeping the brightest
+        pixel of each block for max projections. Every level is built in the same pass
+        that caches the frames.
+        See timelapse_tools.projection.pyramid.build_pyramid for details.
+        Default: 1 (only the full resolution frames)
+    pyramid_level: int
+        Render the movies from this pyramid level of the cached frames, e.g. 2 for
+        quarter size previews. Missing levels are built from the cached full
+        resolution frames. Requires a frame_cache_dir.
+        Default: 0 (full resolution frames)
+    reader: Optional[Callable[[Path], Any]]
+        A callable opening the file in place of aicspylibczi.CziFile, e.g.
+        timelapse_tools.zarr_conversion.OmeZarrFile to generate movies from a store
+        written by convert_to_zarr rather than reading the CZI file again. See
+        timelapse_tools.utils.czi_reading.daread.
+        Default: None (read the file as a CZI file)
+    save_run_report: bool
+        Optionally, save a JSON report of the run to the save_path with the wall time,
+        peak memory, bytes read, and frames per second of the run, of every stage
+        (opening files, reading, computing frames, casting, and encoding), and of every
+        movie. Opening and reading files are only reported for the whole run, as reads
+        are shared by the movies of a file. To get the report without saving it wrap
+        the call in timelapse_tools.utils.instrumentation.record_run.
+        Default: False
+
     Returns
     -------
     save_path: Path
         The path to the produced scene-channel pairings of movies.
     """
-    if distributed_executor_port:
-        from prefect.engine.executors import DaskExecutor
-
-        executor = DaskExecutor(address=f"tcp://localhost:{distributed_executor_port}")
-    else:
-        from prefect.engine.executors import LocalExecutor
-
-        executor = LocalExecutor()
+    # Get executor
+    executor = _get_executor(distributed_executor_port)
+
+    # Determine if frames can be projected before normalization
+    project_first = _resolve_project_first(
+        normalization_func=normalization_func,
+        projection_func=projection_func,
+        project_first=project_first,
+        single_pass=single_pass,
+        projections=projections,
+    )
 
     # Run all processing through prefect + dask for better
     # parallelization and task optimization
     with Flow("czi_to_mp4_conversion") as flow:
-        # Convert img to Path
-        img = Path(img).expanduser().resolve(strict=True)
-
-        # Determine save path
-        save_path = _get_save_path(
-            save_path=save_path, overwrite=overwrite, fname=img.with_suffix("").name
-        )
-
-        # Setup and check image and operating dimension provided
-        img_details = _img_prep(
+        save_path_task, _ = _add_movie_tasks(
             img=img,
+            save_path=save_path,
             operating_dim=operating_dim,
-            # Don't run if save path checking failed
-            upstream_tasks=[save_path],
+            overwrite=overwrite,
+            fps=fps,
+            quality=quality,
+            save_format=save_format,
+            normalization_func=normalization_func,
+            normalization_kwargs=normalization_kwargs,
+            projection_func=projection_func,
+            projection_kwargs=projection_kwargs,
+            S=S,
+            C=C,
+            B=B,
+            project_first=project_first,
+            single_pass=single_pass,
+            frame_batch_size=frame_batch_size,
+            frame_queue_depth=frame_queue_depth,
+            projections=projections,
+            resume=resume,
+            encoder_options=encoder_options,
+            segment_frames=segment_frames,
+            segment_workers=segment_workers,
+            composite=composite,
+            channel_colors=channel_colors,
+            montage=montage,
+            montage_columns=montage_columns,
+            montage_downsample=montage_downsample,
+            roi=roi,
+            scale_factor=scale_factor,
+            frame_cache_dir=frame_cache_dir,
+            pyramid_levels=pyramid_levels,
+            pyramid_level=pyramid_level,
+            reader=reader,
         )
 
-        # Select scene data
-        img_details = _select_dimension(
-            img=img_details[0],
-            dims=img_details[1],
-            dim_name=Dimensions.Scene,
-            dim_indicies_selected=S,
-        )
+    # Run the flow
+    with instrumentation.optional_record_run(save_run_report) as recorder:
+        state = flow.run(executor=executor)
 
-        # Select channel data
-        img_details = _select_dimension(
-            img=img_details[0],
-            dims=img_details[1],
-            dim_name=Dimensions.Channel,
-            dim_indicies_selected=C,
-        )
+    # Get resulting path
+    save_path = state.result[save_path_task].result
 
-        # Select 'B' data
-        img_details = _select_dimension(
-            img=img_details[0],
-            dims=img_details[1],
-            dim_name=Dimensions.B,
-            dim_indicies_selected=B,
-        )
+    # Save the run report to the same save_path
+    if save_run_report:
+        recorder.write(save_path / instrumentation.RUN_REPORT_NAME)
 
-        # Generate all the indicie sets we will need to process
-        getitem_indicies = _generate_getitem_indicies(
-            img_shape=_get_image_shape(img_details[0]), dims=img_details[1]
-        )
+    # Save the flow viz to the same save_path
+    if save_workflow:
+        flow.visualize(filename=str(save_path / "workflow.png"))
+
+    return save_path
+
+
+# generate_movies arguments handled by generate_movies_batch itself
+BATCH_ARGUMENTS = (
+    "img",
+    "distributed_executor_port",
+    "save_workflow",
+    "save_run_report",
+)
+
+# Catalog columns that override the batch level arguments for a single file
+CATALOG_OVERRIDE_COLUMNS = ("save_path", "operating_dim", "S", "C", "B")
+
+
+def _load_catalog(
+    catalog: Union[str, Path, pd.DataFrame, List[Union[str, Path, Dict[str, Any]]]],
+    path_column: str,
+    file_name_column: Optional[str],
+) -> List[Dict[str, Any]]:
+    # Read CSV catalogs
+    if isinstance(catalog, (str, Path)):
+        catalog = pd.read_csv(Path(catalog).expanduser().resolve(strict=True))
+
+    # Convert dataframes to rows
+    if isinstance(catalog, pd.DataFrame):
+        catalog = catalog.to_dict("records")
+
+    # Normalize every row to a dictionary with at least a path
+    rows = []
+    for row in catalog:
+        if isinstance(row, (str, Path)):
+            row = {path_column: row}
+
+        # Check the path is available
+        if path_column not in row:
+            raise KeyError(
+                f"Catalog row is missing the path column '{path_column}'. "
+                f"Received row: {row}"
+            )
+
+        # Build path
+        img = Path(row[path_column])
+        if file_name_column is not None:
+            img = img / row[file_name_column]
+
+        # Only keep overrides with values, integer selections read from a CSV may
+        # have been parsed as floats
+        overrides = {}
+        for column in CATALOG_OVERRIDE_COLUMNS:
+            value = row.get(column)
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            overrides[column] = value
 
-        # Generate all the movie selections
-        to_process = _generate_process_list(
-            img=img_details[0], getitem_indicies=getitem_indicies
+        rows.append({"img": img, **overrides})
+
+    return rows
+
+
+def generate_movies_batch(
+    catalog: Union[str, Path, pd.DataFrame, List[Union[str, Path, Dict[str, Any]]]],
+    save_dir: Optional[Union[str, Path]] = None,
+    distributed_executor_port: Optional[Union[str, int]] = None,
+    max_concurrency: Optional[int] = None,
+    path_column: str = "path",
+    file_name_column: Optional[str] = None,
+    save_workflow: bool = False,
+    save_run_report: bool = False,
+    **kwargs,
+) -> Dict[Path, Optional[Path]]:
+    """
+    Generate movies for every file in a catalog, scheduling all files' movie tasks in
+    a single workflow.
+
+    Parameters
+    ----------
+    catalog: Union[str, Path, pd.DataFrame, List[Union[str, Path, Dict[str, Any]]]]
+        A path to a CSV, a dataframe, or a list of file paths or row dictionaries.
+        Every row must have the `path_column`. Rows may also provide "save_path",
+        "operating_dim", "S", "C", and "B" values to override the batch level
+        arguments for that file. Empty values are ignored.
+    save_dir: Optional[Union[str, Path]]
+        A directory to save each file's movies under, in a directory named after the
+        file. Ignored for rows that provide a "save_path".
+        Default: None (the current working directory)
+    distributed_executor_port: Optional[Union[str, int]]
+        If provided a port to use for connecting to the distributed scheduler. All image
+        computation and workflow tasks will be distributed using Dask, bounded by the
+        size of the cluster. Can't be combined with max_concurrency.
+        Default: None
+    max_concurrency: Optional[int]
+        When running locally, the number of threads shared by the reads and frame
+        computations of every movie, across all files. Movies are generated
+        concurrently.
+        Default: None (the number of CPUs)
+    path_column: str
+        The catalog column holding each file path.
+        Default: "path"
+    file_name_column: Optional[str]
+        A catalog column holding each file name, joined onto the `path_column` value.
+        For example: path_column="Isilon path", file_name_column="File Name".
+        Default: None (the `path_column` is the full file path)
+    save_workflow: bool
+        Optionally, save a PNG of the workflow that ran to the save_dir.
+        Default: False
+    save_run_report: bool
+        Optionally, save a JSON report of the whole run to the save_dir, with the
+        timings of every movie of every file. See generate_movies.
+        Default: False
+    kwargs:
+        Any other generate_movies arguments, applied to every file.
+
+    Returns
+    -------
+    save_paths: Dict[Path, Optional[Path]]
+        The path to each file's produced movies, or None if processing the file
+        failed.
+    """
+    # Catch arguments only available to single files
+    if "img" in kwargs or "save_path" in kwargs:
+        raise ConflictingArgumentsError(
+            "Provide `img` and `save_path` values through the catalog."
         )
 
-        # Generate a list of dictionaries that map dimension to selected data
-        selected_indices = _generate_selected_dims_list(
-            dims=img_details[1], getitem_indicies=getitem_indicies
+    # The distributed scheduler is bounded by the size of the cluster
+    if distributed_executor_port and max_concurrency is not None:
+        raise ConflictingArgumentsError(
+            "max_concurrency only bounds local runs, it can't be combined with a "
+            "distributed_executor_port."
         )
 
-        # Generate movies for each
-        _generate_movie.map(
-            data=to_process,
-            selected_indices=selected_indices,
-            dims=unmapped(img_details[1]),
-            operating_dim=unmapped(operating_dim),
-            save_path=unmapped(save_path),
-            fps=unmapped(fps),
-            save_format=unmapped(save_format),
-            normalization_func=unmapped(normalization_func),
-            normalization_kwargs=unmapped(normalization_kwargs),
-            projection_func=unmapped(projection_func),
-            projection_kwargs=unmapped(projection_kwargs),
+    # Fill in the defaults for every argument not provided
+    options = {
+        name: parameter.default
+        for name, parameter in inspect.signature(generate_movies).parameters.items()
+        if name not in BATCH_ARGUMENTS
+    }
+    for name, value in kwargs.items():
+        if name not in options:
+            raise TypeError(
+                f"generate_movies_batch got an unexpected argument '{name}'"
+            )
+        options[name] = value
+
+    # Determine if frames can be projected before normalization
+    options["project_first"] = _resolve_project_first(
+        normalization_func=options["normalization_func"],
+        projection_func=options["projection_func"],
+        project_first=options["project_first"],
+        single_pass=options["single_pass"],
+        projections=options["projections"],
+    )
+
+    # Get every file and their overrides
+    rows = _load_catalog(catalog, path_column, file_name_column)
+    if save_dir is not None:
+        save_dir = Path(save_dir).expanduser().resolve()
+    for row in rows:
+        if "save_path" not in row and save_dir is not None:
+            row["save_path"] = save_dir / Path(row["img"]).with_suffix("").name
+
+    # Multiple files writing to the same directory would overwrite each other, files
+    # without a save_path are saved to their file name in the current directory
+    save_paths = [
+        Path(row.get("save_path", Path(row["img"]).expanduser().with_suffix("").name))
+        .expanduser()
+        .resolve()
+        for row in rows
+    ]
+    if len(set(save_paths)) != len(save_paths):
+        raise ValueError(
+            "Multiple catalog files would be saved to the same directory. "
+            "Provide a 'save_path' for each file with a duplicate file name."
         )
 
-    # Run the flow
-    state = flow.run(executor=executor)
+    # Get executor, local runs generate movies concurrently
+    executor = _get_executor(
+        distributed_executor_port, max_concurrency or os.cpu_count()
+    )
 
-    # Get resulting path
-    save_path = state.result[flow.get_tasks(name="_get_save_path")[0]].result
+    # Add every file's tasks to a single flow so they can all be scheduled together
+    results = {}
+    file_tasks = {}
+    with Flow("czi_to_mp4_batch_conversion") as flow:
+        for row in rows:
+            img = Path(row["img"])
+            if not img.expanduser().is_file():
+                log.error(f"Failed to generate movies for {img}: File not found.")
+                results[img] = None
+                continue
 
-    # Save the flow viz to the same save_path
+            file_tasks[img] = _add_movie_tasks(**{**options, **row})
+
+    # Run the flow
+    with instrumentation.optional_record_run(save_run_report) as recorder:
+        state = flow.run(executor=executor)
+
+    # Get resulting paths, a file failed if any of its movies failed
+    for img, (save_path_task, movies_task) in file_tasks.items():
+        movies_state = state.result[movies_task]
+        movie_states = getattr(movies_state, "map_states", None) or []
+        if movies_state.is_successful() and all(
+            movie_state.is_successful() for movie_state in movie_states
+        ):
+            results[img] = state.result[save_path_task].result
+        else:
+            log.error(f"Failed to generate movies for {img}: {movies_state.message}")
+            results[img] = None
+
+    # Save the flow viz to the save dir
     if save_workflow:
-        flow.visualize(filename=str(save_path / "workflow.png"))
+        save_dir = save_dir or Path.cwd()
+        save_dir.mkdir(parents=True, exist_ok=True)
+        flow.visualize(filename=str(save_dir / "workflow.png"))
 
-    return save_path
+    # Save the run report to the save dir
+    if save_run_report:
+        recorder.write((save_dir or Path.cwd()) / instrumentation.RUN_REPORT_NAME)
+
+    return results
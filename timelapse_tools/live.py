@@ -0,0 +1,490 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import dask
+import dask.array as da
+import numpy as np
+
+from .constants import Dimensions
+from .monotone import finalize_normalization_fit, get_normalization_fit
+from .normalization.histogram import histogram, histogram_percentiles
+from .normalization.histogram import histogram_range, supports_histogram
+from .normalization.single_channel_percentile_norm import single_channel_percentile_norm
+from .projection.single_channel_max_project import single_channel_max_project
+from .utils.czi_reading import daread
+from .utils.movie_writing import concat_movies, get_writer_kwargs, pad_frame
+from .utils.movie_writing import partial_file, write_movies
+from .utils.selection import generate_getitem_indicies, generate_selected_dims_list
+from .utils.selection import get_output_file, select_dimension
+from .utils.zarr_writing import import_zarr
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Directory under a save path holding the raw projected frames of every preview
+LIVE_STORE_DIR = ".live"
+
+###############################################################################
+
+
+class LivePreview:
+    """
+    Preview movies, for every scene and channel pair, of a file that is still being
+    acquired.
+
+    Each update only reads and projects the timepoints appended since the last update.
+    The raw projected frames are appended to a Zarr array for every movie under the
+    save path's ".live" directory. Only the new frames are encoded, and appended to
+    each movie without re-encoding the frames already in it, unless the normalization
+    bounds refitted with the new frames moved enough that the whole movie is
+    re-rendered from the stored 2D frames. The last timepoint is only read once the
+    file has stopped growing between two updates, as it may still be partially
+    written.
+
+    Like generate_movies, the normalization is fit to the source data of every
+    complete timepoint rather than to the projected frames. Percentile normalization
+    bounds of integer data are kept up to date from a running histogram, stored with
+    the frames, that only adds the newly read timepoints. Other monotone normalization
+    functions are refit to the source data of every complete timepoint.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        Path to a CZI file to preview.
+    save_path: Optional[Union[str, Path]]
+        A specific path to save the preview movies to.
+        Default: A directory in the current directory named after the provided file.
+    fps: int
+        Frames per second of each preview movie.
+        Default: 12
+    quality: Optional[float]
+        ImageIO's compression system. 0 is high compression, 10 is no compression.
+        Default: 6
+    save_format: str
+        Which movie format should be used for each preview.
+        Default: mp4
+    encoder_options: Dict[str, Any]
+        Any encoder tuning options. See
+        timelapse_tools.utils.movie_writing.get_writer_kwargs for details.
+        Default: {} (imageio defaults)
+    normalization_func: Callable
+        A function to normalize the projected frames of each movie.
+        Default: timelapse_tools.normalization.single_channel_percentile_norm
+    normalization_kwargs: Dict[str, Any]
+        Any extra arguments to pass to the normalization function.
+        Default: {}
+    projection_func: Callable
+        A function to project the data of each timepoint.
+        Default: timelapse_tools.projection.single_channel_max_project
+    projection_kwargs: Dict[str, Any]
+        Any extra arguments to pass to the projection function.
+        Default: {}
+    S: Optional[Union[int, slice]]
+        A specific integer or slice to use for selecting down the scenes to preview.
+        Default: None (preview all scenes)
+    C: Optional[Union[int, slice]]
+        A specific integer or slice to use for selecting down the channels to preview.
+        Default: None (preview all channels)
+    B: Union[int, slice]
+        A specific integer or slice to use for selecting down the 'B' data to preview.
+        Default: 0
+    rerender_tolerance: float
+        How far, as a fraction of the range of the normalization bounds a movie was
+        rendered with, the refitted bounds may move before the whole movie is
+        re-rendered. Until then new frames are normalized with the rendered bounds.
+        Default: 0.02
+    """
+
+    def __init__(
+        self,
+        img: Union[str, Path],
+        save_path: Optional[Union[str, Path]] = None,
+        fps: int = 12,
+        quality: Optional[float] = 6,
+        save_format: str = "mp4",
+        encoder_options: Dict[str, Any] = {},
+        normalization_func: Callable = single_channel_percentile_norm,
+        normalization_kwargs: Dict[str, Any] = {},
+        projection_func: Callable = single_channel_max_project,
+        projection_kwargs: Dict[str, Any] = {},
+        S: Optional[Union[int, slice]] = None,
+        C: Optional[Union[int, slice]] = None,
+        B: Union[int, slice] = 0,
+        rerender_tolerance: float = 0.02,
+    ):
+        self.zarr = import_zarr()
+        self.img = Path(img).expanduser().resolve()
+        if save_path is None:
+            save_path = self.img.with_suffix("").name
+        self.save_path = Path(save_path).expanduser().resolve()
+        self.fps = fps
+        self.save_format = save_format
+        self.writer_kwargs = get_writer_kwargs(
+            quality=quality, encoder_options=encoder_options
+        )
+        self.normalization_func = normalization_func
+        self.normalization_kwargs = normalization_kwargs
+        self.projection_func = projection_func
+        self.projection_kwargs = projection_kwargs
+        self.selections = {
+            Dimensions.Scene: S,
+            Dimensions.Channel: C,
+            Dimensions.B: B,
+        }
+        self.rerender_tolerance = rerender_tolerance
+
+        # The file size and modification time at the last update
+        self._last_stat = None
+
+        # The number of frames in every rendered movie and the normalization bounds
+        # they were rendered with
+        self._rendered = {}
+
+    @property
+    def store_dir(self) -> Path:
+        return self.save_path / LIVE_STORE_DIR
+
+    def _read(self) -> Tuple[da.core.Array, str]:
+        # Read the current shape of the file and select the data to preview
+        data, dims = daread(self.img)
+        for dim_name, selection in self.selections.items():
+            data, dims = select_dimension(
+                img=data, dims=dims, dim_name=dim_name, dim_indicies_selected=selection
+            )
+        if Dimensions.Time not in dims:
+            raise ValueError(
+                f"Live previews require a time dimension. "
+                f"Found dimensions: '{dims}' in {self.img}."
+            )
+
+        return data, dims
+
+    def _store_path(self, output_file: Path) -> Path:
+        return self.store_dir / f"{output_file.stem}.zarr"
+
+    def _histogram_path(self, output_file: Path) -> Path:
+        return self.store_dir / f"{output_file.stem}.histogram.zarr"
+
+    def _n_stored(self, store_path: Path) -> int:
+        if not store_path.exists():
+            return 0
+
+        return self.zarr.open_array(str(store_path), mode="r").shape[0]
+
+    def _append(self, store_path: Path, frames: np.ndarray):
+        # Extend the stored frames, one chunk per frame
+        if store_path.exists():
+            self.zarr.open_array(str(store_path), mode="r+").append(frames, axis=0)
+        else:
+            store = self.zarr.open_array(
+                str(store_path),
+                mode="w",
+                shape=frames.shape,
+                chunks=(1,) + frames.shape[1:],
+                dtype=frames.dtype,
+            )
+            store[:] = frames
+
+    def _uses_running_histogram(self, dtype: np.dtype) -> bool:
+        # Only exact, unsampled histogram percentiles can be kept up to date
+        kwargs = self.normalization_kwargs
+        return (
+            self.normalization_func is single_channel_percentile_norm
+            and kwargs.get("method", "histogram") == "histogram"
+            and kwargs.get("sample_stride") is None
+            and kwargs.get("sample_planes") is None
+            and supports_histogram(dtype)
+        )
+
+    def _n_counted(self, histogram_path: Path) -> int:
+        if not histogram_path.exists():
+            return 0
+
+        return self.zarr.open_array(str(histogram_path), mode="r").attrs["n_timepoints"]
+
+    def _fit_source(
+        self, histogram_path: Path, movie: da.core.Array, axis: int, n_complete: int
+    ) -> Optional[da.core.Array]:
+        # Only histogram the source timepoints not counted in the running histogram
+        if self._uses_running_histogram(movie.dtype):
+            n_counted = self._n_counted(histogram_path)
+            return histogram(
+                movie[(slice(None),) * axis + (slice(n_counted, n_complete),)]
+            )
+
+        # Otherwise refit to the source data of every complete timepoint
+        fit = get_normalization_fit(self.normalization_func)
+        if fit is not None:
+            return fit(
+                data=movie[(slice(None),) * axis + (slice(0, n_complete),)],
+                **self.normalization_kwargs,
+            )
+
+        return None
+
+    def _get_norm_by(
+        self, histogram_path: Path, dtype: np.dtype, fitted: Any, n_complete: int
+    ) -> Optional[np.ndarray]:
+        # Add the newly read timepoints to the stored running histogram
+        if self._uses_running_histogram(dtype):
+            counts = fitted
+            if histogram_path.exists():
+                counts = counts + self.zarr.open_array(str(histogram_path), mode="r")[:]
+            store = self.zarr.open_array(
+                str(histogram_path), mode="w", shape=counts.shape, dtype=counts.dtype
+            )
+            store[:] = counts
+            store.attrs["n_timepoints"] = n_complete
+
+            offset, _ = histogram_range(dtype)
+            return histogram_percentiles(
+                counts,
+                [
+                    self.normalization_kwargs.get("min_p", 50.0),
+                    self.normalization_kwargs.get("max_p", 99.8),
+                ],
+                offset,
+            )
+
+        if fitted is not None:
+            return np.asarray(
+                finalize_normalization_fit(
+                    self.normalization_func, fitted, **self.normalization_kwargs
+                )
+            )
+
+        return None
+
+    def _needs_rerender(self, rendered_norm_by: Any, norm_by: Any) -> bool:
+        # Normalizing without bounds depends on every frame
+        if rendered_norm_by is None or norm_by is None:
+            return True
+
+        rendered_norm_by = np.asarray(rendered_norm_by, dtype=np.float64)
+        norm_by = np.asarray(norm_by, dtype=np.float64)
+        if rendered_norm_by.shape != norm_by.shape:
+            return True
+
+        tolerance = self.rerender_tolerance * np.ptp(rendered_norm_by)
+        return bool(np.max(np.abs(norm_by - rendered_norm_by)) > tolerance)
+
+    def _encode(self, movie_file: Path, frames: List[da.core.Array]):
+        write_movies(
+            [movie_file], [frames], fps=self.fps, writer_kwargs=self.writer_kwargs
+        )
+
+    def _render(
+        self, output_file: Path, store_path: Path, norm_by: Any, start: int = 0
+    ):
+        # Normalize the stored frames from the start frame
+        stored = da.from_zarr(str(store_path))
+        if norm_by is not None:
+            frames = [
+                self.normalization_func(
+                    data=stored[i], norm_by=norm_by, **self.normalization_kwargs
+                )
+                for i in range(start, stored.shape[0])
+            ]
+        else:
+            normed = self.normalization_func(data=stored, **self.normalization_kwargs)
+            frames = [normed[i] for i in range(start, normed.shape[0])]
+        frames = [
+            pad_frame(frame, self.writer_kwargs.get("macro_block_size"))
+            for frame in frames
+        ]
+
+        # Replace the previous preview only once the new one is complete, appending
+        # only the new frames to the previous preview when starting after its frames
+        partial = partial_file(output_file)
+        segment = partial_file(output_file) if start > 0 else partial
+        try:
+            self._encode(segment, frames)
+            if start > 0:
+                concat_movies([output_file, segment], partial)
+            os.replace(partial, output_file)
+        finally:
+            for f in {partial, segment}:
+                if f.exists():
+                    f.unlink()
+
+    def update(self) -> int:
+        """
+        Read, project, and store any new complete timepoints, refit the normalization
+        to the source data, then append the new frames to, or re-render, every preview
+        movie that has new frames.
+
+        Returns
+        -------
+        n_new: int
+            The number of new frames across all preview movies.
+        """
+        # The last timepoint may still be being written while the file grows
+        stat = os.stat(self.img)
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+        growing = fingerprint != self._last_stat
+        self._last_stat = fingerprint
+
+        data, dims = self._read()
+        n_timepoints = data.shape[dims.index(Dimensions.Time)]
+        n_complete = n_timepoints - 1 if growing else n_timepoints
+
+        # Get every scene and channel pair
+        getitem_indicies = generate_getitem_indicies(img_shape=data.shape, dims=dims)
+        selected_indices = generate_selected_dims_list(
+            dims=dims, getitem_indicies=getitem_indicies
+        )
+
+        # Project only the timepoints not stored yet
+        movies = []
+        for getitem_selection, selected in zip(getitem_indicies, selected_indices):
+            movie = data[getitem_selection]
+            movie_dims = "".join(dim for dim in dims if dim not in selected)
+            output_file = get_output_file(self.save_path, selected, self.save_format)
+            store_path = self._store_path(output_file)
+
+            axis = movie_dims.index(Dimensions.Time)
+            n_stored = self._n_stored(store_path)
+            new_frames = [
+                self.projection_func(
+                    data=movie[(slice(None),) * axis + (t,)],
+                    dims=movie_dims.replace(Dimensions.Time, ""),
+                    **self.projection_kwargs,
+                )
+                for t in range(n_stored, n_complete)
+            ]
+            if len(new_frames) > 0:
+                fitted = self._fit_source(
+                    self._histogram_path(output_file), movie, axis, n_complete
+                )
+                movies.append(
+                    (output_file, store_path, n_stored, movie.dtype, new_frames, fitted)
+                )
+
+        if len(movies) == 0:
+            return 0
+
+        # Compute the new frames and normalization fit of every movie together so
+        # that each chunk of the file is read once
+        computed = dask.compute(
+            *[(new_frames, fitted) for *_, new_frames, fitted in movies]
+        )
+
+        # Store the new frames and add them to each preview
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        n_new = 0
+        for (output_file, store_path, n_stored, dtype, *_), (new_frames, fitted) in zip(
+            movies, computed
+        ):
+            new_frames = np.stack(new_frames)
+            self._append(store_path, new_frames)
+            norm_by = self._get_norm_by(
+                self._histogram_path(output_file),
+                dtype,
+                fitted,
+                n_complete,
+            )
+
+            # Only encode the new frames, with the bounds the preview was rendered
+            # with, while the bounds haven't moved
+            n_rendered, rendered_norm_by = self._rendered.get(store_path, (0, None))
+            if (
+                n_rendered > 0
+                and n_rendered == n_stored
+                and output_file.exists()
+                and not self._needs_rerender(rendered_norm_by, norm_by)
+            ):
+                self._render(output_file, store_path, rendered_norm_by, n_rendered)
+            else:
+                self._render(output_file, store_path, norm_by)
+                rendered_norm_by = norm_by
+            self._rendered[store_path] = (n_stored + len(new_frames), rendered_norm_by)
+            n_new += len(new_frames)
+
+        log.info(f"Added {n_new} frame(s) to the previews of {self.img}")
+        return n_new
+
+
+def watch(
+    img: Union[str, Path],
+    save_path: Optional[Union[str, Path]] = None,
+    poll_interval: float = 30.0,
+    idle_timeout: Optional[float] = 600.0,
+    max_polls: Optional[int] = None,
+    **kwargs,
+) -> List[Path]:
+    """
+    Keep preview movies of a file, or of every CZI file in a directory, up to date
+    while they are being acquired.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        Path to a CZI file, or a directory of CZI files, to preview. New files added
+        to a directory are previewed from the next poll.
+    save_path: Optional[Union[str, Path]]
+        A specific path to save the preview movies of a file to. For a directory, the
+        path to save a directory of preview movies, named after each file, to.
+        Default: The current directory, in a directory named after each file.
+    poll_interval: float
+        The number of seconds to wait between polls.
+        Default: 30.0
+    idle_timeout: Optional[float]
+        Stop watching once no file has grown for this many seconds.
+        Default: 600.0 (ten minutes)
+    max_polls: Optional[int]
+        Stop watching after this many polls.
+        Default: None (only stop once idle)
+    kwargs:
+        Any other LivePreview arguments, applied to every file.
+
+    Returns
+    -------
+    save_paths: List[Path]
+        The path to each file's preview movies.
+    """
+    img = Path(img).expanduser().resolve(strict=True)
+    if save_path is not None:
+        save_path = Path(save_path).expanduser().resolve()
+
+    previews = {}
+    last_growth = time.monotonic()
+    n_polls = 0
+    while True:
+        # Find any new files
+        files = sorted(img.glob("*.czi")) if img.is_dir() else [img]
+        for f in files:
+            if f not in previews:
+                if img.is_dir():
+                    file_save_path = (save_path or Path.cwd()) / f.with_suffix("").name
+                else:
+                    file_save_path = save_path
+                previews[f] = LivePreview(f, save_path=file_save_path, **kwargs)
+
+        # Update every preview
+        for f, preview in previews.items():
+            try:
+                if preview.update() > 0:
+                    last_growth = time.monotonic()
+            except Exception as e:
+                log.error(f"Failed to update the previews of {f}: {e}")
+
+        # Stop once done polling or idle
+        n_polls += 1
+        if max_polls is not None and n_polls >= max_polls:
+            break
+        if idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout:
+            log.info(f"No new frames for {idle_timeout} seconds, stopped watching.")
+            break
+
+        time.sleep(poll_interval)
+
+    return [preview.save_path for preview in previews.values()]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Any, Callable, Optional
+
+###############################################################################
+
+
+def monotone_normalization(
+    fit: Callable, finalize: Optional[Callable] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Register a normalization function as a monotone non-decreasing per pixel map.
+
+    Registered normalization functions must accept a `norm_by` keyword argument, the
+    values returned by `fit`, and then only apply the per pixel map.
+
+    Parameters
+    ----------
+    fit: Callable
+        A function taking the same `data` and keyword arguments as the normalization
+        function that lazily computes the values to normalize by.
+    finalize: Optional[Callable]
+        A function run on the client with the computed `fit` values and the same
+        keyword arguments as the normalization function that returns the values to
+        normalize by. Used to report on the fit, e.g. the error of a sampled fit,
+        without side effects in the graph.
+        Default: None (the computed `fit` values are the values to normalize by)
+
+    Returns
+    -------
+    decorator: Callable[[Callable], Callable]
+        A decorator that registers the normalization function and sets its
+        `monotone`, `fit`, and `finalize` attributes.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.monotone = True
+        func.fit = fit
+        func.finalize = finalize
+        return func
+
+    return decorator
+
+
+def monotone_commuting_projection(func: Callable) -> Callable:
+    """
+    Register a projection function as commuting with any monotone non-decreasing per
+    pixel map, i.e. project(norm(data)) == norm(project(data)), such as a max or min
+    projection. Sets the function's `commutes_with_monotone` attribute.
+    """
+    func.commutes_with_monotone = True
+    return func
+
+
+def get_normalization_fit(normalization_func: Callable) -> Optional[Callable]:
+    """
+    Get the function that lazily computes the values to normalize by for a registered
+    monotone normalization function, or None if the function isn't registered.
+    """
+    if getattr(normalization_func, "monotone", False):
+        return getattr(normalization_func, "fit", None)
+
+    return None
+
+
+def finalize_normalization_fit(
+    normalization_func: Callable, values: Any, **kwargs
+) -> Any:
+    """
+    Get the values to normalize by from the computed `fit` values of a registered
+    monotone normalization function. Runs the function's `finalize` on the client if
+    it has one.
+
+    Parameters
+    ----------
+    normalization_func: Callable
+        The registered monotone normalization function.
+    values: Any
+        The computed values returned by the function's `fit`.
+    kwargs:
+        The keyword arguments of the normalization function.
+
+    Returns
+    -------
+    norm_by: Any
+        The values to normalize by.
+    """
+    finalize = getattr(normalization_func, "finalize", None)
+    if finalize is None:
+        return values
+
+    return finalize(values, **kwargs)
+
+
+def can_project_first(normalization_func: Callable, projection_func: Callable) -> bool:
+    """
+    Check if projecting the raw data and then normalizing the projection gives the
+    same result as normalizing the data and then projecting.
+
+    Parameters
+    ----------
+    normalization_func: Callable
+        The normalization function to check.
+    projection_func: Callable
+        The projection function to check.
+
+    Returns
+    -------
+    project_first: bool
+        True if the normalization function is a registered monotone normalization and
+        the projection function is a registered monotone commuting projection.
+    """
+    return get_normalization_fit(normalization_func) is not None and getattr(
+        projection_func, "commutes_with_monotone", False
+    )
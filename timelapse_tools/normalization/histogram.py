@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple, Union
+
+import dask.array as da
+import numpy as np
+
+###############################################################################
+
+# Integer dtypes larger than this would need too many bins to histogram exactly
+MAX_HISTOGRAM_ITEMSIZE = 2
+
+###############################################################################
+
+
+def supports_histogram(dtype: np.dtype) -> bool:
+    """
+    Check if a dtype can be exactly histogrammed with a single bin per value.
+
+    Parameters
+    ----------
+    dtype: np.dtype
+        The dtype to check.
+
+    Returns
+    -------
+    supported: bool
+        True if the dtype is an integer dtype of at most 16 bits.
+    """
+    dtype = np.dtype(dtype)
+    return np.issubdtype(dtype, np.integer) and dtype.itemsize <= MAX_HISTOGRAM_ITEMSIZE
+
+
+def histogram_range(dtype: np.dtype) -> Tuple[int, int]:
+    """
+    Get the value offset and number of bins for an exact histogram of a dtype.
+
+    Parameters
+    ----------
+    dtype: np.dtype
+        The integer dtype to get the histogram range for.
+
+    Returns
+    -------
+    offset: int
+        The value of the first bin.
+    n_bins: int
+        The number of bins, one for every value the dtype can hold.
+    """
+    if not supports_histogram(dtype):
+        raise TypeError(
+            f"Exact histograms are only supported for integer dtypes of at most "
+            f"{MAX_HISTOGRAM_ITEMSIZE * 8} bits. Received: {dtype}."
+        )
+
+    info = np.iinfo(dtype)
+    return int(info.min), int(info.max) - int(info.min) + 1
+
+
+def _block_histogram(block: np.ndarray, offset: int, n_bins: int) -> np.ndarray:
+    # Shift signed values to start at zero then count every value
+    values = block.ravel().astype(np.int64) - offset
+    counts = np.bincount(values, minlength=n_bins)
+
+    # Keep a length one dimension for every block dimension so that the
+    # histograms can be summed across blocks
+    return counts.reshape((1,) * block.ndim + (n_bins,))
+
+
+def histogram(data: da.core.Array, split_every: int = 8) -> da.core.Array:
+    """
+    Lazily count every value in an integer array.
+
+    Each chunk is histogrammed independently and the chunk histograms are summed by a
+    tree reduction, so the histogram can be computed alongside any other reductions of
+    the same array from a single read of each chunk.
+
+    Parameters
+    ----------
+    data: da.core.Array
+        The integer array to histogram.
+    split_every: int
+        The number of chunk histograms to sum together at each level of the tree
+        reduction.
+        Default: 8
+
+    Returns
+    -------
+    counts: da.core.Array
+        The count of every value the data dtype can hold, starting at
+        histogram_range(data.dtype)[0].
+    """
+    offset, n_bins = histogram_range(data.dtype)
+
+    # Histogram every chunk
+    block_counts = data.map_blocks(
+        _block_histogram,
+        offset,
+        n_bins,
+        chunks=tuple((1,) * len(dim_chunks) for dim_chunks in data.chunks)
+        + ((n_bins,),),
+        new_axis=data.ndim,
+        dtype=np.int64,
+    )
+
+    # Sum the chunk histograms
+    return block_counts.sum(axis=tuple(range(data.ndim)), split_every=split_every)
+
+
+def histogram_percentiles(
+    counts: np.ndarray, percentiles: Union[List[float], Tuple[float]], offset: int = 0
+) -> np.ndarray:
+    """
+    Compute percentiles from a value histogram.
+
+    The percentiles are interpolated between the closest ranks the same way
+    numpy.percentile does so for integer data the result is exact.
+
+    Parameters
+    ----------
+    counts: np.ndarray
+        The count of every value.
+    percentiles: Union[List[float], Tuple[float]]
+        The percentiles to compute, between 0 and 100.
+    offset: int
+        The value of the first bin.
+        Default: 0
+
+    Returns
+    -------
+    values: np.ndarray
+        The value at each percentile.
+    """
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    if total == 0:
+        raise ValueError("Cannot compute percentiles of an empty histogram.")
+
+    # Get the rank of each percentile in the sorted values
+    ranks = np.asarray(percentiles, dtype=np.float64) / 100 * (total - 1)
+    lower_ranks = np.floor(ranks)
+    upper_ranks = np.ceil(ranks)
+
+    # The value at a rank is the first bin whose cumulative count passes it
+    lower = np.searchsorted(cumulative, lower_ranks, side="right") + offset
+    upper = np.searchsorted(cumulative, upper_ranks, side="right") + offset
+
+    return lower + (upper - lower) * (ranks - lower_ranks)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, Union
+
+import dask.array as da
+import numpy as np
+
+from .histogram import histogram_range
+
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+
+###############################################################################
+
+
+def build_uint8_lut(
+    norm_by: Tuple[float, float], dtype: np.dtype
+) -> Tuple[np.ndarray, int]:
+    """
+    Build a lookup table mapping every value of an integer dtype to the uint8 value
+    it would have after being normalized between two bounds, clipped, scaled to 255,
+    and cast to uint8.
+
+    Parameters
+    ----------
+    norm_by: Tuple[float, float]
+        The values to map to 0 and 255.
+    dtype: np.dtype
+        The integer dtype of the data the table will be applied to.
+
+    Returns
+    -------
+    lut: np.ndarray
+        The uint8 value for every value the dtype can hold, starting at offset.
+    offset: int
+        The value of the first entry in the table.
+    """
+    offset, n_entries = histogram_range(dtype)
+    values = np.arange(offset, offset + n_entries, dtype=np.float64)
+
+    # Same operations as the float normalization
+    normed = (values - norm_by[0]) / (norm_by[1] - norm_by[0])
+    return (np.clip(normed, 0, 1) * 255).astype(np.uint8), offset
+
+
+def _apply_lut(data: np.ndarray, lut: np.ndarray, offset: int) -> np.ndarray:
+    # Unsigned data can index the table directly
+    if offset == 0:
+        return lut[data]
+
+    return lut[data.astype(np.int64) - offset]
+
+
+def apply_lut(data: Array, lut: np.ndarray, offset: int = 0) -> Array:
+    """
+    Map integer data through a lookup table.
+
+    Parameters
+    ----------
+    data: Union[da.core.Array, np.ndarray]
+        The integer data to map.
+    lut: np.ndarray
+        The lookup table.
+    offset: int
+        The value of the first entry in the table.
+        Default: 0
+
+    Returns
+    -------
+    mapped: Union[da.core.Array, np.ndarray]
+        The mapped data, with the same shape as the input and the dtype of the table.
+    """
+    if isinstance(data, da.core.Array):
+        return data.map_blocks(_apply_lut, lut, offset, dtype=lut.dtype)
+
+    return _apply_lut(data, lut, offset)
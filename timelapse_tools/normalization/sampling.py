@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .. import exceptions
+
+###############################################################################
+
+
+def sample_plane_indices(
+    plane_shape: Tuple[int],
+    sample_stride: Optional[int] = None,
+    sample_planes: Optional[int] = None,
+    seed: int = 0,
+) -> List[Tuple[int]]:
+    """
+    Select a subset of the planes of an array to sample.
+
+    Parameters
+    ----------
+    plane_shape: Tuple[int]
+        The shape of the array excluding the Y and X dimensions.
+    sample_stride: Optional[int]
+        Select every Nth plane, counting through the planes in C order.
+        Default: None
+    sample_planes: Optional[int]
+        Select this many planes at random.
+        Default: None
+    seed: int
+        The seed for the random plane selection.
+        Default: 0
+
+    Returns
+    -------
+    plane_indices: List[Tuple[int]]
+        The sorted index of each selected plane.
+    """
+    if sample_stride is not None and sample_planes is not None:
+        raise exceptions.ConflictingArgumentsError(
+            f"Only one of `sample_stride` and `sample_planes` may be provided. "
+            f"Received sample_stride: {sample_stride}, sample_planes: {sample_planes}."
+        )
+
+    # Select the flat plane indices
+    n_planes = int(np.prod(plane_shape))
+    if sample_stride is not None:
+        if sample_stride < 1:
+            raise ValueError(
+                f"The sample stride must be a positive integer. "
+                f"Received: {sample_stride}."
+            )
+        flat_indices = np.arange(0, n_planes, sample_stride)
+    elif sample_planes is not None:
+        if sample_planes < 1:
+            raise ValueError(
+                f"The number of sample planes must be a positive integer. "
+                f"Received: {sample_planes}."
+            )
+        flat_indices = np.sort(
+            np.random.RandomState(seed).choice(
+                n_planes, size=min(sample_planes, n_planes), replace=False
+            )
+        )
+    else:
+        flat_indices = np.arange(n_planes)
+
+    # Convert back to multi-dimensional plane indices
+    return [
+        tuple(int(i) for i in np.unravel_index(flat_index, plane_shape))
+        for flat_index in flat_indices
+    ]
+
+
+def percentile_confidence_interval(
+    percentiles: Union[List[float], Tuple[float]],
+    n_samples: int,
+    z: float = 1.96,
+) -> np.ndarray:
+    """
+    Estimate the range of percentiles, of the full data, a percentile computed from a
+    sample could correspond to.
+
+    This uses the normal approximation to the standard error of a sample quantile,
+    sqrt(p * (1 - p) / n), where n is the number of independent samples. Pixels within
+    a plane are strongly correlated so the number of sampled planes should be used
+    as n rather than the number of sampled pixels.
+
+    Parameters
+    ----------
+    percentiles: Union[List[float], Tuple[float]]
+        The percentiles computed from the sample, between 0 and 100.
+    n_samples: int
+        The number of independent samples.
+    z: float
+        The standard score of the interval.
+        Default: 1.96 (95% confidence)
+
+    Returns
+    -------
+    intervals: np.ndarray
+        The lower and upper percentile for each provided percentile, clipped to the
+        range 0 to 100.
+    """
+    quantiles = np.asarray(percentiles, dtype=np.float64) / 100
+    standard_errors = np.sqrt(quantiles * (1 - quantiles) / n_samples)
+    intervals = np.stack(
+        [quantiles - z * standard_errors, quantiles + z * standard_errors], axis=-1
+    )
+
+    return np.clip(intervals * 100, 0, 100)
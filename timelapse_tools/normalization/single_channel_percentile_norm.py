@@ -1,28 +1,247 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
 import dask.array as da
+import numpy as np
 
 from .. import exceptions
+from ..monotone import monotone_normalization
+from ..utils import instrumentation
+from ..utils.instrumentation import Stages, timer
+from .histogram import histogram, histogram_percentiles, histogram_range
+from .histogram import supports_histogram
+from .lut import apply_lut, build_uint8_lut
+from .sampling import percentile_confidence_interval, sample_plane_indices
 
 ###############################################################################
 
+log = logging.getLogger(__name__)
 
-def single_channel_percentile_norm(
-    data: da.core.Array, min_p: float = 50.0, max_p: float = 99.8, **kwargs
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+
+###############################################################################
+
+
+def percentile_norm_by(
+    data: da.core.Array,
+    min_p: float = 50.0,
+    max_p: float = 99.8,
+    method: str = "histogram",
+    sample_stride: Optional[int] = None,
+    sample_planes: Optional[int] = None,
+    seed: int = 0,
+    **kwargs,
 ) -> da.core.Array:
+    """
+    Lazily compute the values to normalize by for single_channel_percentile_norm.
+
+    Parameters
+    ----------
+    data: da.core.Array
+        The data to compute percentiles of.
+    min_p: float
+        The percentile to use as the lower normalization bound.
+        Default: 50.0
+    max_p: float
+        The percentile to use as the upper normalization bound.
+        Default: 99.8
+    method: str
+        "histogram" to compute exact percentiles from a histogram of the data, or
+        "dask" to use dask.array.percentile. Data that isn't an integer dtype of at
+        most 16 bits always uses "dask".
+        Default: "histogram"
+    sample_stride: Optional[int]
+        Only compute the percentiles from every Nth YX plane of the data.
+        Default: None (use every plane)
+    sample_planes: Optional[int]
+        Only compute the percentiles from this many randomly selected YX planes of the
+        data.
+        Default: None (use every plane)
+    seed: int
+        The seed for the random plane selection.
+        Default: 0
+
+    Returns
+    -------
+    values: da.core.Array
+        The lower and upper normalization bounds. When sampling, followed by the
+        lower and upper edges of the estimated 95% confidence interval of each bound.
+        See report_sample_error to get only the bounds and the sampling error.
+
+    Notes
+    -----
+    When sampling, the number of selected planes is logged. See
+    percentile_confidence_interval for details of the confidence intervals.
+    """
+    if method not in ("histogram", "dask"):
+        raise ValueError(
+            f"Invalid percentile method provided. "
+            f"Provided: '{method}'. Valid methods: 'histogram', 'dask'."
+        )
+
+    percentiles = [min_p, max_p]
+
+    # Select down to only the sampled planes
+    sampling = sample_stride is not None or sample_planes is not None
+    if sampling:
+        plane_shape = data.shape[:-2]
+        plane_indices = sample_plane_indices(
+            plane_shape=plane_shape,
+            sample_stride=sample_stride,
+            sample_planes=sample_planes,
+            seed=seed,
+        )
+        log.info(
+            f"Computing percentiles from {len(plane_indices)} of "
+            f"{int(np.prod(plane_shape))} planes."
+        )
+        log.debug(f"Sampled planes: {plane_indices}")
+        data = da.stack([data[plane_index] for plane_index in plane_indices])
+
+        # Also compute the values at the edges of the bounds confidence intervals
+        intervals = percentile_confidence_interval(percentiles, len(plane_indices))
+        percentiles = percentiles + intervals.ravel().tolist()
+
+    # Compute exact percentiles from the value histogram
+    if method == "histogram" and supports_histogram(data.dtype):
+        offset, n_bins = histogram_range(data.dtype)
+        values = histogram(data).map_blocks(
+            histogram_percentiles,
+            percentiles,
+            offset,
+            chunks=((len(percentiles),),),
+            dtype=np.float64,
+        )
+    else:
+        values = da.percentile(data.flatten(), percentiles)
+
+    return values
+
+
+def sample_error(
+    values: np.ndarray, min_p: float = 50.0, max_p: float = 99.8
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the estimated error of normalization bounds computed from a sample of planes.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        The computed values returned by percentile_norm_by.
+    min_p: float
+        The percentile of the lower bound.
+        Default: 50.0
+    max_p: float
+        The percentile of the upper bound.
+        Default: 99.8
+
+    Returns
+    -------
+    error: Optional[Dict[str, Any]]
+        The percentile, value, and 95% confidence interval of the "lower" and "upper"
+        bounds, or None if the bounds weren't computed from a sample.
+    """
+    values = np.asarray(values)
+    if len(values) <= 2:
+        return None
+
+    return {
+        bound: {
+            "percentile": percentile,
+            "value": float(values[i]),
+            "confidence_interval": [float(v) for v in values[2 + i * 2 : 4 + i * 2]],
+        }
+        for i, (bound, percentile) in enumerate([("lower", min_p), ("upper", max_p)])
+    }
+
+
+def report_sample_error(
+    values: np.ndarray, min_p: float = 50.0, max_p: float = 99.8, **kwargs
+) -> np.ndarray:
+    """
+    Get the normalization bounds from the computed values of percentile_norm_by, on
+    the client, logging the estimated error of sampled bounds and adding it to any
+    recorded run report under "percentile_sample_error".
+
+    Parameters
+    ----------
+    values: np.ndarray
+        The computed values returned by percentile_norm_by.
+    min_p: float
+        The percentile of the lower bound.
+        Default: 50.0
+    max_p: float
+        The percentile of the upper bound.
+        Default: 99.8
+    kwargs:
+        Any other single_channel_percentile_norm arguments, ignored.
+
+    Returns
+    -------
+    norm_by: np.ndarray
+        The lower and upper normalization bounds.
+    """
+    error = sample_error(values, min_p, max_p)
+    if error is not None:
+        for bound, estimate in error.items():
+            interval_lower, interval_upper = estimate["confidence_interval"]
+            log.info(
+                f"{bound.capitalize()} bound (percentile {estimate['percentile']}) "
+                f"estimated from sample: {estimate['value']}. 95% confidence "
+                f"interval: {interval_lower} to {interval_upper}."
+            )
+        instrumentation.record_value("percentile_sample_error", error)
+
+    return np.asarray(values)[:2]
+
+
+@monotone_normalization(fit=percentile_norm_by, finalize=report_sample_error)
+def single_channel_percentile_norm(
+    data: Array,
+    min_p: float = 50.0,
+    max_p: float = 99.8,
+    method: str = "histogram",
+    sample_stride: Optional[int] = None,
+    sample_planes: Optional[int] = None,
+    seed: int = 0,
+    norm_by: Optional[Tuple[float, float]] = None,
+    lut: bool = False,
+    **kwargs,
+) -> Array:
     # Enforce shape
     if len(data.shape) > 4:
         raise exceptions.InvalidShapeError(len(data.shape), 4)
 
     # Get the norm by values
-    norm_by = da.percentile(data.flatten(), [min_p, min_p]).compute()
+    if norm_by is None:
+        with timer(Stages.Normalize):
+            values = percentile_norm_by(
+                data=data,
+                min_p=min_p,
+                max_p=max_p,
+                method=method,
+                sample_stride=sample_stride,
+                sample_planes=sample_planes,
+                seed=seed,
+            ).compute()
+        norm_by = report_sample_error(values, min_p, max_p)
+
+    # Map integer data straight to uint8 with a lookup table rather than normalizing
+    # in float. Any projection after this should be done on the uint8 values.
+    if lut and supports_histogram(data.dtype):
+        table, offset = build_uint8_lut(norm_by, data.dtype)
+        return apply_lut(data, table, offset)
 
     # Norm
     normed = (data - norm_by[0]) / (norm_by[1] - norm_by[0])
 
     # Clip any values outside of 0 and 1
-    clipped = da.clip(normed, 0, 1)
+    clipped = normed.clip(0, 1)
 
     # Scale them between 0 and 255
     return clipped * 255
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import dask.array as da
+import numpy as np
+
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+Color = Union[str, Tuple[int, int, int]]
+
+###############################################################################
+
+# Named colors that can be used for channels
+NAMED_COLORS = {
+    "red": (255, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+    "yellow": (255, 255, 0),
+    "white": (255, 255, 255),
+    "gray": (255, 255, 255),
+    "grey": (255, 255, 255),
+}
+
+# Colors used for each channel when none are provided
+DEFAULT_CHANNEL_COLORS = ("magenta", "green", "cyan", "yellow", "red", "blue", "white")
+
+###############################################################################
+
+
+def parse_color(color: Color) -> np.ndarray:
+    """
+    Convert a color to RGB values between 0 and 255.
+
+    Parameters
+    ----------
+    color: Union[str, Tuple[int, int, int]]
+        A color name (see NAMED_COLORS), a hex string (e.g. "#ff00ff"), or RGB values
+        between 0 and 255.
+
+    Returns
+    -------
+    rgb: np.ndarray
+        The red, green, and blue values of the color.
+    """
+    if isinstance(color, str):
+        if color.lower() in NAMED_COLORS:
+            return np.array(NAMED_COLORS[color.lower()], dtype=np.float32)
+
+        hex_color = color.lstrip("#")
+        if len(hex_color) == 6:
+            try:
+                return np.array(
+                    [int(hex_color[i : i + 2], 16) for i in range(0, 6, 2)],
+                    dtype=np.float32,
+                )
+            except ValueError:
+                pass
+
+        raise ValueError(
+            f"Invalid color provided. "
+            f"Provided: '{color}'. "
+            f"Valid colors: a hex string or one of {list(NAMED_COLORS)}."
+        )
+
+    rgb = np.asarray(color, dtype=np.float32)
+    if rgb.shape != (3,) or np.any(rgb < 0) or np.any(rgb > 255):
+        raise ValueError(
+            f"Colors must be three RGB values between 0 and 255. Received: {color}."
+        )
+
+    return rgb
+
+
+def get_channel_colors(
+    n_channels: int, channel_colors: Optional[Sequence[Color]] = None
+) -> List[np.ndarray]:
+    """
+    Get the RGB color of every channel.
+
+    Parameters
+    ----------
+    n_channels: int
+        The number of channels.
+    channel_colors: Optional[Sequence[Union[str, Tuple[int, int, int]]]]
+        A color for every channel. See parse_color for valid colors.
+        Default: None (DEFAULT_CHANNEL_COLORS, or white for a single channel)
+
+    Returns
+    -------
+    colors: List[np.ndarray]
+        The RGB values of each channel's color.
+    """
+    if channel_colors is None:
+        if n_channels == 1:
+            channel_colors = ["white"]
+        elif n_channels <= len(DEFAULT_CHANNEL_COLORS):
+            channel_colors = DEFAULT_CHANNEL_COLORS[:n_channels]
+        else:
+            raise ValueError(
+                f"Only {len(DEFAULT_CHANNEL_COLORS)} channels have default colors. "
+                f"Provide channel colors for all {n_channels} channels."
+            )
+
+    if len(channel_colors) != n_channels:
+        raise ValueError(
+            f"A color must be provided for every channel. "
+            f"Received {len(channel_colors)} colors for {n_channels} channels."
+        )
+
+    return [parse_color(color) for color in channel_colors]
+
+
+def composite(channels: Sequence[Array], colors: Sequence[np.ndarray]) -> Array:
+    """
+    Additively blend normalized single channel frames into an RGB frame.
+
+    Parameters
+    ----------
+    channels: Sequence[Union[da.core.Array, np.ndarray]]
+        A normalized YX frame, with values between 0 and 255, for each channel.
+    colors: Sequence[np.ndarray]
+        The RGB color of each channel. See get_channel_colors.
+
+    Returns
+    -------
+    rgb: Union[da.core.Array, np.ndarray]
+        The YX RGB frame, with values between 0 and 255.
+    """
+    blended = None
+    for channel, color in zip(channels, colors):
+        colored = channel[..., None] * (color / 255)
+        blended = colored if blended is None else blended + colored
+
+    return blended.clip(0, 255)
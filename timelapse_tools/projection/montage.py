@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from typing import Optional, Sequence, Union
+
+import dask.array as da
+import numpy as np
+
+from ..utils.downsampling import block_mean
+
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+
+###############################################################################
+
+
+def downsample(frame: Array, factor: int = 1) -> Array:
+    """
+    Downsample the YX dimensions of a frame by averaging blocks of pixels.
+
+    Parameters
+    ----------
+    frame: Union[da.core.Array, np.ndarray]
+        A YX (or YX RGB) frame.
+    factor: int
+        The number of pixels along Y and X to average into a single pixel. Any rows or
+        columns that don't fill a whole block are dropped.
+        Default: 1 (no downsampling)
+
+    Returns
+    -------
+    downsampled: Union[da.core.Array, np.ndarray]
+        The downsampled frame, with the same dtype as the frame.
+    """
+    if factor < 1:
+        raise ValueError(
+            f"The downsample factor must be a positive integer. Received: {factor}."
+        )
+    if factor == 1:
+        return frame
+
+    return block_mean(frame, factor, axes=(0, 1))
+
+
+def montage(
+    frames: Sequence[Array], columns: Optional[int] = None, gap: int = 0
+) -> da.core.Array:
+    """
+    Tile frames of the same shape into a grid, row by row.
+
+    Parameters
+    ----------
+    frames: Sequence[Union[da.core.Array, np.ndarray]]
+        The YX (or YX RGB) frames to tile.
+    columns: Optional[int]
+        The number of frames in each row of the grid.
+        Default: None (the smallest square grid that fits every frame)
+    gap: int
+        The number of blank pixels between tiles.
+        Default: 0
+
+    Returns
+    -------
+    grid: da.core.Array
+        The tiled frame. Grid cells without a frame are blank.
+    """
+    if len(frames) == 0:
+        raise ValueError("At least one frame is needed to build a montage.")
+    shapes = set(frame.shape for frame in frames)
+    if len(shapes) > 1:
+        raise ValueError(
+            f"Every frame of a montage must have the same shape. "
+            f"Received frames with shapes: {shapes}."
+        )
+
+    # Get grid size
+    if columns is None:
+        columns = math.ceil(math.sqrt(len(frames)))
+    if columns < 1:
+        raise ValueError(
+            f"The number of montage columns must be a positive integer. "
+            f"Received: {columns}."
+        )
+    rows = math.ceil(len(frames) / columns)
+
+    frame_shape = shapes.pop()
+    dtype = np.result_type(*[frame.dtype for frame in frames])
+
+    def _blank(height, width):
+        return da.zeros((height, width) + frame_shape[2:], dtype=dtype)
+
+    # Fill every cell of the grid, separating cells with gaps
+    rows_of_cells = []
+    for row in range(rows):
+        if row > 0 and gap > 0:
+            rows_of_cells.append(
+                _blank(gap, columns * frame_shape[1] + (columns - 1) * gap)
+            )
+
+        cells = []
+        for column in range(columns):
+            if column > 0 and gap > 0:
+                cells.append(_blank(frame_shape[0], gap))
+
+            i = row * columns + column
+            if i < len(frames):
+                cells.append(da.asarray(frames[i]).astype(dtype))
+            else:
+                cells.append(_blank(*frame_shape[:2]))
+
+        # Join along X
+        rows_of_cells.append(da.concatenate(cells, axis=1))
+
+    # Join along Y
+    return da.concatenate(rows_of_cells, axis=0)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple, Union
+
+import dask.array as da
+import numpy as np
+
+from .. import exceptions
+
+###############################################################################
+
+# Projections that don't need to be normalized for display
+DISPLAY_READY_PROJECTIONS = set(("argmax",))
+
+###############################################################################
+
+
+def _argmax_depth(data: da.core.Array, axis: int) -> da.core.Array:
+    # Code the index of the brightest plane between 0 and 255
+    return data.argmax(axis) * (255 / max(data.shape[axis] - 1, 1))
+
+
+# Every available reduction along a single axis
+PROJECTIONS = {
+    "max": lambda data, axis: data.max(axis),
+    "mean": lambda data, axis: data.mean(axis, dtype=np.float32),
+    "sum": lambda data, axis: data.sum(axis),
+    "min": lambda data, axis: data.min(axis),
+    "std": lambda data, axis: data.std(axis, dtype=np.float32),
+    "argmax": _argmax_depth,
+}
+
+###############################################################################
+
+
+def multi_project(
+    data: da.core.Array,
+    dims: str,
+    projections: Union[List[str], Tuple[str]] = ("max", "mean"),
+    project_dim: str = "Z",
+    **kwargs,
+) -> Dict[str, da.core.Array]:
+    """
+    Project the same data with multiple reductions.
+
+    Every projection is built from the same array so computing them together, e.g.
+    with a single dask.compute call, reads the data once.
+
+    Parameters
+    ----------
+    data: da.core.Array
+        The data to project, at most three dimensions.
+    dims: str
+        The dimension order of the data.
+    projections: Union[List[str], Tuple[str]]
+        Which projections to compute. Any of: "max", "mean", "sum", "min", "std", and
+        "argmax" (the index of the brightest plane coded between 0 and 255).
+        Default: ("max", "mean")
+    project_dim: str
+        Which dimension to project along.
+        Default: "Z"
+
+    Returns
+    -------
+    projected: Dict[str, da.core.Array]
+        Each projection of the data.
+    """
+    # Check shape
+    if len(data.shape) > 3:
+        raise exceptions.InvalidShapeError(len(data.shape), 3)
+
+    # Check projections
+    for projection in projections:
+        if projection not in PROJECTIONS:
+            raise ValueError(
+                f"Invalid projection provided. "
+                f"Provided: '{projection}'. "
+                f"Valid projections: {list(PROJECTIONS)}."
+            )
+
+    # If shape is three, we know we need to project
+    if len(data.shape) == 3:
+        axis = dims.index(project_dim)
+        return {
+            projection: PROJECTIONS[projection](data, axis)
+            for projection in projections
+        }
+
+    # If it is less than three, it's two and each projection is just the data
+    return {
+        projection: (
+            da.zeros_like(data, dtype=np.uint8) if projection == "argmax" else data
+        )
+        for projection in projections
+    }
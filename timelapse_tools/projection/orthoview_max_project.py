@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+
+from .. import exceptions
+
+###############################################################################
+
+
+def orthoview_max_project(
+    data: da.core.Array,
+    dims: str,
+    max_project_dim: str = "Z",
+    z_scale: float = 1.0,
+    gap: int = 4,
+    **kwargs,
+) -> da.core.Array:
+    """
+    Max project a stack along each spatial axis and tile the projections into a single
+    orthogonal view frame.
+
+    The XY projection is placed in the top left, the YZ projection to its right, and
+    the XZ projection below it. All three projections are built from the same data so
+    each stack is only read once.
+
+    The gaps between the projections are zeros, so normalizing the projected frame
+    doesn't give the same frame as projecting normalized data. The function is not
+    registered as commuting with monotone normalizations for this reason.
+
+    Parameters
+    ----------
+    data: da.core.Array
+        The stack to project, at most three dimensions.
+    dims: str
+        The dimension order of the data.
+    max_project_dim: str
+        The depth dimension of the stack.
+        Default: "Z"
+    z_scale: float
+        How many times larger the physical size of a step along the depth dimension is
+        than the size of an X or Y pixel. The side views are resampled along the depth
+        dimension by this factor so they are displayed with the correct aspect ratio.
+        generate_movies defaults this to timelapse_tools.utils.czi_metadata.z_anisotropy
+        for files with Z scaling.
+        Default: 1.0
+    gap: int
+        The number of blank pixels between the tiled projections.
+        Default: 4
+
+    Returns
+    -------
+    orthoview: da.core.Array
+        The tiled projections, with shape
+        (Y + gap + Z * z_scale, X + gap + Z * z_scale).
+    """
+    # Check shape
+    if len(data.shape) > 3:
+        raise exceptions.InvalidShapeError(len(data.shape), 3)
+
+    # If it is less than three, it's two and just return
+    if len(data.shape) < 3:
+        return data
+
+    # Reorder to depth, Y, X
+    yx_dims = [dim for dim in dims if dim != max_project_dim]
+    data = data.transpose(
+        [dims.index(max_project_dim)] + [dims.index(dim) for dim in yx_dims]
+    )
+    n_planes, size_y, size_x = data.shape
+
+    # Project along each axis
+    xy = data.max(0)
+    xz = data.max(1)
+    yz = data.max(2).T
+
+    # Resample the depth axis of the side views by nearest neighbor
+    n_scaled_planes = max(int(round(n_planes * z_scale)), 1)
+    plane_indices = np.minimum(
+        (np.arange(n_scaled_planes) / z_scale).astype(int), n_planes - 1
+    )
+    xz = xz[plane_indices, :]
+    yz = yz[:, plane_indices]
+
+    # Tile the views
+    def _blank(shape):
+        return da.zeros(shape, dtype=data.dtype)
+
+    return da.block(
+        [
+            [xy, _blank((size_y, gap)), yz],
+            [
+                _blank((gap, size_x)),
+                _blank((gap, gap)),
+                _blank((gap, n_scaled_planes)),
+            ],
+            [
+                xz,
+                _blank((n_scaled_planes, gap)),
+                _blank((n_scaled_planes, n_scaled_planes)),
+            ],
+        ]
+    )
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Callable, List, Union
+
+import dask.array as da
+import numpy as np
+
+from ..utils.downsampling import block_mean, rounded_mean
+from .orthoview_max_project import orthoview_max_project
+from .single_channel_max_project import single_channel_max_project
+
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+
+###############################################################################
+
+# Reductions used to combine each block of pixels into a pixel of the next level
+PYRAMID_METHODS = {
+    "mean": rounded_mean,
+    "max": np.max,
+    "min": np.min,
+    "nearest": None,
+}
+
+# Projections whose frames keep their meaning with a reduction other than the mean
+PROJECTION_PYRAMID_METHODS = {
+    "max": "max",
+    "min": "min",
+    # Depth indices can't be averaged
+    "argmax": "nearest",
+    single_channel_max_project: "max",
+    orthoview_max_project: "max",
+}
+
+###############################################################################
+
+
+def get_pyramid_method(projection: Union[str, Callable]) -> str:
+    """
+    Get the pyramid method that best preserves the frames of a projection.
+
+    Parameters
+    ----------
+    projection: Union[str, Callable]
+        A projection name (see multi_projection.PROJECTIONS) or a projection
+        function.
+
+    Returns
+    -------
+    method: str
+        The pyramid method. "mean" for any projection without a known method.
+    """
+    return PROJECTION_PYRAMID_METHODS.get(projection, "mean")
+
+
+def downsample_frame(frame: Array, factor: int = 2, method: str = "mean") -> Array:
+    """
+    Downsample the last two (YX) dimensions of a frame by reducing blocks of pixels.
+
+    Parameters
+    ----------
+    frame: Union[da.core.Array, np.ndarray]
+        The frame to downsample. Any leading dimensions are kept.
+    factor: int
+        The number of pixels along Y and X to reduce into a single pixel. Any rows or
+        columns that don't fill a whole block are dropped.
+        Default: 2
+    method: str
+        How to reduce each block. "mean" for intensities, "max" or "min" to keep the
+        brightest or dimmest pixel of each block, or "nearest" to keep the top left
+        pixel of each block.
+        Default: "mean"
+
+    Returns
+    -------
+    downsampled: da.core.Array
+        The downsampled frame, with the same dtype as the frame.
+    """
+    if method not in PYRAMID_METHODS:
+        raise ValueError(
+            f"Invalid pyramid method provided. "
+            f"Provided: '{method}'. "
+            f"Valid methods: {list(PYRAMID_METHODS)}."
+        )
+    if factor < 1:
+        raise ValueError(
+            f"The downsample factor must be a positive integer. Received: {factor}."
+        )
+    if min(frame.shape[-2:]) < factor:
+        raise ValueError(
+            f"Frames of {frame.shape[-2:]} pixels are too small to downsample by "
+            f"{factor}."
+        )
+
+    # Keep the top left pixel of every whole block
+    frame = da.asarray(frame)
+    if factor == 1 or method == "nearest":
+        height, width = (size // factor * factor for size in frame.shape[-2:])
+        return frame[..., :height:factor, :width:factor]
+
+    return block_mean(frame, factor, reduction=PYRAMID_METHODS[method])
+
+
+def build_pyramid(frame: Array, n_levels: int, method: str = "mean") -> List[Array]:
+    """
+    Build every level of a pyramid of a frame, each downsampled by 2 from the level
+    before it.
+
+    Parameters
+    ----------
+    frame: Union[da.core.Array, np.ndarray]
+        The full resolution frame.
+    n_levels: int
+        The number of levels, including the full resolution frame.
+    method: str
+        How to reduce each block of pixels. See downsample_frame.
+        Default: "mean"
+
+    Returns
+    -------
+    levels: List[Union[da.core.Array, np.ndarray]]
+        The frame at every level. Every level is built from the one before it so
+        computing all levels together only computes the frame once.
+    """
+    if n_levels < 1:
+        raise ValueError(
+            f"The number of pyramid levels must be a positive integer. "
+            f"Received: {n_levels}."
+        )
+
+    levels = [frame]
+    for level in range(1, n_levels):
+        levels.append(downsample_frame(levels[-1], 2, method))
+
+    return levels
@@ -4,10 +4,12 @@
 import dask.array as da
 
 from .. import exceptions
+from ..monotone import monotone_commuting_projection
 
 ###############################################################################
 
 
+@monotone_commuting_projection
 def single_channel_max_project(
     data: da.core.Array, dims: str, max_project_dim: str = "Z", **kwargs
 ) -> da.core.Array:
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools import exceptions
+from timelapse_tools.normalization import histogram, sampling
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    percentile_norm_by,
+    report_sample_error,
+    single_channel_percentile_norm,
+)
+from timelapse_tools.utils import instrumentation
+
+###############################################################################
+
+
+def _random_data(dtype, shape=(3, 2, 16, 16)):
+    info = np.iinfo(dtype)
+    return np.random.RandomState(0).randint(info.min, info.max, size=shape, dtype=dtype)
+
+
+@pytest.mark.parametrize(
+    "dtype, percentiles",
+    [
+        (np.uint8, [0, 100]),
+        (np.uint16, [50, 99.8]),
+        (np.uint16, [1.5, 37.3]),
+        (np.int16, [50, 99.8]),
+    ],
+)
+def test_histogram_percentiles(dtype, percentiles):
+    data = _random_data(dtype)
+    counts = histogram.histogram(da.from_array(data, chunks=(1, 1, 16, 16)))
+    offset, n_bins = histogram.histogram_range(dtype)
+
+    actual = histogram.histogram_percentiles(counts.compute(), percentiles, offset)
+    assert np.allclose(actual, np.percentile(data, percentiles))
+
+
+@pytest.mark.parametrize(
+    "dtype, method",
+    [
+        (np.uint16, "histogram"),
+        (np.uint16, "dask"),
+        (np.float32, "histogram"),
+        pytest.param(
+            np.uint16, "not-a-method", marks=pytest.mark.raises(exception=ValueError)
+        ),
+    ],
+)
+def test_percentile_norm_by(dtype, method):
+    data = _random_data(np.uint16).astype(dtype)
+    actual = percentile_norm_by(
+        da.from_array(data, chunks=(1, 1, 16, 16)), 50.0, 99.8, method=method
+    ).compute()
+
+    # Only the histogram method is exact, dask percentiles are approximate
+    if method == "histogram" and dtype == np.uint16:
+        assert np.allclose(actual, np.percentile(data, [50.0, 99.8]))
+    else:
+        assert actual[0] < actual[1]
+
+
+def test_single_channel_percentile_norm_bounds():
+    data = _random_data(np.uint16)
+    lazy_data = da.from_array(data, chunks=(1, 1, 16, 16))
+
+    # Values at or below the min percentile are 0 and at or above the max are 255
+    normed = single_channel_percentile_norm(lazy_data, min_p=10.0, max_p=90.0)
+    normed = normed.compute()
+    lower, upper = np.percentile(data, [10.0, 90.0])
+    assert np.all(normed[data <= lower] == 0)
+    assert np.all(normed[data >= upper] == 255)
+
+    # Provided norm by values are used as is
+    normed = single_channel_percentile_norm(data, norm_by=(0, 65535))
+    assert np.allclose(normed, data / 65535 * 255)
+
+
+@pytest.mark.parametrize(
+    "plane_shape, sample_stride, sample_planes, expected_n_planes",
+    [
+        ((3, 4), None, None, 12),
+        ((3, 4), 5, None, 3),
+        ((3, 4), None, 5, 5),
+        ((3, 4), None, 20, 12),
+        ((), None, 5, 1),
+        pytest.param(
+            (3, 4),
+            2,
+            2,
+            None,
+            marks=pytest.mark.raises(exception=exceptions.ConflictingArgumentsError),
+        ),
+        pytest.param(
+            (3, 4), 0, None, None, marks=pytest.mark.raises(exception=ValueError)
+        ),
+    ],
+)
+def test_sample_plane_indices(
+    plane_shape, sample_stride, sample_planes, expected_n_planes
+):
+    actual = sampling.sample_plane_indices(plane_shape, sample_stride, sample_planes)
+    assert len(actual) == expected_n_planes
+    assert len(set(actual)) == expected_n_planes
+    assert all(len(plane_index) == len(plane_shape) for plane_index in actual)
+
+
+def test_percentile_norm_by_sampled():
+    data = _random_data(np.uint16, shape=(10, 4, 16, 16))
+
+    # Strided sampling should match the percentiles of the selected planes
+    actual = percentile_norm_by(
+        da.from_array(data, chunks=(1, 1, 16, 16)), 50.0, 99.8, sample_stride=3
+    ).compute()
+    expected = np.percentile(data.reshape(-1, 16, 16)[::3], [50.0, 99.8])
+    assert len(actual) == 6
+
+    # The bounds and their sampling error should be reported on the client
+    with instrumentation.record_run() as recorder:
+        norm_by = report_sample_error(actual, 50.0, 99.8)
+    assert np.allclose(norm_by, expected)
+    error = recorder.report()["values"]["percentile_sample_error"][0]["value"]
+    assert error["lower"]["value"] == norm_by[0]
+    lower, upper = error["upper"]["confidence_interval"]
+    assert lower <= norm_by[1] <= upper
+
+    # Bounds that weren't sampled are returned as they are
+    assert np.array_equal(report_sample_error(expected), expected)
+
+
+@pytest.mark.parametrize("n_samples", [10, 100, 1000])
+def test_percentile_confidence_interval(n_samples):
+    intervals = sampling.percentile_confidence_interval([0.0, 50.0, 99.8], n_samples)
+
+    # Every interval should contain its percentile and stay within 0 and 100
+    assert np.all(intervals[:, 0] <= [0.0, 50.0, 99.8])
+    assert np.all(intervals[:, 1] >= [0.0, 50.0, 99.8])
+    assert np.all((intervals >= 0) & (intervals <= 100))
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16])
+def test_single_channel_percentile_norm_lut(dtype):
+    data = da.from_array(_random_data(dtype), chunks=(1, 1, 16, 16))
+
+    # The lookup table should match the float normalization cast to uint8
+    expected = single_channel_percentile_norm(data).astype(np.uint8).compute()
+    actual = single_channel_percentile_norm(data, lut=True)
+    assert actual.dtype == np.uint8
+    assert np.array_equal(actual.compute(), expected)
+
+    # Max projecting after the lookup table should match projecting the float norm
+    expected = single_channel_percentile_norm(data).max(axis=1).astype(np.uint8)
+    actual = single_channel_percentile_norm(data, lut=True).max(axis=1)
+    assert np.array_equal(actual.compute(), expected.compute())
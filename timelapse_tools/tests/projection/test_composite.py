@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools.projection import composite
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "color, expected",
+    [
+        ("magenta", (255, 0, 255)),
+        ("Green", (0, 255, 0)),
+        ("#ff8000", (255, 128, 0)),
+        ("00ff00", (0, 255, 0)),
+        ((10, 20, 30), (10, 20, 30)),
+        pytest.param("purple", None, marks=pytest.mark.raises(exception=ValueError)),
+        pytest.param("#gg0000", None, marks=pytest.mark.raises(exception=ValueError)),
+        pytest.param((0, 0), None, marks=pytest.mark.raises(exception=ValueError)),
+        pytest.param((0, 0, 256), None, marks=pytest.mark.raises(exception=ValueError)),
+    ],
+)
+def test_parse_color(color, expected):
+    assert np.array_equal(composite.parse_color(color), expected)
+
+
+@pytest.mark.parametrize(
+    "n_channels, channel_colors, expected",
+    [
+        (1, None, [(255, 255, 255)]),
+        (2, None, [(255, 0, 255), (0, 255, 0)]),
+        (2, ["red", "blue"], [(255, 0, 0), (0, 0, 255)]),
+        pytest.param(2, ["red"], None, marks=pytest.mark.raises(exception=ValueError)),
+        pytest.param(8, None, None, marks=pytest.mark.raises(exception=ValueError)),
+    ],
+)
+def test_get_channel_colors(n_channels, channel_colors, expected):
+    actual = composite.get_channel_colors(n_channels, channel_colors)
+    assert [tuple(color) for color in actual] == expected
+
+
+def test_composite():
+    red = np.full((2, 3), 200.0)
+    green = np.full((2, 3), 100.0)
+    magenta = np.full((2, 3), 100.0)
+    colors = composite.get_channel_colors(3, ["red", "green", "magenta"])
+
+    # Numpy and dask frames should blend the same
+    frames = [red, green, magenta]
+    for channels in [frames, [da.from_array(frame) for frame in frames]]:
+        blended = np.asarray(composite.composite(channels, colors))
+        assert blended.shape == (2, 3, 3)
+
+    # Colors add and are clipped at 255
+    blended = composite.composite([red, green, magenta], colors)
+    assert np.all(blended[..., 0] == 255)
+    assert np.all(blended[..., 1] == 100)
+    assert np.all(blended[..., 2] == 100)
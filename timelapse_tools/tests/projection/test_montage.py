@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools.projection import montage
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "shape, factor, expected_shape",
+    [
+        ((8, 6), 1, (8, 6)),
+        ((8, 6), 2, (4, 3)),
+        ((9, 7), 2, (4, 3)),
+        ((8, 6, 3), 2, (4, 3, 3)),
+        pytest.param((8, 6), 0, None, marks=pytest.mark.raises(exception=ValueError)),
+    ],
+)
+def test_downsample(shape, factor, expected_shape):
+    frame = np.arange(np.prod(shape), dtype=np.float64).reshape(shape)
+
+    # Numpy and dask frames should downsample the same
+    expected = montage.downsample(frame, factor)
+    actual = montage.downsample(da.from_array(frame, chunks=4), factor)
+    assert expected.shape == expected_shape
+    assert np.allclose(np.asarray(actual), expected)
+
+    # Each pixel should be the mean of its block
+    if factor > 1:
+        assert np.all(expected[0, 0] == frame[:factor, :factor].mean(axis=(0, 1)))
+
+
+@pytest.mark.parametrize(
+    "n_frames, frame_shape, columns, gap, expected_shape",
+    [
+        (1, (4, 5), None, 0, (4, 5)),
+        (4, (4, 5), None, 0, (8, 10)),
+        (5, (4, 5), None, 0, (8, 15)),
+        (10, (4, 5), None, 0, (12, 20)),
+        (5, (4, 5), 5, 0, (4, 25)),
+        (5, (4, 5), 2, 1, (4 * 3 + 2, 5 * 2 + 1)),
+        (3, (4, 5, 3), None, 2, (4 * 2 + 2, 5 * 2 + 2, 3)),
+        pytest.param(
+            0, (4, 5), None, 0, None, marks=pytest.mark.raises(exception=ValueError)
+        ),
+        pytest.param(
+            2, (4, 5), 0, 0, None, marks=pytest.mark.raises(exception=ValueError)
+        ),
+    ],
+)
+def test_montage(n_frames, frame_shape, columns, gap, expected_shape):
+    frames = [np.full(frame_shape, i + 1, dtype=np.uint8) for i in range(n_frames)]
+
+    grid = montage.montage(frames, columns=columns, gap=gap)
+    assert grid.shape == expected_shape
+
+    # Every frame should be tiled once, row by row
+    grid = grid.compute()
+    height, width = frame_shape[:2]
+    columns = columns or int(np.ceil(np.sqrt(n_frames)))
+    for i in range(n_frames):
+        row, column = divmod(i, columns)
+        y, x = row * (height + gap), column * (width + gap)
+        assert np.all(grid[y : y + height, x : x + width] == i + 1)
+    assert grid.sum() == sum(frame.sum() for frame in frames)
+
+
+def test_montage_mismatched_shapes():
+    with pytest.raises(ValueError):
+        montage.montage([np.ones((4, 5)), np.ones((5, 4))])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools import exceptions
+from timelapse_tools.projection.multi_projection import multi_project
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "data, dims, projections, expected_shape",
+    [
+        (da.ones((3, 4, 5)), "ZYX", ["max"], (4, 5)),
+        (da.ones((4, 3, 5)), "YZX", ["max", "mean", "argmax"], (4, 5)),
+        (da.ones((4, 5)), "YX", ["max", "std", "argmax"], (4, 5)),
+        pytest.param(
+            da.ones((3, 4, 5)),
+            "ZYX",
+            ["median"],
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            da.ones((2, 3, 4, 5)),
+            "TZYX",
+            ["max"],
+            None,
+            marks=pytest.mark.raises(exception=exceptions.InvalidShapeError),
+        ),
+    ],
+)
+def test_multi_project_shapes(data, dims, projections, expected_shape):
+    projected = multi_project(data, dims, projections)
+    assert list(projected) == projections
+    for projection in projected.values():
+        assert projection.shape == expected_shape
+
+
+def test_multi_project_values():
+    data = np.random.RandomState(0).randint(0, 1000, size=(6, 4, 5)).astype(np.uint16)
+    projected = multi_project(
+        da.from_array(data, chunks=(6, 4, 5)),
+        "ZYX",
+        ["max", "mean", "sum", "min", "std", "argmax"],
+    )
+
+    assert np.array_equal(projected["max"].compute(), data.max(0))
+    assert np.allclose(projected["mean"].compute(), data.mean(0))
+    assert np.array_equal(projected["sum"].compute(), data.sum(0))
+    assert np.array_equal(projected["min"].compute(), data.min(0))
+    assert np.allclose(projected["std"].compute(), data.std(0), rtol=1e-4)
+    assert np.allclose(projected["argmax"].compute(), data.argmax(0) * 255 / 5)
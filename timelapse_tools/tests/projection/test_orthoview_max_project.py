@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools import exceptions
+from timelapse_tools.projection.orthoview_max_project import orthoview_max_project
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "data, dims, z_scale, gap, expected_shape",
+    [
+        (da.ones((3, 4, 5)), "ZYX", 1.0, 4, (4 + 4 + 3, 5 + 4 + 3)),
+        (da.ones((3, 4, 5)), "ZYX", 2.0, 1, (4 + 1 + 6, 5 + 1 + 6)),
+        (da.ones((4, 3, 5)), "YZX", 1.0, 0, (4 + 0 + 3, 5 + 0 + 3)),
+        (da.ones((4, 5)), "YX", 2.0, 4, (4, 5)),
+        pytest.param(
+            da.ones((2, 3, 4, 5)),
+            "TZYX",
+            1.0,
+            4,
+            None,
+            marks=pytest.mark.raises(exception=exceptions.InvalidShapeError),
+        ),
+    ],
+)
+def test_orthoview_max_project_shape(data, dims, z_scale, gap, expected_shape):
+    actual = orthoview_max_project(data, dims, z_scale=z_scale, gap=gap)
+    assert actual.shape == expected_shape
+
+
+def test_orthoview_max_project_values():
+    data = np.random.RandomState(0).randint(0, 1000, size=(3, 4, 5))
+    actual = orthoview_max_project(da.from_array(data), "ZYX", z_scale=2.0, gap=1)
+    actual = actual.compute()
+
+    # Each view should be the max projection along its axis
+    assert np.array_equal(actual[:4, :5], data.max(0))
+    assert np.array_equal(actual[5:, :5], np.repeat(data.max(1), 2, axis=0))
+    assert np.array_equal(actual[:4, 6:], np.repeat(data.max(2).T, 2, axis=1))
+
+    # Gaps and the unused corner should be blank
+    assert np.all(actual[4, :] == 0)
+    assert np.all(actual[:, 5] == 0)
+    assert np.all(actual[5:, 6:] == 0)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools.projection import pyramid
+from timelapse_tools.projection.orthoview_max_project import orthoview_max_project
+from timelapse_tools.projection.single_channel_max_project import (
+    single_channel_max_project,
+)
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "shape, factor, method, expected_shape, expected_first",
+    [
+        ((8, 6), 1, "mean", (8, 6), 0),
+        ((8, 6), 2, "mean", (4, 3), np.mean([0, 1, 6, 7])),
+        ((9, 7), 2, "max", (4, 3), 8),
+        ((9, 7), 3, "min", (3, 2), 0),
+        ((2, 9, 7), 2, "nearest", (2, 4, 3), 0),
+        pytest.param(
+            (8, 6),
+            2,
+            "median",
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            (8, 6),
+            0,
+            "mean",
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            (1, 6),
+            2,
+            "mean",
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_downsample_frame(shape, factor, method, expected_shape, expected_first):
+    frame = np.arange(np.prod(shape), dtype=np.float64).reshape(shape)
+
+    # Chunks that don't align with blocks should still reduce whole blocks
+    actual = pyramid.downsample_frame(
+        da.from_array(frame, chunks=3), factor, method
+    ).compute()
+    assert actual.shape == expected_shape
+    assert actual.dtype == frame.dtype
+    assert actual[(0,) * len(shape)] == expected_first
+
+    # Numpy frames should downsample the same
+    assert np.array_equal(
+        np.asarray(pyramid.downsample_frame(frame, factor, method)), actual
+    )
+
+
+def test_downsample_frame_keeps_dtype():
+    frame = np.array([[1, 2], [2, 2]], dtype=np.uint16)
+    assert pyramid.downsample_frame(frame, 2, "mean").dtype == np.uint16
+
+
+@pytest.mark.parametrize(
+    "shape, n_levels, expected_shapes",
+    [
+        ((16, 12), 1, [(16, 12)]),
+        ((16, 12), 3, [(16, 12), (8, 6), (4, 3)]),
+        ((17, 13), 2, [(17, 13), (8, 6)]),
+        pytest.param((16, 12), 0, None, marks=pytest.mark.raises(exception=ValueError)),
+    ],
+)
+def test_build_pyramid(shape, n_levels, expected_shapes):
+    frame = da.random.randint(0, 100, shape, chunks=5)
+
+    levels = pyramid.build_pyramid(frame, n_levels, "max")
+    assert [level.shape for level in levels] == expected_shapes
+
+    # Every level should reduce the level before it
+    computed = da.compute(*levels)
+    for above, level in zip(computed, computed[1:]):
+        assert level[0, 0] == above[:2, :2].max()
+
+
+@pytest.mark.parametrize(
+    "projection, expected",
+    [
+        ("max", "max"),
+        ("argmax", "nearest"),
+        ("mean", "mean"),
+        ("std", "mean"),
+        (single_channel_max_project, "max"),
+        (orthoview_max_project, "max"),
+        (np.sum, "mean"),
+    ],
+)
+def test_get_pyramid_method(projection, expected):
+    assert pyramid.get_pyramid_method(projection) == expected
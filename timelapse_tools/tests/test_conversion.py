@@ -1,15 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from functools import partial
 from pathlib import Path
+from xml.etree import ElementTree
 
 import dask.array as da
 import numpy as np
+import pandas as pd
 import pytest
 from imageio import mimread
 
 from timelapse_tools import conversion
 from timelapse_tools.constants import Dimensions
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    single_channel_percentile_norm,
+)
+from timelapse_tools.projection.orthoview_max_project import orthoview_max_project
+from timelapse_tools.projection.single_channel_max_project import (
+    single_channel_max_project,
+)
+from timelapse_tools.utils import manifest, movie_writing
+from timelapse_tools.utils.movie_writing import get_writer_kwargs
 
 ###############################################################################
 
@@ -25,14 +37,16 @@ select_all = slice(None, None, None)
 
 
 @pytest.mark.parametrize(
-    "save_path, overwrite, fname, expected",
+    "save_path, overwrite, fname, resume, expected",
     [
-        (Path(__file__) / "test_dir", False, None, Path(__file__) / "test_dir"),
-        (Path(__file__).parent, True, None, Path(__file__).parent),
+        (Path(__file__) / "test_dir", False, None, False, Path(__file__) / "test_dir"),
+        (Path(__file__).parent, True, None, False, Path(__file__).parent),
+        (Path(__file__).parent, False, None, True, Path(__file__).parent),
         pytest.param(
             Path(__file__).parent,
             False,
             None,
+            False,
             None,
             marks=pytest.mark.raises(exception=FileExistsError),
         ),
@@ -40,13 +54,22 @@ select_all = slice(None, None, None)
             Path(__file__),
             False,
             None,
+            False,
+            None,
+            marks=pytest.mark.raises(exception=FileExistsError),
+        ),
+        pytest.param(
+            Path(__file__),
+            True,
+            None,
+            True,
             None,
             marks=pytest.mark.raises(exception=FileExistsError),
         ),
     ],
 )
-def test_get_save_path(save_path, overwrite, fname, expected):
-    actual = conversion._get_save_path.run(save_path, overwrite, fname)
+def test_get_save_path(save_path, overwrite, fname, resume, expected):
+    actual = conversion._get_save_path.run(save_path, overwrite, fname, resume)
     assert actual == expected
 
 
@@ -179,6 +202,62 @@ def test_generate_getitem_indicies(img_shape, dims, expected_getitem_indicies):
     assert actual == expected_getitem_indicies
 
 
+@pytest.mark.parametrize(
+    "img_shape, dims, expected_getitem_indicies",
+    [
+        (
+            (2, 2, 3, 4, 5, 6),
+            "STCZYX",
+            [
+                (0, select_all, select_all, select_all, select_all, select_all),
+                (1, select_all, select_all, select_all, select_all, select_all),
+            ],
+        ),
+        (
+            (3, 3, 3, 4, 5),
+            "TCZYX",
+            [(select_all, select_all, select_all, select_all, select_all)],
+        ),
+    ],
+)
+def test_generate_getitem_indicies_unsplit_channels(
+    img_shape, dims, expected_getitem_indicies
+):
+    actual = conversion._generate_getitem_indicies.run(
+        img_shape, dims, split_channels=False
+    )
+    assert actual == expected_getitem_indicies
+
+
+@pytest.mark.parametrize(
+    "img_shape, dims, split_channels, expected_getitem_indicies",
+    [
+        (
+            (2, 2, 2, 4, 5, 6),
+            "STCZYX",
+            True,
+            [
+                (select_all, select_all, 0, select_all, select_all, select_all),
+                (select_all, select_all, 1, select_all, select_all, select_all),
+            ],
+        ),
+        (
+            (2, 2, 2, 4, 5, 6),
+            "STCZYX",
+            False,
+            [(select_all, select_all, select_all, select_all, select_all, select_all)],
+        ),
+    ],
+)
+def test_generate_getitem_indicies_unsplit_scenes(
+    img_shape, dims, split_channels, expected_getitem_indicies
+):
+    actual = conversion._generate_getitem_indicies.run(
+        img_shape, dims, split_channels=split_channels, split_scenes=False
+    )
+    assert actual == expected_getitem_indicies
+
+
 @pytest.mark.parametrize(
     "img, getitem_indicies, expected_process_list",
     [
@@ -280,3 +359,508 @@ def test_generate_movies(data_dir, tmpdir, img, expected):
     # All other functions are tested above so this is really just
     # testing imageio, ffmpeg, and whichever callables the user provides.
     assert actual.shape == expected.shape
+
+
+@pytest.mark.parametrize(
+    "catalog, path_column, file_name_column, expected",
+    [
+        (
+            ["a.czi", Path("b.czi")],
+            "path",
+            None,
+            [{"img": Path("a.czi")}, {"img": Path("b.czi")}],
+        ),
+        (
+            [{"path": "a.czi", "S": 1, "operating_dim": "Z"}],
+            "path",
+            None,
+            [{"img": Path("a.czi"), "S": 1, "operating_dim": "Z"}],
+        ),
+        (
+            pd.DataFrame(
+                {
+                    "Isilon path": ["/data/", "/data/"],
+                    "File Name": ["a.czi", "b.czi"],
+                    "S": [np.nan, 2.0],
+                    "User": ["CCH", "CCH"],
+                }
+            ),
+            "Isilon path",
+            "File Name",
+            [{"img": Path("/data/a.czi")}, {"img": Path("/data/b.czi"), "S": 2}],
+        ),
+        pytest.param(
+            [{"file": "a.czi"}],
+            "path",
+            None,
+            None,
+            marks=pytest.mark.raises(exception=KeyError),
+        ),
+    ],
+)
+def test_load_catalog(catalog, path_column, file_name_column, expected):
+    actual = conversion._load_catalog(catalog, path_column, file_name_column)
+    assert actual == expected
+
+
+def _unregistered_project(data, dims, **kwargs):
+    return data.mean(axis=0)
+
+
+@pytest.mark.parametrize(
+    "projection_func, project_first, single_pass, projections, expected",
+    [
+        (single_channel_max_project, None, False, None, True),
+        (single_channel_max_project, True, True, None, True),
+        (_unregistered_project, None, False, None, False),
+        (_unregistered_project, False, False, None, False),
+        (_unregistered_project, True, False, ["max", "mean"], True),
+        pytest.param(
+            _unregistered_project,
+            True,
+            False,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=conversion.ConflictingArgumentsError),
+        ),
+        pytest.param(
+            _unregistered_project,
+            None,
+            True,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=conversion.ConflictingArgumentsError),
+        ),
+    ],
+)
+def test_resolve_project_first(
+    projection_func, project_first, single_pass, projections, expected
+):
+    actual = conversion._resolve_project_first(
+        normalization_func=single_channel_percentile_norm,
+        projection_func=projection_func,
+        project_first=project_first,
+        single_pass=single_pass,
+        projections=projections,
+    )
+    assert actual is expected
+
+
+class ScalingCzi:
+    def __init__(self, distances):
+        items = "".join(
+            f'<Distance Id="{dim}"><Value>{value}</Value></Distance>'
+            for dim, value in distances.items()
+        )
+        self.meta = ElementTree.fromstring(
+            f"<ImageDocument><Metadata><Scaling><Items>{items}</Items></Scaling>"
+            f"</Metadata></ImageDocument>"
+        )
+
+
+@pytest.mark.parametrize(
+    "projection_func, projection_kwargs, distances, scale_factor, expected",
+    [
+        (orthoview_max_project, {}, {"X": 1e-7, "Z": 5e-7}, 1, {"z_scale": 5.0}),
+        (orthoview_max_project, {}, {"X": 1e-7, "Z": 5e-7}, 2, {"z_scale": 2.5}),
+        (orthoview_max_project, {"z_scale": 1.0}, {"X": 1e-7, "Z": 5e-7}, 1, None),
+        (orthoview_max_project, {"gap": 1}, {"X": 1e-7}, 1, None),
+        (single_channel_max_project, {}, {"X": 1e-7, "Z": 5e-7}, 1, None),
+    ],
+)
+def test_get_projection_kwargs(
+    monkeypatch, projection_func, projection_kwargs, distances, scale_factor, expected
+):
+    monkeypatch.setattr(
+        conversion, "get_czi_file", lambda img, reader=None: ScalingCzi(distances)
+    )
+    actual = conversion._get_projection_kwargs(
+        img=Path("a.czi"),
+        projection_func=projection_func,
+        projection_kwargs=projection_kwargs,
+        scale_factor=scale_factor,
+    )
+
+    # Provided arguments are kept and only a missing Z scale is filled in
+    expected = {**projection_kwargs, **(expected or {})}
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value)
+
+
+def test_generate_movies_batch(data_dir, tmpdir):
+    catalog = [
+        {"path": data_dir / "s_1_t_5_c_1_z_1.czi", "operating_dim": "Z"},
+        data_dir / "s_None_t_5_c_1_z_None.czi",
+        data_dir / "does_not_exist.czi",
+    ]
+
+    # Generate movies for every file
+    results = conversion.generate_movies_batch(
+        catalog, save_dir=tmpdir, max_concurrency=2, overwrite=True, fps=1
+    )
+
+    # Each file should have its own directory of movies, failed files have none
+    assert results[data_dir / "s_1_t_5_c_1_z_1.czi"] == Path(tmpdir) / "s_1_t_5_c_1_z_1"
+    for img in ["s_1_t_5_c_1_z_1.czi", "s_None_t_5_c_1_z_None.czi"]:
+        produced_files = [f for f in results[data_dir / img].iterdir()]
+        assert len(produced_files) == 1
+    assert results[data_dir / "does_not_exist.czi"] is None
+
+
+@pytest.mark.raises(exception=conversion.ConflictingArgumentsError)
+def test_generate_movies_batch_distributed_max_concurrency():
+    conversion.generate_movies_batch(
+        ["img.czi"], distributed_executor_port=8786, max_concurrency=2
+    )
+
+
+@pytest.mark.parametrize(
+    "catalog, save_dir",
+    [
+        (["a/img.czi", "b/img.czi"], None),
+        (["a/img.czi", "b/img.czi"], "movies"),
+        ([{"path": "a/img.czi", "save_path": "img"}, "b/img.czi"], None),
+    ],
+)
+@pytest.mark.raises(exception=ValueError)
+def test_generate_movies_batch_duplicate_save_paths(catalog, save_dir, tmpdir):
+    with tmpdir.as_cwd():
+        conversion.generate_movies_batch(catalog, save_dir=save_dir)
+
+
+def test_generate_movie_resume(tmpdir, monkeypatch):
+    save_path = Path(tmpdir)
+    data = da.random.randint(0, 100, (3, 2, 16, 16), chunks=(1, 1, 16, 16))
+    source = {"path": "a.czi", "mtime_ns": 1, "size": 1}
+    generate_movie = partial(
+        conversion._generate_movie.run,
+        data=data.astype(np.uint16),
+        selected_indices={"C": 0},
+        dims="CTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={},
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        source=source,
+        params_digest="a",
+    )
+
+    # Runs without resume shouldn't leave records in the save path
+    generate_movie()
+    assert [f.name for f in save_path.iterdir()] == ["dims-C_0.mp4"]
+
+    # Generate the movie and check it was recorded as complete
+    generate_movie(resume=True)
+    record = manifest.read_record(save_path / manifest.MANIFEST_DIR / "dims-C_0.json")
+    assert record["status"] == manifest.MovieStatus.Complete
+    assert record["outputs"] == ["dims-C_0.mp4"]
+    assert sorted(f.name for f in save_path.iterdir()) == [
+        manifest.MANIFEST_DIR,
+        "dims-C_0.mp4",
+    ]
+
+    # Resuming with the same source and parameters shouldn't write anything
+    def fail_get_writer(*args, **kwargs):
+        raise AssertionError("Completed movie was regenerated")
+
+    with monkeypatch.context() as m:
+        m.setattr(movie_writing.imageio, "get_writer", fail_get_writer)
+        generate_movie(resume=True)
+
+        # Changed parameters should regenerate the movie
+        with pytest.raises(AssertionError):
+            generate_movie(resume=True, params_digest="b")
+
+    # The failed attempt should be recorded
+    record = manifest.read_record(save_path / manifest.MANIFEST_DIR / "dims-C_0.json")
+    assert record["status"] == manifest.MovieStatus.Failed
+
+
+def test_generate_movie_interrupted(tmpdir, monkeypatch):
+    save_path = Path(tmpdir)
+
+    def interrupted_write_frame_streams(writers, streams, **kwargs):
+        writers[0].append_data(np.zeros((16, 16), dtype=np.uint8))
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(
+        movie_writing, "write_frame_streams", interrupted_write_frame_streams
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        conversion._generate_movie.run(
+            data=da.zeros((3, 2, 16, 16), dtype=np.uint16),
+            selected_indices={"C": 0},
+            dims="CTZYX",
+            operating_dim="T",
+            save_path=save_path,
+            fps=1,
+            save_format="mp4",
+            normalization_func=single_channel_percentile_norm,
+            normalization_kwargs={},
+            projection_func=single_channel_max_project,
+            projection_kwargs={},
+        )
+
+    # Neither a partial nor a finished looking movie, nor a record without resuming,
+    # should be left
+    assert [f.name for f in save_path.iterdir()] == []
+
+
+def test_generate_movie_encoder_options(tmpdir):
+    save_path = Path(tmpdir)
+
+    # Generate a movie with an odd frame shape
+    conversion._generate_movie.run(
+        data=da.random.randint(0, 100, (3, 2, 15, 33), chunks=(1, 1, 15, 33)),
+        selected_indices={"C": 0},
+        dims="CTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={},
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        writer_kwargs=get_writer_kwargs(
+            encoder_options={"preset": "ultrafast", "crf": 30, "threads": 1}
+        ),
+    )
+
+    # Frames should have been padded to the macro block size
+    actual = np.stack(mimread(save_path / "dims-C_0.mp4"))
+    assert actual.shape[:3] == (3, 16, 48)
+
+
+@pytest.mark.parametrize(
+    "single_pass, expected_reads", [(None, 1), (False, 2), (True, 1)]
+)
+def test_generate_movie_multi_projection_reads(tmpdir, single_pass, expected_reads):
+    save_path = Path(tmpdir)
+    data = da.random.randint(1, 100, (3, 2, 16, 16), chunks=(1, 1, 16, 16))
+    data = da.from_array(data.compute().astype(np.uint16), chunks=data.chunks)
+
+    # Count every read of a block of data
+    reads = []
+
+    def _read(block):
+        if block.size > 0:
+            reads.append(block.shape)
+        return block
+
+    conversion._generate_movie.run(
+        data=data.map_blocks(_read, dtype=data.dtype),
+        selected_indices={"S": 0, "C": 0},
+        dims="SCTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={},
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        projections=["max", "mean"],
+        single_pass=single_pass,
+    )
+
+    # Every block is read once for both projections, plus once more to fit the
+    # normalization values when the fit is opted into a separate pass
+    assert len(reads) == data.npartitions * expected_reads
+    for projection in ["max", "mean"]:
+        assert (
+            np.stack(mimread(save_path / f"dims-S_0_C_0-{projection}.mp4")).shape[0]
+            == 3
+        )
+
+
+@pytest.mark.parametrize("project_first, single_pass", [(False, False), (True, True)])
+def test_generate_movie_composite(tmpdir, project_first, single_pass):
+    save_path = Path(tmpdir)
+
+    # Generate a composite of a red and a blue channel
+    conversion._generate_movie.run(
+        data=da.random.randint(1, 100, (2, 3, 2, 16, 16), chunks=(2, 1, 1, 16, 16)),
+        selected_indices={"S": 0},
+        dims="SCTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={},
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        project_first=project_first,
+        single_pass=single_pass,
+        composite=True,
+        channel_colors=["red", (0, 0, 255)],
+    )
+
+    # A single RGB movie should be produced without any green
+    actual = np.stack(mimread(save_path / "dims-S_0-composite.mp4"))
+    assert actual.shape == (3, 16, 16, 3)
+    assert actual[..., 1].mean() < actual[..., 0].mean() / 4
+    assert actual[..., 1].mean() < actual[..., 2].mean() / 4
+
+
+@pytest.mark.parametrize(
+    "composite, project_first, expected_name, expected_shape",
+    [
+        (False, False, "dims-C_0-montage.mp4", (3, 16, 32)),
+        (False, True, "dims-C_0-montage.mp4", (3, 16, 32)),
+        (True, True, "dims-composite-montage.mp4", (3, 16, 32)),
+    ],
+)
+def test_generate_movie_montage(
+    tmpdir, composite, project_first, expected_name, expected_shape
+):
+    save_path = Path(tmpdir)
+    data = da.random.randint(1, 100, (5, 2, 3, 2, 16, 16), chunks=(1, 2, 1, 1, 16, 16))
+
+    # Generate a montage of five scenes, downsampled by two, in three columns
+    conversion._generate_movie.run(
+        data=data if composite else data[:, 0],
+        selected_indices={} if composite else {"C": 0},
+        dims="SCTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={},
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        project_first=project_first,
+        composite=composite,
+        montage=True,
+        montage_columns=3,
+        montage_downsample=2,
+        writer_kwargs=get_writer_kwargs(quality=10),
+    )
+
+    # A single movie of the tiled scenes, padded to the macro block size, should be
+    # produced
+    actual = np.stack(mimread(save_path / expected_name))
+    assert actual.shape[:3] == expected_shape
+
+    # The grid cell without a scene should be blank
+    assert actual[:, 8:16, 16:24].mean() < actual[:, :8, :24].mean() / 4
+
+
+def _unreadable(block):
+    raise AssertionError("Cached frames were read from the source")
+
+
+@pytest.mark.parametrize(
+    "selected_indices, projections, composite, expected_names",
+    [
+        ({"C": 0}, None, False, ["dims-S_0_C_0.mp4"]),
+        (
+            {"C": 0},
+            ["max", "mean"],
+            False,
+            ["dims-S_0_C_0-max.mp4", "dims-S_0_C_0-mean.mp4"],
+        ),
+        ({}, None, True, ["dims-S_0-composite.mp4"]),
+    ],
+)
+def test_generate_movie_frame_cache(
+    tmpdir, selected_indices, projections, composite, expected_names
+):
+    pytest.importorskip("zarr")
+    save_path = Path(tmpdir) / "movies"
+    data = da.random.randint(1, 100, (2, 3, 2, 16, 16), chunks=(1, 1, 1, 16, 16))
+    data = da.from_array(data.compute().astype(np.uint16), chunks=data.chunks)
+    if "C" in selected_indices:
+        data = data[0]
+    generate_movie = partial(
+        conversion._generate_movie.run,
+        selected_indices={"S": 0, **selected_indices},
+        dims="SCTZYX",
+        operating_dim="T",
+        save_path=save_path,
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        projection_func=single_channel_max_project,
+        projection_kwargs={},
+        projections=projections,
+        composite=composite,
+        frame_cache=conversion.FrameCache(Path(tmpdir) / "cache"),
+        frame_cache_params={"source": {"path": "a.czi"}},
+    )
+
+    # Generate the movies, caching the raw projected frames
+    generate_movie(data=data, normalization_kwargs={})
+    first = [np.stack(mimread(save_path / name)) for name in expected_names]
+
+    # Re-rendering with different display settings should only read cached frames
+    generate_movie(
+        data=data.map_blocks(_unreadable, dtype=data.dtype),
+        normalization_kwargs={},
+        fps=4,
+    )
+    for name, first_frames in zip(expected_names, first):
+        assert np.stack(mimread(save_path / name)).shape == first_frames.shape
+
+    # New normalization settings are fitted once, from the source data without
+    # multiple projections, then only read cached frames
+    normalization_kwargs = {"min_p": 10, "max_p": 90}
+    generate_movie(data=data, normalization_kwargs=normalization_kwargs)
+    generate_movie(
+        data=data.map_blocks(_unreadable, dtype=data.dtype),
+        normalization_kwargs=normalization_kwargs,
+    )
+    for name, first_frames in zip(expected_names, first):
+        actual = np.stack(mimread(save_path / name))
+        assert actual.shape == first_frames.shape
+        assert not np.array_equal(actual, first_frames)
+
+    # Previews should be rendered from a cached pyramid level, padded to the macro
+    # block size
+    generate_movie(
+        data=data.map_blocks(_unreadable, dtype=data.dtype),
+        normalization_kwargs={},
+        pyramid_level=2,
+        writer_kwargs=get_writer_kwargs(encoder_options={"macro_block_size": 4}),
+    )
+    for name in expected_names:
+        assert np.stack(mimread(save_path / name)).shape[1:3] == (4, 4)
+
+
+def test_generate_movie_frame_cache_normalization(tmpdir):
+    pytest.importorskip("zarr")
+    data = da.random.randint(1, 100, (3, 4, 16, 16), chunks=(1, 4, 16, 16))
+    data = da.from_array(data.compute().astype(np.uint16), chunks=data.chunks)
+    generate_movie = partial(
+        conversion._generate_movie.run,
+        data=data,
+        selected_indices={},
+        dims="TZYX",
+        operating_dim="T",
+        fps=1,
+        save_format="mp4",
+        normalization_func=single_channel_percentile_norm,
+        normalization_kwargs={"min_p": 5, "max_p": 95},
+        projection_func=orthoview_max_project,
+        projection_kwargs={"max_project_dim": "Z"},
+    )
+
+    # Orthoview padding shouldn't change the contrast of cached frames
+    generate_movie(save_path=Path(tmpdir) / "uncached")
+    generate_movie(
+        save_path=Path(tmpdir) / "cached",
+        frame_cache=conversion.FrameCache(Path(tmpdir) / "cache"),
+        frame_cache_params={"source": {"path": "a.czi"}},
+    )
+    assert np.array_equal(
+        np.stack(mimread(Path(tmpdir) / "cached" / "dims-.mp4")),
+        np.stack(mimread(Path(tmpdir) / "uncached" / "dims-.mp4")),
+    )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import dask.array as da
+import numpy as np
+import pytest
+from imageio import mimread
+
+from timelapse_tools import live
+from timelapse_tools.normalization.histogram import histogram
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    percentile_norm_by,
+)
+
+###############################################################################
+
+
+def _unreadable(block):
+    raise AssertionError("Already stored timepoints were read again")
+
+
+class GrowingFile:
+    # A file that gains timepoints as it is acquired
+    def __init__(self, path: Path, n_timepoints: int):
+        self.path = path
+        self.data = np.random.randint(0, 1000, (2, 8, 2, 3, 16, 16), dtype=np.uint16)
+        self.n_timepoints = 0
+        self.n_read = 0
+        self.grow(n_timepoints)
+
+    def grow(self, n_timepoints: int):
+        self.n_timepoints = n_timepoints
+        with open(self.path, "a") as f:
+            f.write("t" * n_timepoints)
+
+    def daread(self, img, **kwargs):
+        # Timepoints that were already read shouldn't be read again
+        data = da.from_array(
+            self.data[:, : self.n_timepoints], chunks=(1, 1, 1, 3, 16, 16)
+        )
+        if self.n_read > 0:
+            data = da.concatenate(
+                [
+                    data[:, : self.n_read].map_blocks(_unreadable, dtype=data.dtype),
+                    data[:, self.n_read :],
+                ],
+                axis=1,
+            )
+        return data, "STCZYX"
+
+
+@pytest.fixture
+def growing_file(tmpdir, monkeypatch) -> GrowingFile:
+    pytest.importorskip("zarr")
+    growing = GrowingFile(Path(tmpdir) / "img.czi", 3)
+    monkeypatch.setattr(live, "daread", growing.daread)
+    return growing
+
+
+def test_live_preview_update(tmpdir, growing_file):
+    save_path = Path(tmpdir) / "previews"
+    preview = live.LivePreview(growing_file.path, save_path=save_path)
+    movie = save_path / "dims-S_0_C_1.mp4"
+
+    # The last timepoint of all four movies may still be being written
+    assert preview.update() == 2 * 4
+    assert len(mimread(movie)) == 2
+
+    # Once the file stops growing the last timepoint is read
+    growing_file.n_read = 2
+    assert preview.update() == 1 * 4
+    assert len(mimread(movie)) == 3
+
+    # Nothing new
+    growing_file.n_read = 3
+    assert preview.update() == 0
+
+    # Only new timepoints should be read
+    growing_file.grow(6)
+    assert preview.update() == 2 * 4
+    assert len(mimread(movie)) == 5
+
+    # The stored running histogram should match the histogram of the source data of
+    # every stored frame
+    store_path = save_path / live.LIVE_STORE_DIR / "dims-S_0_C_1.zarr"
+    stored = da.from_zarr(str(store_path))
+    assert stored.shape == (5, 16, 16)
+    assert np.array_equal(stored.compute(), growing_file.data[0, :5, 1].max(axis=1))
+    histogram_path = save_path / live.LIVE_STORE_DIR / "dims-S_0_C_1.histogram.zarr"
+    counts = preview.zarr.open_array(str(histogram_path), mode="r")
+    assert counts.attrs["n_timepoints"] == 5
+    assert np.array_equal(
+        counts[:], histogram(da.from_array(growing_file.data[0, :5, 1])).compute()
+    )
+
+    # A new preview of the same save path should continue from the stored frames
+    growing_file.n_read = 5
+    resumed = live.LivePreview(growing_file.path, save_path=save_path)
+    assert resumed.update() == 0
+    assert resumed.update() == 1 * 4
+    assert len(mimread(movie)) == 6
+
+
+@pytest.mark.parametrize(
+    "normalization_kwargs",
+    [
+        # A running histogram
+        {},
+        # Refit to every complete timepoint
+        {"method": "dask"},
+    ],
+)
+def test_live_preview_fit_source(tmpdir, growing_file, normalization_kwargs):
+    save_path = Path(tmpdir) / "previews"
+    preview = live.LivePreview(
+        growing_file.path,
+        save_path=save_path,
+        S=0,
+        C=0,
+        normalization_kwargs=normalization_kwargs,
+        rerender_tolerance=0.0,
+    )
+
+    # The bounds should be fit to the source data, as generate_movies fits them,
+    # rather than to the projected frames
+    for n_complete in (2, 3):
+        preview.update()
+        growing_file.n_read = 0 if normalization_kwargs else n_complete
+        source = da.from_array(
+            growing_file.data[0, :n_complete, 0], chunks=(1, 3, 16, 16)
+        )
+        expected = percentile_norm_by(source, **normalization_kwargs).compute()
+        store_path = save_path / live.LIVE_STORE_DIR / "dims-.zarr"
+        _, norm_by = preview._rendered[store_path]
+        assert np.allclose(norm_by, expected)
+
+
+@pytest.mark.parametrize(
+    "rerender_tolerance, darken, expected_encoded",
+    [
+        # Similar frames only encode the new frames, appended to the movie
+        (1.0, False, [2, 1]),
+        # Frames that move the normalization bounds re-render the whole movie
+        (0.02, True, [2, 3]),
+    ],
+)
+def test_live_preview_append(
+    tmpdir, growing_file, monkeypatch, rerender_tolerance, darken, expected_encoded
+):
+    save_path = Path(tmpdir) / "previews"
+    preview = live.LivePreview(
+        growing_file.path,
+        save_path=save_path,
+        S=0,
+        C=0,
+        rerender_tolerance=rerender_tolerance,
+    )
+
+    # Track the number of frames encoded by each update
+    encoded = []
+    encode = preview._encode
+
+    def track_encode(movie_file, frames):
+        encoded.append(len(frames))
+        encode(movie_file, frames)
+
+    monkeypatch.setattr(preview, "_encode", track_encode)
+
+    preview.update()
+    if darken:
+        growing_file.data[:, 2] //= 10
+    growing_file.n_read = 2
+    preview.update()
+    assert encoded == expected_encoded
+
+    # The preview should have every frame either way
+    frames = mimread(save_path / "dims-.mp4")
+    assert len(frames) == 3
+    assert frames[0].shape[:2] == (16, 16)
+
+
+def test_watch(tmpdir, growing_file):
+    save_paths = live.watch(
+        growing_file.path,
+        save_path=Path(tmpdir) / "previews",
+        poll_interval=0,
+        max_polls=2,
+    )
+
+    # Every scene and channel pair should be previewed with every timepoint
+    assert save_paths == [Path(tmpdir) / "previews"]
+    movies = sorted(save_paths[0].glob("*.mp4"))
+    assert [movie.name for movie in movies] == [
+        "dims-S_0_C_0.mp4",
+        "dims-S_0_C_1.mp4",
+        "dims-S_1_C_0.mp4",
+        "dims-S_1_C_1.mp4",
+    ]
+    assert all(len(mimread(movie)) == 3 for movie in movies)
+
+
+def test_watch_idle(tmpdir, growing_file):
+    # Stop once nothing has grown
+    live.watch(
+        growing_file.path,
+        save_path=Path(tmpdir) / "previews",
+        poll_interval=0,
+        idle_timeout=0,
+    )
+    assert len(mimread(Path(tmpdir) / "previews" / "dims-S_0_C_0.mp4")) == 2
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from timelapse_tools import monotone
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    percentile_norm_by,
+    report_sample_error,
+    single_channel_percentile_norm,
+)
+from timelapse_tools.projection.orthoview_max_project import orthoview_max_project
+from timelapse_tools.projection.single_channel_max_project import (
+    single_channel_max_project,
+)
+
+###############################################################################
+
+
+def unregistered_norm(data, **kwargs):
+    return data
+
+
+def unregistered_project(data, dims, **kwargs):
+    return data.mean(dims.index("Z"))
+
+
+@pytest.mark.parametrize(
+    "normalization_func, projection_func, expected",
+    [
+        (single_channel_percentile_norm, single_channel_max_project, True),
+        (unregistered_norm, single_channel_max_project, False),
+        (single_channel_percentile_norm, unregistered_project, False),
+        # Blank gaps between the views aren't normalized when projecting first
+        (single_channel_percentile_norm, orthoview_max_project, False),
+        (unregistered_norm, unregistered_project, False),
+    ],
+)
+def test_can_project_first(normalization_func, projection_func, expected):
+    assert monotone.can_project_first(normalization_func, projection_func) is expected
+
+
+def test_registration():
+    assert single_channel_percentile_norm.monotone
+    assert single_channel_max_project.commutes_with_monotone
+    assert (
+        monotone.get_normalization_fit(single_channel_percentile_norm)
+        is percentile_norm_by
+    )
+    assert single_channel_percentile_norm.finalize is report_sample_error
+    assert monotone.get_normalization_fit(unregistered_norm) is None
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools import convert_to_zarr, daread, zarr_conversion
+from timelapse_tools.utils import czi_metadata
+
+###############################################################################
+
+
+@pytest.fixture
+def data_dir() -> Path:
+    return Path(__file__).parent / "data"
+
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "img, expected_shape",
+    [
+        ("s_1_t_5_c_1_z_1.czi", (5, 1, 1, 624, 924)),
+        ("s_None_t_5_c_1_z_None.czi", (5, 1, 1, 1248, 1848)),
+    ],
+)
+def test_convert_to_zarr(data_dir, tmpdir, img, expected_shape):
+    zarr = pytest.importorskip("zarr")
+    save_path = convert_to_zarr(
+        data_dir / img, save_path=Path(tmpdir) / "img.zarr", scale_levels=2
+    )
+
+    # Every scene should be a TCZYX image with two scale levels
+    root = zarr.open_group(str(save_path), mode="r")
+    assert root["0/0"].shape == expected_shape
+    assert root["0/1"].shape == expected_shape[:3] + (
+        expected_shape[3] // 2,
+        expected_shape[4] // 2,
+    )
+
+
+@pytest.mark.parametrize(
+    "dims, shape, kwargs, expected_scenes, expected_shapes, expected_chunks",
+    [
+        (
+            "BSTCZYX",
+            (1, 2, 3, 2, 4, 32, 48),
+            {"scale_levels": 3},
+            2,
+            [(3, 2, 4, 32, 48), (3, 2, 4, 16, 24), (3, 2, 4, 8, 12)],
+            (1, 1, 1, 32, 48),
+        ),
+        (
+            "STCYX",
+            (2, 3, 2, 32, 48),
+            {"S": 1, "C": 0, "chunks": {"T": -1, "Y": 16}, "compressor": None},
+            1,
+            [(3, 1, 1, 32, 48)],
+            (3, 1, 1, 16, 48),
+        ),
+        (
+            "TYX",
+            (3, 33, 47),
+            {"scale_levels": 2, "downscale": 4, "compressor": "lz4"},
+            1,
+            [(3, 1, 1, 33, 47), (3, 1, 1, 8, 11)],
+            (1, 1, 1, 33, 47),
+        ),
+        pytest.param(
+            "TYX",
+            (3, 32, 32),
+            {"scale_levels": 7},
+            None,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            "TYX",
+            (3, 32, 32),
+            {"compressor": "gzip"},
+            None,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            "TAYX",
+            (3, 2, 32, 32),
+            {},
+            None,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_convert_to_zarr_layout(
+    tmpdir,
+    monkeypatch,
+    dims,
+    shape,
+    kwargs,
+    expected_scenes,
+    expected_shapes,
+    expected_chunks,
+):
+    zarr = pytest.importorskip("zarr")
+    img = Path(tmpdir) / "img.czi"
+    img.write_text("")
+    data = np.random.randint(0, 1000, shape, dtype=np.uint16)
+    monkeypatch.setattr(
+        zarr_conversion,
+        "daread",
+        lambda img, **kwargs: (
+            da.from_array(data, chunks=(1,) * (len(shape) - 2) + shape[-2:]),
+            dims,
+        ),
+    )
+
+    # Convert with metadata unavailable
+    save_path = convert_to_zarr(img, save_path=Path(tmpdir) / "img.zarr", **kwargs)
+
+    # Check the layout
+    root = zarr.open_group(str(save_path), mode="r")
+    assert root.attrs["bioformats2raw.layout"] == 3
+    assert sorted(root.group_keys()) == [str(i) for i in range(expected_scenes)]
+    for scene in root.group_keys():
+        multiscales = root[scene].attrs["multiscales"][0]
+        assert [axis["name"] for axis in multiscales["axes"]] == list("tczyx")
+        assert [dataset["path"] for dataset in multiscales["datasets"]] == [
+            str(i) for i in range(len(expected_shapes))
+        ]
+        for level, expected_shape in enumerate(expected_shapes):
+            assert root[scene][str(level)].shape == expected_shape
+            assert root[scene][str(level)].dtype == np.uint16
+        assert root[scene]["0"].chunks == expected_chunks
+
+    # The full resolution level should be the selected data
+    expected = data
+    if "B" in dims:
+        expected = expected[0]
+    if "S" in kwargs:
+        expected = expected[kwargs["S"]]
+    elif "S" in dims:
+        expected = expected[-1]
+    if "C" in kwargs:
+        expected = expected[:, kwargs["C"]]
+    actual = root[str(expected_scenes - 1)]["0"][:]
+    assert np.array_equal(actual.reshape(expected.shape), expected)
+
+    # Each lower level should average blocks of the level above, rounding halves up
+    if len(expected_shapes) > 1:
+        downscale = kwargs.get("downscale", 2)
+        full = root["0"]["0"][:]
+        height, width = expected_shapes[1][-2:]
+        blocks = full[..., : height * downscale, : width * downscale].reshape(
+            full.shape[:3] + (height, downscale, width, downscale)
+        )
+        assert np.array_equal(
+            root["0"]["1"][:],
+            np.floor(blocks.mean(axis=(4, 6)) + 0.5).astype(np.uint16),
+        )
+
+    # Existing stores shouldn't be replaced without overwrite
+    with pytest.raises(FileExistsError):
+        convert_to_zarr(img, save_path=save_path, **kwargs)
+    convert_to_zarr(img, save_path=save_path, overwrite=True, **kwargs)
+
+
+def test_ome_zarr_file(tmpdir, monkeypatch):
+    pytest.importorskip("zarr")
+    img = Path(tmpdir) / "img.czi"
+    img.write_text("")
+    data = np.random.randint(0, 1000, (2, 3, 2, 4, 16, 24), dtype=np.uint16)
+    monkeypatch.setattr(
+        zarr_conversion,
+        "daread",
+        lambda img, **kwargs: (
+            da.from_array(data, chunks=(1, 1, 1, 1, 16, 24)),
+            "STCZYX",
+        ),
+    )
+    monkeypatch.setattr(
+        zarr_conversion,
+        "_get_physical_scale",
+        lambda img: {"X": 0.1, "Y": 0.1, "Z": 0.5},
+    )
+    monkeypatch.setattr(zarr_conversion, "_get_channel_names", lambda img: ["a", "b"])
+    save_path = convert_to_zarr(img, save_path=Path(tmpdir) / "img.zarr")
+
+    # The store should read back as the converted data with its metadata
+    actual, dims = daread(save_path, reader=zarr_conversion.OmeZarrFile)
+    assert dims == "BSTCZYX"
+    assert np.array_equal(actual[0].compute(), data)
+    czi = zarr_conversion.OmeZarrFile(save_path)
+    assert czi_metadata.z_anisotropy(czi) == pytest.approx(5.0)
+    assert czi_metadata.channel_names(czi) == ["a", "b"]
+
+    # A single plane should be read with every dimension kept
+    plane, plane_dims = czi.read_image(B=0, S=1, T=2, C=0, Z=3)
+    assert plane_dims == list(zip("BSTCZYX", (1, 1, 1, 1, 1, 16, 24)))
+    assert np.array_equal(plane.reshape(16, 24), data[1, 2, 0, 3])
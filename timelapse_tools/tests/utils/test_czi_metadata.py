@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+from xml.etree import ElementTree
 
 import pytest
 from aicspylibczi import CziFile
@@ -49,3 +50,31 @@ def test_collected_by(data_dir, filename, expected_creator):
 def test_channel_names(data_dir, filename, expected_channels):
     czi = CziFile(data_dir / filename)
     assert czi_metadata.channel_names(czi) == expected_channels
+
+
+class ScalingCzi:
+    def __init__(self, distances):
+        items = "".join(
+            f'<Distance Id="{dim}"><Value>{value}</Value></Distance>'
+            for dim, value in distances.items()
+        )
+        self.meta = ElementTree.fromstring(
+            f"<ImageDocument><Metadata><Scaling><Items>{items}</Items></Scaling>"
+            f"</Metadata></ImageDocument>"
+        )
+
+
+@pytest.mark.parametrize(
+    "distances, expected",
+    [
+        ({"X": 1e-7, "Y": 1e-7, "Z": 5e-7}, 5.0),
+        ({"X": 1e-7, "Y": 1e-7}, None),
+        ({}, None),
+    ],
+)
+def test_z_anisotropy(distances, expected):
+    actual = czi_metadata.z_anisotropy(ScalingCzi(distances))
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual == pytest.approx(expected)
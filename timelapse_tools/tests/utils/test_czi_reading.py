@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from pathlib import Path
+
 import numpy as np
 import pytest
 from dask.diagnostics import Profiler
 
 from timelapse_tools import daread
+from timelapse_tools.utils import czi_reading
 
 ###############################################################################
 
@@ -58,3 +61,311 @@ def test_daread(data_dir, img, expected_shape, expected_chunksize, expected_dims
     with Profiler() as prof:
         assert isinstance(data[tuple(getitem_ops)].compute(), np.ndarray)
         assert len(prof.results) == 2
+
+
+@pytest.mark.parametrize(
+    "img, n_reads, max_size, expected_hits, expected_misses",
+    [
+        ("s_1_t_5_c_1_z_1.czi", 1, 8, 0, 1),
+        ("s_1_t_5_c_1_z_1.czi", 5, 8, 4, 1),
+        ("s_None_t_5_c_1_z_None.czi", 3, 1, 2, 1),
+    ],
+)
+def test_czi_file_pool(
+    data_dir, img, n_reads, max_size, expected_hits, expected_misses
+):
+    pool = czi_reading.CziFilePool(max_size=max_size)
+
+    # Every read of the same unmodified file should share a single handle
+    handles = [pool.get(data_dir / img) for i in range(n_reads)]
+    assert all(handle is handles[0] for handle in handles)
+
+    info = pool.info()
+    assert info["hits"] == expected_hits
+    assert info["misses"] == expected_misses
+    assert info["size"] == 1
+
+
+def test_czi_file_pool_eviction(data_dir):
+    pool = czi_reading.CziFilePool(max_size=1)
+
+    # Alternating between two files with a single slot should always miss
+    pool.get(data_dir / "s_1_t_5_c_1_z_1.czi")
+    pool.get(data_dir / "s_None_t_5_c_1_z_None.czi")
+    pool.get(data_dir / "s_1_t_5_c_1_z_1.czi")
+
+    info = pool.info()
+    assert info["hits"] == 0
+    assert info["misses"] == 3
+    assert info["size"] == 1
+
+
+def test_daread_reuses_handles(data_dir):
+    czi_reading.clear_czi_file_pools()
+
+    # Read every plane of the file
+    data, dims = daread(data_dir / "s_1_t_5_c_1_z_1.czi")
+    data.compute(scheduler="synchronous")
+
+    # The file should only have been opened once for the whole read
+    info = czi_reading.czi_file_pool_info()
+    assert info["misses"] == 1
+    assert info["hits"] == 5
+
+
+@pytest.mark.parametrize(
+    "img, chunks, expected_chunksize, expected_n_chunks",
+    [
+        ("s_1_t_5_c_1_z_1.czi", None, (1, 1, 1, 1, 1, 624, 924), 5),
+        ("s_1_t_5_c_1_z_1.czi", {"T": -1}, (1, 1, 5, 1, 1, 624, 924), 1),
+        ("s_1_t_5_c_1_z_1.czi", {"T": 2}, (1, 1, 2, 1, 1, 624, 924), 3),
+        ("s_None_t_5_c_1_z_None.czi", {"T": -1}, (1, 5, 1, 1248, 1848), 1),
+        pytest.param(
+            "s_None_t_5_c_1_z_None.czi",
+            {"Z": -1},
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_daread_chunks(data_dir, img, chunks, expected_chunksize, expected_n_chunks):
+    # Read the data with and without chunking
+    planes, dims = daread(data_dir / img)
+    data, dims = daread(data_dir / img, chunks=chunks)
+
+    # Check the chunking
+    assert data.chunksize == expected_chunksize
+    assert data.npartitions == expected_n_chunks
+
+    # Check that the chunked read returns the same data as the plane read
+    assert np.array_equal(data.compute(), planes.compute())
+
+
+@pytest.mark.parametrize(
+    "img, expected_shape, expected_dtype",
+    [
+        ("s_1_t_5_c_1_z_1.czi", (1, 1, 5, 1, 1, 624, 924), np.uint16),
+        ("s_None_t_5_c_1_z_None.czi", (1, 5, 1, 1248, 1848), np.uint16),
+    ],
+)
+def test_daread_no_pixel_read(
+    data_dir, monkeypatch, img, expected_shape, expected_dtype
+):
+    # Fail on any pixel read
+    def _no_read(*args, **kwargs):
+        raise AssertionError("Pixel data was read during array construction")
+
+    czi_reading.clear_czi_file_pools()
+    monkeypatch.setattr(czi_reading.CziFile, "read_image", _no_read)
+
+    # Constructing the array should only use the file metadata
+    data, dims = daread(data_dir / img)
+    assert data.shape == expected_shape
+    assert data.dtype == expected_dtype
+
+
+@pytest.mark.parametrize(
+    "img, roi, scale_factor, expected_chunksize",
+    [
+        ("s_1_t_5_c_1_z_1.czi", None, 1, (1, 1, 1, 1, 1, 624, 924)),
+        ("s_1_t_5_c_1_z_1.czi", (100, 50, 200, 300), 1, (1, 1, 1, 1, 1, 300, 200)),
+        ("s_1_t_5_c_1_z_1.czi", None, 4, (1, 1, 1, 1, 1, 156, 231)),
+        ("s_None_t_5_c_1_z_None.czi", (10, 20, 101, 99), 2, (1, 1, 1, 49, 50)),
+        pytest.param(
+            "s_1_t_5_c_1_z_1.czi",
+            (900, 0, 100, 100),
+            1,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+        pytest.param(
+            "s_1_t_5_c_1_z_1.czi",
+            None,
+            0,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_daread_roi_scale_factor(data_dir, img, roi, scale_factor, expected_chunksize):
+    # Read the data in full and reduced
+    planes, dims = daread(data_dir / img)
+    data, dims = daread(data_dir / img, roi=roi, scale_factor=scale_factor)
+
+    # Check the reduced plane shape
+    assert data.chunksize == expected_chunksize
+    assert data.dtype == planes.dtype
+
+    # Check that the reduced read matches reducing the full read
+    expected = czi_reading._crop_and_downsample(planes.compute(), roi, scale_factor)
+    assert np.array_equal(data.compute(), expected)
+
+
+@pytest.mark.parametrize(
+    "data, roi, scale_factor, expected",
+    [
+        (np.arange(16).reshape(4, 4), (1, 2, 2, 1), 1, [[9, 10]]),
+        (
+            np.arange(16, dtype=np.uint16).reshape(4, 4),
+            None,
+            2,
+            np.array([[3, 5], [11, 13]], dtype=np.uint16),
+        ),
+        (np.arange(20.0).reshape(4, 5), None, 2, [[3.0, 5.0], [13.0, 15.0]]),
+        (np.arange(32).reshape(2, 4, 4), (0, 0, 3, 3), 3, [[[5]], [[21]]]),
+    ],
+)
+def test_crop_and_downsample(data, roi, scale_factor, expected):
+    actual = czi_reading._crop_and_downsample(data, roi, scale_factor)
+
+    # Data should keep its dtype
+    assert actual.dtype == data.dtype
+    assert np.array_equal(actual, expected)
+
+
+class BBox:
+    def __init__(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+
+class MosaicCziFile:
+    # A two timepoint, two channel mosaic stitched into a 70 x 100 plane of 32 x 32
+    # tiles, positioned at a negative x like many stage coordinates
+    dims = "TCMYX"
+    size = (2, 2, 12, 32, 32)
+    bbox = BBox(-100, 50, 100, 70)
+
+    def __init__(self):
+        self.stitched = np.arange(2 * 2 * 70 * 100, dtype=np.uint16).reshape(
+            (2, 2, 70, 100)
+        )
+        self.regions = []
+        self.meta = None
+        self.pixel_type = "Gray16"
+
+    def is_mosaic(self):
+        return True
+
+    def dims_shape(self):
+        return {"T": (0, 2), "C": (0, 2), "M": (0, 12)}
+
+    def read_mosaic_size(self):
+        return self.bbox
+
+    def get_tile_bounding_box(self, **read_dims):
+        return BBox(0, 0, 32, 32)
+
+    def read_mosaic(self, region, scale_factor=1.0, T=0, C=0):
+        self.regions.append(region)
+        x, y, w, h = region
+        x, y = x - self.bbox.x, y - self.bbox.y
+        step = int(round(1 / scale_factor))
+        return self.stitched[T, C, y : y + h : step, x : x + w : step][np.newaxis]
+
+
+@pytest.mark.parametrize(
+    "chunks, roi, scale_factor, expected_shape, expected_chunksize, expected_n_reads",
+    [
+        (None, None, 1, (2, 2, 70, 100), (1, 1, 32, 32), 4 * 3 * 4),
+        ({"Y": -1, "X": -1}, None, 1, (2, 2, 70, 100), (1, 1, 70, 100), 4),
+        ({"T": -1}, (40, 10, 20, 20), 1, (2, 2, 20, 20), (2, 1, 20, 20), 4),
+        (None, (0, 0, 64, 64), 2, (2, 2, 32, 32), (1, 1, 16, 16), 4 * 4),
+        pytest.param(
+            {"M": 1},
+            None,
+            1,
+            None,
+            None,
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_daread_mosaic(
+    tmpdir,
+    monkeypatch,
+    chunks,
+    roi,
+    scale_factor,
+    expected_shape,
+    expected_chunksize,
+    expected_n_reads,
+):
+    img = Path(tmpdir) / "mosaic.czi"
+    img.write_text("")
+    czi = MosaicCziFile()
+    monkeypatch.setattr(czi_reading, "get_czi_file", lambda img, reader=None: czi)
+
+    # Read the stitched mosaic
+    data, dims = daread(img, chunks=chunks, roi=roi, scale_factor=scale_factor)
+    assert dims == "TCYX"
+    assert data.shape == expected_shape
+    assert data.chunksize == expected_chunksize
+
+    # Every chunk should read its own region of each plane
+    expected = czi.stitched
+    if roi is not None:
+        x, y, w, h = roi
+        expected = expected[..., y : y + h, x : x + w]
+    expected = expected[..., ::scale_factor, ::scale_factor]
+    assert np.array_equal(data.compute(scheduler="synchronous"), expected)
+    assert len(czi.regions) == expected_n_reads
+
+    # Only the chunk holding a small selection should be read
+    czi.regions = []
+    data[0, 0, :4, :4].compute(scheduler="synchronous")
+    assert len(czi.regions) == data.chunksize[0]
+    assert czi.regions[0][:2] == (
+        czi.bbox.x + (roi[0] if roi else 0),
+        czi.bbox.y + (roi[1] if roi else 0),
+    )
+
+
+def test_daread_unstitched_mosaic(tmpdir, monkeypatch):
+    img = Path(tmpdir) / "mosaic.czi"
+    img.write_text("")
+    czi = MosaicCziFile()
+    monkeypatch.setattr(czi_reading, "get_czi_file", lambda img, reader=None: czi)
+
+    # Tiles should still be available as planes
+    data, dims = daread(img, stitch_mosaic=False)
+    assert dims == "TCMYX"
+    assert data.shape == (2, 2, 12, 32, 32)
+
+
+class PlaneIndexFile:
+    # Every plane of a three timepoint, two channel image is filled with its index
+    dims = "TCYX"
+    size = (3, 2, 4, 5)
+    pixel_type = "Gray16"
+
+    def __init__(self, img):
+        self.img = img
+
+    def is_mosaic(self):
+        return False
+
+    def dims_shape(self):
+        return {"T": (0, 3), "C": (0, 2)}
+
+    def get_tile_bounding_box(self, **read_dims):
+        return BBox(0, 0, 5, 4)
+
+    def read_image(self, T, C):
+        data = np.full((1, 1, 4, 5), T * 2 + C, dtype=np.uint16)
+        return data, [("T", 1), ("C", 1), ("Y", 4), ("X", 5)]
+
+
+def test_daread_reader(tmpdir):
+    img = Path(tmpdir) / "planes.index"
+    img.write_text("")
+
+    # The file should be opened with the provided reader in every read task
+    try:
+        data, dims = daread(img, reader=PlaneIndexFile)
+        assert dims == "TCYX"
+        assert isinstance(czi_reading.get_czi_file(img, PlaneIndexFile), PlaneIndexFile)
+        assert np.array_equal(data.compute()[:, :, 0, 0], np.arange(6).reshape((3, 2)))
+    finally:
+        czi_reading.clear_czi_file_pools()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools.projection import montage, pyramid
+from timelapse_tools.utils import czi_reading, downsampling
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "data, factor, axes, expected",
+    [
+        # Integer means round halves up
+        (np.array([[1, 2], [2, 2]], dtype=np.uint16), 2, (-2, -1), [[2]]),
+        (np.array([[1, 1], [1, 2]], dtype=np.uint8), 2, (-2, -1), [[1]]),
+        (np.array([[0, 1], [1, 1]], dtype=np.int16), 2, (-2, -1), [[1]]),
+        # Float means aren't rounded
+        (np.array([[1, 2], [2, 2]], dtype=np.float32), 2, (-2, -1), [[1.75]]),
+        # Trailing pixels are dropped
+        (np.arange(15, dtype=np.uint16).reshape(3, 5), 2, (-2, -1), [[3, 5]]),
+        # Leading dimensions are kept
+        (np.arange(8, dtype=np.uint8).reshape(2, 2, 2), 2, (-2, -1), [[[2]], [[6]]]),
+        # Trailing dimensions are kept
+        (np.arange(8, dtype=np.uint8).reshape(2, 2, 2), 2, (0, 1), [[[3, 4]]]),
+    ],
+)
+def test_block_mean(data, factor, axes, expected):
+    actual = downsampling.block_mean(data, factor, axes)
+    assert actual.dtype == data.dtype
+    assert np.array_equal(actual, np.asarray(expected, dtype=data.dtype))
+
+    # Dask data, with chunks that don't align with blocks, should downsample the same
+    actual = downsampling.block_mean(da.from_array(data, chunks=1), factor, axes)
+    assert actual.dtype == data.dtype
+    assert np.array_equal(actual.compute(), expected)
+
+
+@pytest.mark.parametrize("reduction", [np.max, np.min])
+def test_block_mean_reduction(reduction):
+    data = np.random.RandomState(0).randint(0, 1000, (2, 7, 9)).astype(np.uint16)
+    expected = reduction(data[:, :6, :9].reshape(2, 2, 3, 3, 3), axis=(2, 4))
+
+    # Other reductions should combine the same blocks, for dask data too
+    actual = downsampling.block_mean(data, 3, reduction=reduction)
+    assert np.array_equal(actual, expected)
+    actual = downsampling.block_mean(
+        da.from_array(data, chunks=2), 3, reduction=reduction
+    )
+    assert actual.dtype == data.dtype
+    assert np.array_equal(actual.compute(), expected)
+
+
+def test_downsampling_agrees():
+    data = np.random.RandomState(0).randint(0, 1000, (12, 12)).astype(np.uint16)
+
+    # Reads, montage frames, and pyramid levels should all share the same rounding
+    expected = downsampling.block_mean(data, 3)
+    assert np.array_equal(czi_reading._crop_and_downsample(data, None, 3), expected)
+    assert np.array_equal(montage.downsample(data, 3), expected)
+    assert np.array_equal(
+        np.asarray(pyramid.downsample_frame(data, 3, "mean")), expected
+    )
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import dask
+import pytest
+
+pytest.importorskip("prefect.engine.executors")
+
+from timelapse_tools.utils.executors import BoundedLocalDaskExecutor  # noqa: E402
+
+###############################################################################
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 2, 3])
+def test_bounded_local_dask_executor(max_concurrency):
+    executor = BoundedLocalDaskExecutor(max_concurrency)
+    compute_threads = set()
+
+    def _compute(i):
+        compute_threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return i
+
+    def _task(i):
+        # Every task computes on the shared pool
+        return sum(dask.compute(*[dask.delayed(_compute)(j) for j in range(8)]))
+
+    def _mapped_task(n):
+        # Mapped tasks wait on their children from inside a task
+        return sum(executor.wait(executor.map(_task, range(n))))
+
+    with executor.start():
+        actual = executor.wait([executor.submit(_mapped_task, 4) for _ in range(4)])
+
+    # Tasks never wait on threads they hold and computations share bounded threads
+    assert actual == [4 * sum(range(8))] * 4
+    assert len(compute_threads) <= max_concurrency
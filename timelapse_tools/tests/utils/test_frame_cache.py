@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools.utils.frame_cache import PARTIAL_STORE_SUFFIX, FrameCache
+
+###############################################################################
+
+
+def _unreadable(block):
+    raise AssertionError("Cached frames were read from the source")
+
+
+def test_frame_cache_load_or_store(tmpdir):
+    pytest.importorskip("zarr")
+    cache = FrameCache(Path(tmpdir) / "cache")
+    frames = [da.random.randint(0, 100, (8, 12), chunks=(4, 12)) for i in range(3)]
+    expected = np.stack(da.compute(*frames))
+    frames = [da.from_array(frame) for frame in expected]
+
+    # Store then read the frames back
+    key = FrameCache.key({"source": {"path": "a.czi"}, "selected_indices": {"S": 0}})
+    cached = cache.load_or_store({key: frames})
+    assert cache.contains(key)
+    assert len(cached[key]) == 3
+    assert np.array_equal(np.stack(da.compute(*cached[key])), expected)
+
+    # Cached streams should not be computed again, new streams should be
+    other_key = FrameCache.key({"source": {"path": "b.czi"}})
+    cached = cache.load_or_store(
+        {
+            key: [frame.map_blocks(_unreadable, dtype=frame.dtype) for frame in frames],
+            other_key: frames[:2],
+        }
+    )
+    assert np.array_equal(np.stack(da.compute(*cached[key])), expected)
+    assert len(cached[other_key]) == 2
+
+    # A failed store shouldn't leave a partial or cached stream behind
+    failed_key = FrameCache.key({"source": {"path": "c.czi"}})
+    with pytest.raises(AssertionError):
+        cache.load_or_store(
+            {failed_key: [frames[0].map_blocks(_unreadable, dtype=frames[0].dtype)]}
+        )
+    assert not cache.contains(failed_key)
+    assert not any(
+        f.name.endswith(PARTIAL_STORE_SUFFIX) for f in cache.cache_dir.iterdir()
+    )
+
+
+def test_frame_cache_pyramid(tmpdir):
+    pytest.importorskip("zarr")
+    cache = FrameCache(Path(tmpdir) / "cache", pyramid_levels=3)
+    expected = np.random.randint(0, 100, (3, 16, 12), dtype=np.uint16)
+    frames = [da.from_array(frame) for frame in expected]
+    key = FrameCache.key({"source": {"path": "a.czi"}})
+
+    # Every level should be stored with the full resolution frames
+    cached = cache.load_or_store({key: frames}, methods={key: "max"}, level=1)
+    assert [frame.shape for frame in cached[key]] == [(8, 6)] * 3
+    assert cached[key][0][0, 0].compute() == expected[0, :2, :2].max()
+    for level in range(3):
+        assert cache.contains(cache.level_key(key, level, "max"))
+
+    # Cached levels shouldn't be computed again
+    unreadable = [frame.map_blocks(_unreadable, dtype=frame.dtype) for frame in frames]
+    cached = cache.load_or_store({key: unreadable}, methods={key: "max"}, level=2)
+    assert [frame.shape for frame in cached[key]] == [(4, 3)] * 3
+
+    # Missing levels should be built from the cached full resolution frames
+    cached = cache.load_or_store({key: unreadable}, methods={key: "mean"}, level=3)
+    assert [frame.shape for frame in cached[key]] == [(2, 1)] * 3
+
+
+def test_frame_cache_values(tmpdir):
+    pytest.importorskip("zarr")
+    cache = FrameCache(Path(tmpdir) / "cache")
+    data = da.from_array(np.arange(24, dtype=np.uint16).reshape(2, 3, 4))
+    frames = [data[i] for i in range(2)]
+    key = FrameCache.key({"source": {"path": "a.czi"}})
+
+    # Values should be computed and stored with a stream when it's first cached
+    cache.load_or_store({key: frames}, values={key: {"bounds": data.max()}})
+    assert cache.load_values(key) == {"bounds": 23}
+
+    # Values of cached streams shouldn't be computed again
+    cache.load_or_store(
+        {key: frames},
+        values={key: {"bounds": data.map_blocks(_unreadable, dtype=data.dtype)}},
+    )
+    assert cache.load_values(key) == {"bounds": 23}
+
+    # Values added later should be kept with the stored values
+    cache.store_values(key, {"range": np.array([0, 23])})
+    assert cache.load_values(key) == {"bounds": 23, "range": [0, 23]}
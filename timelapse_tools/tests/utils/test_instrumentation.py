@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from pathlib import Path
+
+import dask.array as da
+import numpy as np
+import pytest
+
+from timelapse_tools import conversion
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    single_channel_percentile_norm,
+)
+from timelapse_tools.projection.single_channel_max_project import (
+    single_channel_max_project,
+)
+from timelapse_tools.utils import instrumentation, movie_writing
+from timelapse_tools.utils.instrumentation import Stages
+
+###############################################################################
+
+
+class ListWriter:
+    def __init__(self):
+        self.frames = []
+
+    def append_data(self, frame):
+        self.frames.append(frame)
+
+
+def test_timer_not_recording():
+    # Timers still yield a measurement outside of a run
+    with instrumentation.timer(Stages.Read) as measurement:
+        measurement.nbytes = 10
+
+    assert not instrumentation.is_recording()
+    assert measurement.seconds == 0
+
+
+def test_record_run(tmpdir):
+    with instrumentation.record_run() as recorder:
+        assert instrumentation.is_recording()
+
+        # Stages are attributed to the movie of the thread, except for reads
+        with instrumentation.movie_timer("movie"):
+            with instrumentation.timer(Stages.Read) as measurement:
+                measurement.nbytes = 100
+            with instrumentation.timer(Stages.Cast) as measurement:
+                measurement.nbytes = 10
+        with instrumentation.timer(Stages.Read) as measurement:
+            measurement.nbytes = 50
+
+        # Dask tasks are timed by name
+        da.ones((4, 4), chunks=2).sum().compute()
+
+    # Nothing is recorded after the run
+    with instrumentation.timer(Stages.Read) as measurement:
+        measurement.nbytes = 1000
+    assert not instrumentation.is_recording()
+
+    report = recorder.report()
+    assert report["bytes_read"] == 150
+    assert report["stages"][Stages.Read]["calls"] == 2
+    assert Stages.Read not in report["movies"]["movie"]["stages"]
+    assert report["movies"]["movie"]["stages"][Stages.Cast]["bytes"] == 10
+    assert "process_peak_memory_bytes" not in report["movies"]["movie"]
+    if report["process_peak_memory_bytes"] is not None:
+        assert report["process_peak_memory_bytes"] >= report["start_peak_memory_bytes"]
+    assert report["movies"]["movie"]["wall_seconds"] > 0
+    assert report["finished"] is not None
+    assert report["tasks"]["sum-aggregate"]["calls"] == 1
+    assert report["wall_seconds"] >= report["movies"]["movie"]["wall_seconds"]
+
+    # The report is written as JSON
+    report_path = recorder.write(Path(tmpdir) / instrumentation.RUN_REPORT_NAME)
+    with open(report_path, "r") as read_in:
+        assert json.load(read_in)["bytes_read"] == 150
+
+
+def test_optional_record_run():
+    # Runs are only recorded when requested
+    with instrumentation.optional_record_run(False) as recorder:
+        assert recorder is None
+        assert not instrumentation.is_recording()
+
+    with instrumentation.optional_record_run(True) as recorder:
+        assert recorder is not None
+        assert instrumentation.is_recording()
+
+    # Or when an outer run is recording
+    with instrumentation.record_run() as outer:
+        with instrumentation.optional_record_run(False) as recorder:
+            assert recorder is not None
+            with instrumentation.timer(Stages.Cast):
+                pass
+
+    assert outer.report()["stages"][Stages.Cast]["calls"] == 1
+    assert recorder.report()["stages"][Stages.Cast]["calls"] == 1
+
+
+@pytest.mark.parametrize("n_streams, n_frames", [(1, 5), (3, 10), (2, 0)])
+def test_write_frame_streams_stages(n_streams, n_frames):
+    streams = [
+        [da.ones((4, 5)) * i for i in range(n_frames)] for stream in range(n_streams)
+    ]
+    writers = [ListWriter() for stream in range(n_streams)]
+
+    with instrumentation.record_run() as recorder:
+        with instrumentation.movie_timer("movie"):
+            movie_writing.write_frame_streams(writers, streams, batch_size=3)
+
+    # Frames encoded in the encoder threads count towards the movie
+    report = recorder.report()
+    assert report["frames"] == n_streams * n_frames
+    assert report["movies"]["movie"]["frames"] == n_streams * n_frames
+    if n_frames > 0:
+        assert report["stages"][Stages.Compute]["frames"] == n_streams * n_frames
+        assert report["stages"][Stages.Cast]["bytes"] == n_streams * n_frames * 20
+
+
+def test_generate_movie_report(tmpdir):
+    save_path = Path(tmpdir) / "movies"
+    data = da.random.randint(1, 100, (3, 2, 16, 16), chunks=(1, 1, 16, 16))
+
+    with instrumentation.record_run() as recorder:
+        conversion._generate_movie.run(
+            data=data.astype(np.uint16),
+            selected_indices={"S": 0, "C": 1},
+            dims="SCTZYX",
+            operating_dim="T",
+            save_path=save_path,
+            fps=1,
+            save_format="mp4",
+            normalization_func=single_channel_percentile_norm,
+            normalization_kwargs={},
+            projection_func=single_channel_max_project,
+            projection_kwargs={},
+        )
+
+    # Every movie is reported by its save directory and name
+    report = recorder.report()
+    movie = report["movies"]["movies/dims-S_0_C_1"]
+    assert movie["frames"] == 3
+    assert movie["frames_per_second"] > 0
+    assert Stages.Encode in movie["stages"]
+    assert report["stages"][Stages.Normalize]["calls"] >= 1
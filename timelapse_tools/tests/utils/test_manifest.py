@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import pytest
+
+from timelapse_tools.normalization.single_channel_percentile_norm import (
+    single_channel_percentile_norm,
+)
+from timelapse_tools.utils import manifest
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "a, b, equal",
+    [
+        ({"fps": 12, "S": 0}, {"S": 0, "fps": 12}, True),
+        ({"fps": 12}, {"fps": 24}, False),
+        ({"B": slice(0, 2)}, {"B": slice(0, 2)}, True),
+        ({"B": slice(0, 2)}, {"B": slice(0, 3)}, False),
+        (
+            {"func": single_channel_percentile_norm, "kwargs": {"max_p": 99.8}},
+            {"func": single_channel_percentile_norm, "kwargs": {"max_p": 99.8}},
+            True,
+        ),
+        ({"func": single_channel_percentile_norm}, {"func": max}, False),
+    ],
+)
+def test_params_hash(a, b, equal):
+    assert (manifest.params_hash(a) == manifest.params_hash(b)) == equal
+
+
+def test_source_fingerprint(tmpdir):
+    img = Path(tmpdir) / "img.czi"
+    img.write_bytes(b"abc")
+
+    fingerprint = manifest.source_fingerprint(img)
+    assert fingerprint["path"] == str(img.resolve())
+    assert fingerprint["size"] == 3
+
+    # Changing the file should change the fingerprint
+    img.write_bytes(b"abcd")
+    assert manifest.source_fingerprint(img) != fingerprint
+
+
+def test_is_complete(tmpdir):
+    save_path = Path(tmpdir)
+    record_path = save_path / manifest.MANIFEST_DIR / "dims-S_0.json"
+    output = save_path / "dims-S_0.mp4"
+    source = {"path": "img.czi", "mtime_ns": 1, "size": 3}
+
+    # No record
+    assert manifest.read_record(record_path) is None
+    assert not manifest.is_complete(record_path, source, "a", [output])
+
+    # Only in progress
+    manifest.write_record(
+        record_path, source, "a", manifest.MovieStatus.InProgress, [output]
+    )
+    assert not manifest.is_complete(record_path, source, "a", [output])
+
+    # Complete but the output was removed
+    manifest.write_record(
+        record_path, source, "a", manifest.MovieStatus.Complete, [output]
+    )
+    assert not manifest.is_complete(record_path, source, "a", [output])
+
+    # Complete
+    output.write_bytes(b"movie")
+    assert manifest.is_complete(record_path, source, "a", [output])
+
+    # Changed parameters or source
+    assert not manifest.is_complete(record_path, source, "b", [output])
+    assert not manifest.is_complete(
+        record_path, {**source, "mtime_ns": 2}, "a", [output]
+    )
+
+    # No temporary files should be left behind
+    assert [f.name for f in record_path.parent.iterdir()] == [record_path.name]
+
+
+def test_read_record_corrupt(tmpdir):
+    record_path = Path(tmpdir) / "dims-S_0.json"
+    record_path.write_text("{")
+
+    assert manifest.read_record(record_path) is None
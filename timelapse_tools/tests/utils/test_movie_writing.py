@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import dask.array as da
+import numpy as np
+import pytest
+from imageio import mimread
+
+from timelapse_tools.utils import movie_writing
+
+###############################################################################
+
+
+class ListWriter:
+    def __init__(self, fail_after=None):
+        self.frames = []
+        self.fail_after = fail_after
+        self.closed = False
+
+    def append_data(self, frame):
+        if self.fail_after is not None and len(self.frames) >= self.fail_after:
+            raise IOError("Encoder failed")
+
+        self.frames.append(frame)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize(
+    "n_frames, batch_size, queue_depth",
+    [(10, 1, 1), (10, 3, 2), (10, 8, 16), (3, 8, 16), (0, 8, 16)],
+)
+def test_write_frames(n_frames, batch_size, queue_depth):
+    frames = [da.ones((4, 5)) * i for i in range(n_frames)]
+    writer = ListWriter()
+
+    n_written = movie_writing.write_frames(writer, frames, batch_size, queue_depth)
+
+    # Frames should be written in order and cast to uint8
+    assert n_written == n_frames
+    assert len(writer.frames) == n_frames
+    for i, frame in enumerate(writer.frames):
+        assert frame.dtype == np.uint8
+        assert np.all(frame == i)
+
+
+def test_write_frames_encoder_error():
+    frames = [np.ones((4, 5)) * i for i in range(20)]
+
+    with pytest.raises(IOError):
+        movie_writing.write_frames(ListWriter(fail_after=5), frames, 2, 1)
+
+
+@pytest.mark.parametrize("fail_after", [None, 2])
+def test_write_movies(monkeypatch, fail_after):
+    writers = []
+
+    def get_writer(movie_file, fps, **kwargs):
+        writers.append(ListWriter(fail_after=fail_after))
+        return writers[-1]
+
+    monkeypatch.setattr(movie_writing.imageio, "get_writer", get_writer)
+    streams = [[np.ones((4, 5)) * i for i in range(4)] for _ in range(2)]
+
+    # Every writer should be closed whether or not writing failed
+    if fail_after is None:
+        assert movie_writing.write_movies(["a.mp4", "b.mp4"], streams, fps=1) == 4
+    else:
+        with pytest.raises(IOError):
+            movie_writing.write_movies(["a.mp4", "b.mp4"], streams, fps=1)
+    assert len(writers) == 2
+    assert all(writer.closed for writer in writers)
+
+
+def test_partial_file(tmpdir):
+    output_file = Path(tmpdir) / "dims-S_0_C_0.mp4"
+
+    partial = movie_writing.partial_file(output_file)
+
+    # Hidden in the same directory with the same extension and unique
+    assert partial.parent == output_file.parent
+    assert partial.name.startswith(".dims-S_0_C_0.")
+    assert partial.suffix == ".mp4"
+    assert partial != movie_writing.partial_file(output_file)
+
+
+def test_clean_partial_files(tmpdir):
+    save_path = Path(tmpdir)
+    output_file = save_path / "dims-S_0_C_0.mp4"
+    output_file.write_bytes(b"movie")
+    partials = [movie_writing.partial_file(output_file) for i in range(2)]
+    for partial in partials:
+        partial.write_bytes(b"mov")
+
+    removed = movie_writing.clean_partial_files(save_path)
+
+    # Only the partial files should be removed
+    assert sorted(removed) == sorted(partials)
+    assert [f.name for f in save_path.iterdir()] == [output_file.name]
+
+
+@pytest.mark.parametrize(
+    "quality, encoder_options, expected",
+    [
+        (6, None, {"quality": 6, "macro_block_size": 16}),
+        (
+            6,
+            {"codec": "libx264", "preset": "ultrafast", "threads": 2},
+            {
+                "quality": 6,
+                "macro_block_size": 16,
+                "codec": "libx264",
+                "output_params": ["-preset", "ultrafast", "-threads", "2"],
+            },
+        ),
+        (
+            6,
+            {"preset": "slow", "crf": 18, "pixelformat": "yuv420p"},
+            {
+                "quality": None,
+                "macro_block_size": 16,
+                "pixelformat": "yuv420p",
+                "output_params": ["-preset", "slow", "-crf", "18"],
+            },
+        ),
+        (
+            10,
+            {"bitrate": 4000000, "macro_block_size": 1, "output_params": ["-g", 1]},
+            {
+                "quality": None,
+                "macro_block_size": 1,
+                "bitrate": 4000000,
+                "output_params": ["-g", "1"],
+            },
+        ),
+        pytest.param(
+            6, {"speed": "fast"}, None, marks=pytest.mark.raises(exception=ValueError)
+        ),
+        pytest.param(
+            6,
+            {"crf": 18, "bitrate": 4000000},
+            None,
+            marks=pytest.mark.raises(exception=ValueError),
+        ),
+    ],
+)
+def test_get_writer_kwargs(quality, encoder_options, expected):
+    assert movie_writing.get_writer_kwargs(quality, encoder_options) == expected
+
+
+@pytest.mark.parametrize(
+    "shape, macro_block_size, expected_shape",
+    [
+        ((16, 32), 16, (16, 32)),
+        ((15, 33), 16, (16, 48)),
+        ((15, 33, 3), 16, (16, 48, 3)),
+        ((15, 33), 1, (15, 33)),
+        ((15, 33), None, (15, 33)),
+    ],
+)
+def test_pad_frame(shape, macro_block_size, expected_shape):
+    frame = np.ones(shape)
+
+    for data in [frame, da.from_array(frame)]:
+        padded = movie_writing.pad_frame(data, macro_block_size)
+
+        # Padding should only be added after the original frame
+        assert type(padded) is type(data)
+        assert padded.shape == expected_shape
+        assert np.all(np.asarray(padded)[: shape[0], : shape[1]] == 1)
+        assert np.asarray(padded).sum() == frame.sum()
+
+
+@pytest.mark.parametrize(
+    "n_frames, segment_size, max_workers", [(20, 6, None), (20, 1, 2), (5, 8, None)]
+)
+def test_write_segmented_frame_streams(tmpdir, n_frames, segment_size, max_workers):
+    save_path = Path(tmpdir)
+    movie_files = [save_path / "a.mp4", save_path / "b.mp4"]
+    streams = [
+        [da.ones((16, 16)) * i * 10 for i in range(n_frames)],
+        [np.ones((16, 16)) * (255 - i * 10) for i in range(n_frames)],
+    ]
+
+    n_written = movie_writing.write_segmented_frame_streams(
+        movie_files,
+        streams,
+        segment_size=segment_size,
+        fps=4,
+        writer_kwargs=movie_writing.get_writer_kwargs(quality=10),
+        max_workers=max_workers,
+    )
+
+    # Every frame should be in each movie in order
+    assert n_written == n_frames
+    for movie_file, frames in zip(movie_files, streams):
+        actual = np.stack(mimread(movie_file))
+        assert actual.shape[0] == n_frames
+        expected = np.array([np.asarray(frame).mean() for frame in frames])
+        assert np.allclose(actual.mean(axis=(1, 2, 3)), expected, atol=3)
+
+    # Only the movies should be left
+    assert sorted(save_path.iterdir()) == movie_files
+
+
+def test_concat_movies_error(tmpdir):
+    save_path = Path(tmpdir)
+    segment_file = save_path / "segment.mp4"
+    segment_file.write_bytes(b"not a movie")
+
+    with pytest.raises(IOError):
+        movie_writing.concat_movies([segment_file], save_path / "movie.mp4")
+
+    # The segment list should be cleaned up
+    assert list(save_path.iterdir()) == [segment_file]
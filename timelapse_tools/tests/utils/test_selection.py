@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import pytest
+
+from timelapse_tools.utils import selection
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "selected_indices, save_format, suffix, expected",
+    [
+        ({"S": 0, "C": 1}, "mp4", None, "dims-S_0_C_1.mp4"),
+        ({"S": 0, "C": 1}, ".mp4", "max", "dims-S_0_C_1-max.mp4"),
+        ({}, "mp4", None, "dims-.mp4"),
+        ({}, "gif", "composite", "dims-composite.gif"),
+    ],
+)
+def test_get_output_file(selected_indices, save_format, suffix, expected):
+    actual = selection.get_output_file(
+        Path("movies"), selected_indices, save_format, suffix
+    )
+    assert actual == Path("movies") / expected
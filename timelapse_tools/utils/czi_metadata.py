@@ -34,3 +34,21 @@ def time_per_frame(czi):
 def total_duration(czi):
     """Waiting on subblock metadata"""
     return "Unavailable"
+
+
+def physical_pixel_sizes(czi):
+    """Physical size of a step along each scaled dimension, in meters"""
+    path = "./Metadata/Scaling/Items/Distance"
+    distances = czi.meta.findall(path)
+    return {d.get("Id"): float(d.find("Value").text) for d in distances}
+
+
+def z_anisotropy(czi):
+    """
+    How many times larger a Z step is than an X pixel, or None when either isn't
+    scaled, such as for 2D and single plane acquisitions
+    """
+    sizes = physical_pixel_sizes(czi)
+    if "Z" not in sizes or not sizes.get("X"):
+        return None
+    return sizes["Z"] / sizes["X"]
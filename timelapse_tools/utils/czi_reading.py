@@ -2,13 +2,21 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from itertools import product
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import dask.array as da
 import numpy as np
 from aicspylibczi import CziFile
-from dask import delayed
+from dask.base import tokenize
+
+from .downsampling import block_mean
+from .instrumentation import Stages, timer
 
 ###############################################################################
 
@@ -16,16 +24,173 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# The maximum number of open CziFile handles each worker thread will hold onto
+CZI_FILE_POOL_SIZE = 8
+
+# The Y and X chunk size of stitched mosaics when the tile size is unavailable
+DEFAULT_MOSAIC_CHUNK_SIZE = 1024
+
+# Single sample CZI pixel types and their matching numpy dtypes
+CZI_PIXEL_TYPES = {
+    "Gray8": np.dtype(np.uint8),
+    "Gray16": np.dtype(np.uint16),
+    "Gray32": np.dtype(np.int32),
+    "Gray32Float": np.dtype(np.float32),
+    "Gray64Float": np.dtype(np.float64),
+}
+
+###############################################################################
+
+
+class CziFilePool:
+    """
+    A bounded, least-recently-used cache of open CziFile handles.
+
+    Handles are keyed by the resolved file path, the file modification time, and the
+    reader that opened them so a file that has been rewritten since it was opened will
+    be reopened.
+
+    Parameters
+    ----------
+    max_size: int
+        The maximum number of open handles to hold before evicting the least
+        recently used.
+        Default: CZI_FILE_POOL_SIZE (8)
+    """
+
+    def __init__(self, max_size: int = CZI_FILE_POOL_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, img: Union[str, Path], reader: Optional[Callable[[Path], Any]] = None
+    ) -> CziFile:
+        # Key by resolved path, modification time, and reader
+        img = Path(img).expanduser().resolve(strict=True)
+        reader = reader or CziFile
+        key = (str(img), os.stat(img).st_mtime_ns, reader)
+
+        with self._lock:
+            # Return the cached handle if we have one
+            if key in self._handles:
+                self.hits += 1
+                self._handles.move_to_end(key)
+                return self._handles[key]
+
+            # Otherwise open the file and store the handle
+            self.misses += 1
+            with timer(Stages.CziOpen):
+                czi = reader(img)
+            self._handles[key] = czi
+
+            # Evict the least recently used handles past the max size
+            while len(self._handles) > self.max_size:
+                self._handles.popitem(last=False)
+
+            return czi
+
+    def clear(self):
+        with self._lock:
+            self._handles.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._handles),
+                "max_size": self.max_size,
+            }
+
+
+# CziFile handles are not shared between threads, each worker thread lazily creates
+# its own pool. All pools are tracked so that stats can be reported for the process.
+_thread_local = threading.local()
+_all_pools = weakref.WeakSet()
+
+
+def _get_czi_file_pool() -> CziFilePool:
+    pool = getattr(_thread_local, "pool", None)
+    if pool is None:
+        pool = CziFilePool()
+        _thread_local.pool = pool
+        _all_pools.add(pool)
+
+    return pool
+
+
+def get_czi_file(
+    img: Union[str, Path], reader: Optional[Callable[[Path], Any]] = None
+) -> CziFile:
+    """
+    Get an open CziFile handle for a file from the current worker's handle pool.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        The filepath to open.
+    reader: Optional[Callable[[Path], Any]]
+        A callable opening the file in place of CziFile. See daread.
+        Default: None (aicspylibczi.CziFile)
+
+    Returns
+    -------
+    czi: CziFile
+        An open CziFile handle. The handle is shared with any other reads of the same
+        unmodified file made by this worker and should not be closed by the caller.
+    """
+    return _get_czi_file_pool().get(img, reader)
+
+
+def czi_file_pool_info() -> Dict[str, int]:
+    """
+    Get the summed hit, miss, and size counters of every CziFile handle pool in this
+    process.
+
+    Returns
+    -------
+    info: Dict[str, int]
+        The "hits", "misses", and "size" (open handles) counters and the number of
+        "pools" (worker threads) that have read files.
+    """
+    info = {"hits": 0, "misses": 0, "size": 0, "pools": 0}
+    for pool in list(_all_pools):
+        pool_info = pool.info()
+        info["hits"] += pool_info["hits"]
+        info["misses"] += pool_info["misses"]
+        info["size"] += pool_info["size"]
+        info["pools"] += 1
+
+    return info
+
+
+def clear_czi_file_pools():
+    """
+    Drop every cached CziFile handle and reset the pool counters for this process.
+    """
+    for pool in list(_all_pools):
+        pool.clear()
+
+
+###############################################################################
+
 
 def _read_image(
-    img: Path, read_dims: Optional[Dict[str, int]] = None
+    img: Path,
+    read_dims: Optional[Dict[str, int]] = None,
+    reader: Optional[Callable[[Path], Any]] = None,
 ) -> Tuple[np.ndarray, List[Tuple[str, int]]]:
     # Catch optional read dim
     if read_dims is None:
         read_dims = {}
 
-    # Init czi
-    czi = CziFile(img)
+    # Get czi
+    czi = get_czi_file(img, reader)
 
     # Read image
     log.debug(f"Reading dimensions: {read_dims}")
@@ -51,33 +216,360 @@ def _read_image(
     return data[tuple(ops)], real_dims
 
 
-def _imread(img: Path, read_dims: Optional[Dict[str, int]] = None) -> np.ndarray:
-    data, dims = _read_image(img, read_dims)
+def _crop_and_downsample(
+    data: np.ndarray, roi: Optional[Tuple[int, int, int, int]], scale_factor: int
+) -> np.ndarray:
+    # Crop the last two dimensions to the region of interest
+    if roi is not None:
+        x, y, w, h = roi
+        data = data[..., y : y + h, x : x + w]
+
+    # Downsample the last two dimensions
+    if scale_factor > 1:
+        data = block_mean(data, scale_factor)
+
     return data
 
 
-def daread(img: Union[str, Path]) -> da.core.Array:
+def _read_chunk(
+    img: Path,
+    dims: List[str],
+    read_ranges: List[Optional[Tuple[int, int]]],
+    block_shape: Tuple[int],
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    scale_factor: int = 1,
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> np.ndarray:
+    # Dimensions with a read range are read one index at a time, dimensions without
+    # a read range are read in full by each read_image call
+    ranged = [
+        (dim, read_range) for dim, read_range in zip(dims, read_ranges) if read_range
+    ]
+
+    # Iter over every combination of the ranged indices and place each read into
+    # the chunk
+    chunk = None
+    for indices in product(*(range(*read_range) for dim, read_range in ranged)):
+        read_dims = {dim: index for (dim, read_range), index in zip(ranged, indices)}
+        with timer(Stages.Read) as measurement:
+            data, data_dims = _read_image(img, read_dims, reader)
+            measurement.nbytes = data.nbytes
+
+        # Reduce each read to the requested region and scale before it is placed so
+        # that the chunk is only ever allocated at the output size
+        data = _crop_and_downsample(data, roi, scale_factor)
+
+        # Init the chunk now that we know the dtype
+        if chunk is None:
+            chunk = np.empty(block_shape, dtype=data.dtype)
+
+        # Generate the chunk location for this read
+        chunk_location = []
+        for dim, read_range in zip(dims, read_ranges):
+            if read_range:
+                offset = read_dims[dim] - read_range[0]
+                chunk_location.append(slice(offset, offset + 1))
+            else:
+                chunk_location.append(slice(None, None, None))
+
+        # Read dims were dropped by _read_image so add them back as single planes
+        chunk_location = tuple(chunk_location)
+        chunk[chunk_location] = data.reshape(chunk[chunk_location].shape)
+
+    return chunk
+
+
+def _get_plane_info(
+    czi: CziFile, image_dims: Dict[str, Tuple[int, int]]
+) -> Tuple[Tuple[int, int], np.dtype]:
+    # Setup the read dimensions dictionary for the first plane
+    first_plane_read_dims = {
+        dim: dim_begin_index for dim, (dim_begin_index, _) in image_dims.items()
+    }
+
+    # Get the pixel type from the reader if it is available, otherwise from metadata
+    pixel_type = getattr(czi, "pixel_type", None)
+    if pixel_type is None:
+        pixel_type_xml = czi.meta.find("./Metadata/Information/Image/PixelType")
+        if pixel_type_xml is not None:
+            pixel_type = pixel_type_xml.text
+    dtype = CZI_PIXEL_TYPES.get(pixel_type)
+
+    # Get the plane shape from the first subblock bounding box if the reader exposes
+    # the subblock directory
+    yx_shape = None
+    if hasattr(czi, "get_tile_bounding_box"):
+        bbox = czi.get_tile_bounding_box(**first_plane_read_dims)
+        yx_shape = (bbox.h, bbox.w)
+
+    # Otherwise the image size in the metadata is the plane size as long as there
+    # aren't multiple scenes or tiles spread out over the image
+    else:
+        n_scenes = image_dims.get("S", (0, 1))[1] - image_dims.get("S", (0, 1))[0]
+        if n_scenes <= 1 and "M" not in image_dims:
+            size_y = czi.meta.find("./Metadata/Information/Image/SizeY")
+            size_x = czi.meta.find("./Metadata/Information/Image/SizeX")
+            if size_y is not None and size_x is not None:
+                yx_shape = (int(size_y.text), int(size_x.text))
+
+    # Fall back to reading the first plane if the metadata couldn't be used
+    if yx_shape is None or dtype is None:
+        log.debug(
+            f"Plane shape and dtype could not be determined from metadata. "
+            f"Reading first plane: {first_plane_read_dims}"
+        )
+        sample, sample_dims = czi.read_image(**first_plane_read_dims)
+        return sample.shape[-2:], sample.dtype
+
+    return yx_shape, dtype
+
+
+def _get_output_plane_shape(
+    yx_shape: Tuple[int, int],
+    roi: Optional[Tuple[int, int, int, int]],
+    scale_factor: int,
+) -> Tuple[int, int]:
+    # Check the region of interest fits in the plane
+    if roi is not None:
+        if len(roi) != 4:
+            raise ValueError(
+                f"The region of interest must be provided as (x, y, width, height). "
+                f"Received: {roi}."
+            )
+        x, y, w, h = (int(value) for value in roi)
+        inside = x >= 0 and y >= 0 and w >= 1 and h >= 1
+        if not inside or y + h > yx_shape[0] or x + w > yx_shape[1]:
+            raise ValueError(
+                f"The region of interest must be within the YX plane. "
+                f"Received: {roi}. Plane shape (Y, X): {yx_shape}."
+            )
+        yx_shape = (h, w)
+
+    # Check the scale factor leaves at least a single pixel
+    if not isinstance(scale_factor, (int, np.integer)) or scale_factor < 1:
+        raise ValueError(
+            f"The scale factor must be a positive integer. Received: {scale_factor}."
+        )
+    if scale_factor > min(yx_shape):
+        raise ValueError(
+            f"The scale factor must not be larger than the YX plane. "
+            f"Received: {scale_factor}. Plane shape (Y, X): {yx_shape}."
+        )
+
+    return (yx_shape[0] // scale_factor, yx_shape[1] // scale_factor)
+
+
+def _is_mosaic(czi: CziFile) -> bool:
+    # Only treat files as mosaics when the reader can stitch them
+    return (
+        "M" in czi.dims
+        and hasattr(czi, "read_mosaic")
+        and hasattr(czi, "read_mosaic_size")
+        and czi.is_mosaic()
+    )
+
+
+def _fit_plane(data: np.ndarray, yx_shape: Tuple[int, int]) -> np.ndarray:
+    # Scaled mosaic reads may be off by a pixel from the requested size, nearest
+    # neighbor sample to the exact size
+    data = data.reshape(data.shape[-2:])
+    if data.shape == yx_shape:
+        return data
+
+    y_indices = (np.arange(yx_shape[0]) * data.shape[0]) // yx_shape[0]
+    x_indices = (np.arange(yx_shape[1]) * data.shape[1]) // yx_shape[1]
+    return data[np.ix_(y_indices, x_indices)]
+
+
+def _read_mosaic_chunk(
+    img: Path,
+    dims: List[str],
+    read_ranges: List[Tuple[int, int]],
+    region: Tuple[int, int, int, int],
+    scale_factor: int,
+    block_shape: Tuple[int],
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> np.ndarray:
+    # Get czi
+    czi = get_czi_file(img, reader)
+
+    # Stitch the region of every plane in the chunk, only the tiles intersecting the
+    # region are read
+    chunk = None
+    for indices in product(*(range(*read_range) for read_range in read_ranges)):
+        read_dims = dict(zip(dims, indices))
+        log.debug(f"Reading mosaic region {region} of dimensions: {read_dims}")
+        with timer(Stages.Read) as measurement:
+            data = czi.read_mosaic(
+                region=region, scale_factor=1 / scale_factor, **read_dims
+            )
+            measurement.nbytes = data.nbytes
+
+        # Init the chunk now that we know the dtype
+        if chunk is None:
+            chunk = np.empty(block_shape, dtype=data.dtype)
+
+        # Place the plane
+        chunk_location = tuple(
+            index - read_range[0] for index, read_range in zip(indices, read_ranges)
+        )
+        chunk[chunk_location] = _fit_plane(data, block_shape[-2:])
+
+    return chunk
+
+
+def _daread_mosaic(
+    img: Path,
+    czi: CziFile,
+    chunks: Dict[str, int],
+    roi: Optional[Tuple[int, int, int, int]],
+    scale_factor: int,
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> Tuple[da.core.Array, str]:
+    image_dims = czi.dims_shape()
+    _, dtype = _get_plane_info(czi, image_dims)
+
+    # Every dimension other than the tiles and the stitched plane
+    dims = [dim for dim in czi.dims if dim not in ("M", "Y", "X")]
+    operating_shape = tuple(image_dims[dim][1] - image_dims[dim][0] for dim in dims)
+
+    # Get the stitched plane bounding box and the requested part of it
+    bbox = czi.read_mosaic_size()
+    yx_shape = _get_output_plane_shape((bbox.h, bbox.w), roi, scale_factor)
+    roi_x, roi_y = (int(roi[0]), int(roi[1])) if roi is not None else (0, 0)
+
+    # Chunk the stitched plane by the tile size by default
+    if hasattr(czi, "get_tile_bounding_box"):
+        tile = czi.get_tile_bounding_box(
+            **{dim: begin for dim, (begin, _) in image_dims.items()}
+        )
+        tile_shape = (tile.h, tile.w)
+    else:
+        tile_shape = (DEFAULT_MOSAIC_CHUNK_SIZE, DEFAULT_MOSAIC_CHUNK_SIZE)
+    chunks = {
+        "Y": max(tile_shape[0] // scale_factor, 1),
+        "X": max(tile_shape[1] // scale_factor, 1),
+        **chunks,
+    }
+
+    # Check the requested chunking
+    for dim in chunks:
+        if dim not in dims + ["Y", "X"]:
+            raise ValueError(
+                f"Invalid chunk dimension provided. "
+                f"Provided chunk dimension: '{dim}'. "
+                f"Valid chunk dimensions for this mosaic: {dims + ['Y', 'X']}."
+            )
+
+    # Normalize the requested chunking to the chunk sizes along each dimension
+    chunks = da.core.normalize_chunks(
+        tuple(chunks.get(dim, 1) for dim in dims) + (chunks["Y"], chunks["X"]),
+        shape=operating_shape + yx_shape,
+        dtype=dtype,
+    )
+
+    # Build the graph directly from the chunk indices. Each chunk reads the region of
+    # the stitched plane it covers, at full resolution coordinates, for every plane
+    # in its index range.
+    name = "daread-mosaic-" + tokenize(
+        str(img), os.stat(img).st_mtime_ns, chunks, roi, scale_factor, reader
+    )
+    chunk_begins = [np.cumsum((0,) + dim_chunks[:-1]) for dim_chunks in chunks]
+    dsk = {}
+    for chunk_index in product(*(range(len(dim_chunks)) for dim_chunks in chunks)):
+        chunk_location = [
+            (int(begins[i]), int(dim_chunks[i]))
+            for begins, dim_chunks, i in zip(chunk_begins, chunks, chunk_index)
+        ]
+        read_ranges = [
+            (image_dims[dim][0] + begin, image_dims[dim][0] + begin + size)
+            for dim, (begin, size) in zip(dims, chunk_location[:-2])
+        ]
+        (y_begin, height), (x_begin, width) = chunk_location[-2:]
+        region = (
+            bbox.x + roi_x + x_begin * scale_factor,
+            bbox.y + roi_y + y_begin * scale_factor,
+            width * scale_factor,
+            height * scale_factor,
+        )
+
+        dsk[(name,) + chunk_index] = (
+            _read_mosaic_chunk,
+            img,
+            dims,
+            read_ranges,
+            region,
+            scale_factor,
+            tuple(size for begin, size in chunk_location),
+            reader,
+        )
+
+    return da.Array(dsk, name, chunks, dtype=dtype), "".join(dims + ["Y", "X"])
+
+
+def daread(
+    img: Union[str, Path],
+    chunks: Optional[Dict[str, int]] = None,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    scale_factor: int = 1,
+    stitch_mosaic: bool = True,
+    reader: Optional[Callable[[Path], Any]] = None,
+) -> da.core.Array:
     """
-    Read a CZI image file as a delayed dask array where each YX plane will be read on
+    Read a CZI image file as a delayed dask array where each chunk will be read on
     request.
 
     Parameters
     ----------
     img: Union[str, Path]
         The filepath to read.
+    chunks: Optional[Dict[str, int]]
+        A mapping of dimension name to the number of planes each chunk should contain
+        for that dimension. A value of -1 places the entire dimension in each chunk.
+        Any dimension not provided is chunked a single plane at a time. The Y and X
+        dimensions are always read in full.
+        Example: {"Z": -1} reads each full Z-stack with a single task.
+        Default: None (each YX plane is a chunk)
+    roi: Optional[Tuple[int, int, int, int]]
+        A region of interest of each YX plane to read, as (x, y, width, height) in
+        pixels from the top left of the plane.
+        Default: None (read the full plane)
+    scale_factor: int
+        Downsample the Y and X dimensions by averaging blocks of this many pixels
+        along each. Any rows or columns that don't fill a whole block are dropped.
+        Default: 1 (no downsampling)
+    stitch_mosaic: bool
+        For mosaic files, read the stitched plane of every scene, timepoint, channel,
+        and Z-slice instead of each tile. The Y and X dimensions are then chunked by
+        the tile size, or by "Y" and "X" values in `chunks`, and each chunk only reads
+        the tiles intersecting it. The region of interest is relative to the top left
+        of the stitched plane.
+        Default: True
+    reader: Optional[Callable[[Path], Any]]
+        A callable opening the file, or directory, in place of CziFile, e.g. a
+        synthetic image generator for benchmarks or
+        timelapse_tools.zarr_conversion.OmeZarrFile. It must return an object
+        implementing the parts of the CziFile interface used here: `dims`, `size`,
+        `dims_shape()`, `is_mosaic()`, and `read_image(**read_dims)`, and optionally
+        `pixel_type` and `get_tile_bounding_box(**read_dims)`. Readers are sent to
+        every worker with the read tasks, so must be picklable, e.g. a module level
+        class, for the process and distributed schedulers.
+        Default: None (aicspylibczi.CziFile)
 
     Returns
     -------
     img: dask.array.core.Array
-        The constructed dask array where each YX plane is a delayed read.
+        The constructed dask array where each chunk is a delayed read.
+    dims: str
+        The dimension order of the constructed dask array.
     """
     # Convert pathlike to CziFile
     if isinstance(img, (str, Path)):
         # Resolve path
         img = Path(img).expanduser().resolve(strict=True)
 
-        # Check path
-        if img.is_dir():
+        # Check path, readers may open directories such as Zarr stores
+        if img.is_dir() and reader is None:
             raise IsADirectoryError(
                 f"Please provide a single file to the `img` parameter. "
                 f"Received directory: {img}"
@@ -91,58 +583,89 @@ def daread(img: Union[str, Path]) -> da.core.Array:
             f"Received type: {type(img)}"
         )
 
-    # Init temp czi
-    czi = CziFile(img)
+    # Get czi
+    czi = get_czi_file(img, reader)
+
+    # Read mosaics as their stitched planes
+    if stitch_mosaic and _is_mosaic(czi):
+        return _daread_mosaic(img, czi, chunks or {}, roi, scale_factor, reader)
 
     # Get image dims shape
     image_dims = czi.dims_shape()
 
-    # Setup the read dimensions dictionary for reading the first plane
-    first_plane_read_dims = {}
-    for dim, dim_info in image_dims.items():
-        # Unpack dimension info
-        dim_begin_index, dim_end_index = dim_info
-
-        # Add to read dims
-        first_plane_read_dims[dim] = dim_begin_index
-
-    # Read first plane for information used by dask.array.from_delayed
-    sample, sample_dims = czi.read_image(**first_plane_read_dims)
-
+    # Get the YX shape and dtype of a plane for constructing the chunks.
     # The Y and X dimensions are always the last two dimensions, in that order.
     # These dimensions cannot be operated over but the shape information is used
     # in multiple places so we pull them out for easier access.
-    sample_YX_shape = sample.shape[-2:]
+    sample_YX_shape, sample_dtype = _get_plane_info(czi, image_dims)
+
+    # Get the YX shape of each plane after cropping and downsampling
+    sample_YX_shape = _get_output_plane_shape(sample_YX_shape, roi, scale_factor)
+    if roi is not None:
+        roi = tuple(int(value) for value in roi)
 
     # Create operating shape and dim order list
     operating_shape = czi.size[:-2]
     dims = [dim for dim in czi.dims[:-2]]
 
-    # Create empty numpy array with the operating shape so that we can iter through
-    # and use the multi_index to create the readers.
-    # We add empty dimensions of size one to fake being the Y and X dimensions.
-    lazy_arrays = np.ndarray(operating_shape + (1, 1), dtype=object)
-
-    # We can enumerate over the multi-indexed array and construct read_dims
-    # dictionaries by simply zipping together the ordered dims list and the current
-    # multi-index plus the begin index for that plane.
-    # We then set the value of the array at the same multi-index to
-    # the delayed reader using the constructed read_dims dictionary.
-    begin_indicies = tuple(image_dims[dim][0] for dim in dims)
-    for i, _ in np.ndenumerate(lazy_arrays):
-        this_plane_read_indicies = (
-            current_dim_begin_index + curr_dim_index
-            for current_dim_begin_index, curr_dim_index in zip(begin_indicies, i)
-        )
-        this_plane_read_dims = dict(zip(dims, this_plane_read_indicies))
-        lazy_arrays[i] = da.from_delayed(
-            delayed(_imread)(img, this_plane_read_dims),
-            shape=sample_YX_shape,
-            dtype=sample.dtype,
+    # Check the requested chunking
+    if chunks is None:
+        chunks = {}
+    for dim in chunks:
+        if dim not in dims:
+            raise ValueError(
+                f"Invalid chunk dimension provided. "
+                f"Provided chunk dimension: '{dim}'. "
+                f"Valid chunk dimensions for this image: {dims}."
+            )
+
+    # Normalize the requested chunking to the chunk sizes along each dimension
+    chunks = da.core.normalize_chunks(
+        tuple(chunks.get(dim, 1) for dim in dims) + sample_YX_shape,
+        shape=operating_shape + sample_YX_shape,
+        dtype=sample_dtype,
+    )
+
+    # Build the graph directly from the chunk indices. Each chunk is a single task
+    # that reads the planes in its index range. Dimensions fully covered by a chunk
+    # are left out of the read ranges so that they are read by a single
+    # read_image call.
+    name = "daread-" + tokenize(
+        str(img), os.stat(img).st_mtime_ns, chunks, roi, scale_factor, reader
+    )
+    dim_chunk_begins = [np.cumsum((0,) + dim_chunks[:-1]) for dim_chunks in chunks]
+    dsk = {}
+    for chunk_index in product(*(range(len(dim_chunks)) for dim_chunks in chunks)):
+        read_ranges = []
+        block_shape = []
+        for dim_i, dim in enumerate(dims):
+            dim_begin_index, dim_end_index = image_dims[dim]
+            chunk_size = chunks[dim_i][chunk_index[dim_i]]
+            chunk_begin = dim_begin_index + int(
+                dim_chunk_begins[dim_i][chunk_index[dim_i]]
+            )
+
+            # Only read a dimension in full if it is the entire chunk and has more
+            # than a single plane
+            if chunk_size == operating_shape[dim_i] and chunk_size > 1:
+                read_ranges.append(None)
+            else:
+                read_ranges.append((chunk_begin, chunk_begin + chunk_size))
+
+            block_shape.append(chunk_size)
+
+        dsk[(name,) + chunk_index] = (
+            _read_chunk,
+            img,
+            dims,
+            read_ranges,
+            tuple(block_shape) + sample_YX_shape,
+            roi,
+            scale_factor,
+            reader,
         )
 
-    # Convert the numpy array of lazy readers into a dask array
-    merged = da.block(lazy_arrays.tolist())
+    merged = da.Array(dsk, name, chunks, dtype=sample_dtype)
 
     # Because dimensions outside of Y and X can be in any order and present or not
     # we also return the dimension order string.
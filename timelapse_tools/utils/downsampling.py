@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+import dask.array as da
+import numpy as np
+
+###############################################################################
+
+Array = Union[da.core.Array, np.ndarray]
+
+###############################################################################
+
+
+def rounded_mean(
+    blocks: np.ndarray, axis: Optional[Tuple[int, ...]] = None
+) -> np.ndarray:
+    """
+    Average blocks along the provided axes, keeping the dtype of the blocks.
+
+    Integer means are rounded to the nearest value, with halves rounded up, so that
+    every downsampled read, frame, and pyramid level agrees. Usable as a
+    dask.array.coarsen reduction.
+
+    Parameters
+    ----------
+    blocks: np.ndarray
+        The blocks to average.
+    axis: Optional[Tuple[int, ...]]
+        The axes to average along.
+        Default: None (average every axis)
+
+    Returns
+    -------
+    mean: np.ndarray
+        The mean of each block, with the same dtype as the blocks.
+    """
+    if axis is None:
+        axis = tuple(range(blocks.ndim))
+
+    if np.issubdtype(blocks.dtype, np.integer):
+        n_pixels = max(int(np.prod([blocks.shape[i] for i in axis])), 1)
+        sums = blocks.sum(axis=axis, dtype=np.int64)
+        return ((sums + n_pixels // 2) // n_pixels).astype(blocks.dtype)
+
+    return blocks.mean(axis=axis).astype(blocks.dtype)
+
+
+def block_mean(
+    data: Array,
+    factor: int,
+    axes: Sequence[int] = (-2, -1),
+    reduction: Callable = rounded_mean,
+) -> Array:
+    """
+    Downsample data by averaging blocks of pixels. See rounded_mean.
+
+    Any other reduction of blocks, such as np.max, can be used in place of the mean.
+
+    Parameters
+    ----------
+    data: Union[da.core.Array, np.ndarray]
+        The data to downsample.
+    factor: int
+        The number of pixels along each axis to average into a single pixel. Any
+        pixels that don't fill a whole block are dropped.
+    axes: Sequence[int]
+        The axes to downsample.
+        Default: (-2, -1) (the YX dimensions)
+    reduction: Callable
+        The reduction combining each block into a single pixel, called with the
+        blocks and an `axis` tuple, keeping the dtype of the blocks.
+        Default: rounded_mean
+
+    Returns
+    -------
+    downsampled: Union[da.core.Array, np.ndarray]
+        The downsampled data, with the same dtype and array type as the data.
+    """
+    factors = {axis % data.ndim: factor for axis in axes}
+
+    if isinstance(data, da.core.Array):
+        # Align chunks to blocks so that each block is averaged within a single chunk
+        data = data.rechunk(
+            {
+                axis: max(factor, data.chunksize[axis] // factor * factor)
+                for axis in factors
+            }
+        )
+        return da.coarsen(reduction, data, factors, trim_excess=True)
+
+    # Trim to whole blocks then split every dimension into blocks to average
+    trimmed = data[
+        tuple(
+            slice(0, size // factors.get(i, 1) * factors.get(i, 1))
+            for i, size in enumerate(data.shape)
+        )
+    ]
+    shape = []
+    for i, size in enumerate(trimmed.shape):
+        shape.extend([size // factors.get(i, 1), factors.get(i, 1)])
+
+    return reduction(trimmed.reshape(shape), axis=tuple(range(1, len(shape), 2)))
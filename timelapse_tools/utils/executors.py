@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from typing import Any, Iterator, Optional
+
+import dask
+from prefect.engine.executors import LocalDaskExecutor
+
+###############################################################################
+
+
+class BoundedLocalDaskExecutor(LocalDaskExecutor):
+    """
+    A local threaded executor whose workflow tasks share a single bounded pool of
+    threads for every Dask computation they run.
+
+    Workflow tasks, such as movie generations, are run concurrently. Each task only
+    waits on computations, such as reading and projecting frames, run on the shared
+    pool, so a whole run uses at most `max_concurrency` compute threads no matter how
+    many tasks are running.
+
+    Parameters
+    ----------
+    max_concurrency: int
+        The number of workflow tasks each wait runs at the same time, and the number
+        of threads shared by every computation run by the tasks.
+    """
+
+    def __init__(self, max_concurrency: int):
+        super().__init__(scheduler="threads")
+        self.max_concurrency = max_concurrency
+        self._compute_pool: Optional[ThreadPool] = None
+
+    @contextmanager
+    def start(self) -> Iterator:
+        # Computations inside workflow tasks run on the shared pool by default
+        self._compute_pool = ThreadPool(self.max_concurrency)
+        try:
+            with dask.config.set(scheduler="threads", pool=self._compute_pool) as cfg:
+                yield cfg
+        finally:
+            self._compute_pool.close()
+            self._compute_pool = None
+
+    def wait(self, futures: Any) -> Any:
+        # Workflow tasks run on their own pool, mapped tasks wait on their children
+        # from inside a task so they can't hold threads of the pool they wait on
+        pool = ThreadPool(self.max_concurrency)
+        try:
+            return dask.compute(futures, scheduler="threads", pool=pool)[0]
+        finally:
+            pool.close()
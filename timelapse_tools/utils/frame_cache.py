@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import dask
+import dask.array as da
+import numpy as np
+
+from ..projection.pyramid import build_pyramid
+from . import manifest
+from .instrumentation import Stages, timer
+from .zarr_writing import import_zarr
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+Frames = List[Union[da.core.Array, np.ndarray]]
+
+# Suffix of stores still being written
+PARTIAL_STORE_SUFFIX = ".partial"
+
+###############################################################################
+
+
+class FrameCache:
+    """
+    An on-disk cache of raw projected frames, stored as one Zarr array per movie
+    stream, with a chunk for every frame.
+
+    Streams are stored under a key hashed from the source file fingerprint, the
+    selected data, and the projection parameters. Re-rendering a movie with different
+    display settings (fps, encoder options, normalization, colors) then reads the
+    cached 2D frames rather than the full source file.
+
+    Every stream is also stored as a pyramid of levels, each downsampled by 2 from
+    the level before it, so that previews at any level are rendered from the cache.
+
+    Values computed from the source data of a stream, such as normalization bounds,
+    can be stored with the stream so that they don't need to be fitted on the
+    projected frames.
+
+    Parameters
+    ----------
+    cache_dir: Union[str, Path]
+        The directory to store cached frames in. Created if it doesn't exist.
+    pyramid_levels: int
+        The number of pyramid levels to store for every stream, including the full
+        resolution frames.
+        Default: 1 (only the full resolution frames)
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], pyramid_levels: int = 1):
+        import_zarr()
+        if pyramid_levels < 1:
+            raise ValueError(
+                f"The number of pyramid levels must be a positive integer. "
+                f"Received: {pyramid_levels}."
+            )
+        self.cache_dir = Path(cache_dir).expanduser().resolve()
+        self.pyramid_levels = pyramid_levels
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        """
+        Get the key of a stream of frames.
+
+        Parameters
+        ----------
+        params: Dict[str, Any]
+            The source file fingerprint (see manifest.source_fingerprint) and every
+            parameter that changes the raw projected frames.
+
+        Returns
+        -------
+        key: str
+            The hash of the parameters.
+        """
+        return manifest.params_hash(params)
+
+    def store_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.zarr"
+
+    def contains(self, key: str) -> bool:
+        # Stores are only moved into place once every frame has been written
+        return self.store_path(key).is_dir()
+
+    def load(self, key: str) -> List[da.core.Array]:
+        """
+        Lazily read the cached frames of a stream.
+
+        Parameters
+        ----------
+        key: str
+            The stream key. See FrameCache.key.
+
+        Returns
+        -------
+        frames: List[da.core.Array]
+            The cached frames.
+        """
+        stack = da.from_zarr(str(self.store_path(key)))
+        return [stack[i] for i in range(stack.shape[0])]
+
+    def load_values(self, key: str) -> Dict[str, Any]:
+        """
+        Read the values stored with a cached stream.
+
+        Parameters
+        ----------
+        key: str
+            The stream key. See FrameCache.key.
+
+        Returns
+        -------
+        values: Dict[str, Any]
+            The stored values, by value name. Arrays are read back as lists.
+        """
+        zarr = import_zarr()
+        return dict(
+            zarr.open_array(str(self.store_path(key)), mode="r").attrs.get("values", {})
+        )
+
+    def store_values(self, key: str, values: Dict[str, Any]):
+        """
+        Store values with a cached stream, keeping any other values already stored.
+
+        Parameters
+        ----------
+        key: str
+            The stream key. See FrameCache.key.
+        values: Dict[str, Any]
+            The computed values to store, by value name. Arrays are stored as lists.
+        """
+        self._write_values(self.store_path(key), values)
+
+    @staticmethod
+    def _write_values(store_path: Path, values: Dict[str, Any]):
+        zarr = import_zarr()
+        attrs = zarr.open_array(str(store_path), mode="r+").attrs
+        attrs["values"] = {
+            **attrs.get("values", {}),
+            **{name: np.asarray(value).tolist() for name, value in values.items()},
+        }
+
+    @staticmethod
+    def level_key(key: str, level: int, method: str) -> str:
+        """
+        Get the key of a pyramid level of a stream of frames.
+
+        Parameters
+        ----------
+        key: str
+            The stream key. See FrameCache.key.
+        level: int
+            The pyramid level, 0 for full resolution frames.
+        method: str
+            The pyramid method. See projection.pyramid.downsample_frame.
+
+        Returns
+        -------
+        key: str
+            The key of the level, the stream key itself for full resolution frames.
+        """
+        if level == 0:
+            return key
+
+        return manifest.params_hash({"key": key, "level": level, "method": method})
+
+    def _store(self, streams: Dict[str, Frames], values: Dict[str, Dict[str, Any]]):
+        # Write every stream to a partial store, computing all streams and their
+        # values together so that the source data is only read once
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        partials = {}
+        writes = []
+        for key, frames in streams.items():
+            stack = da.stack([da.asarray(frame) for frame in frames])
+            stack = stack.rechunk((1,) + stack.shape[1:])
+            partials[key] = self.cache_dir / (
+                f"{key}.{uuid.uuid4().hex}{PARTIAL_STORE_SUFFIX}"
+            )
+            writes.append(da.to_zarr(stack, str(partials[key]), compute=False))
+
+        try:
+            with timer(Stages.Cache) as measurement:
+                _, computed = dask.compute(
+                    writes, {key: values[key] for key in streams if key in values}
+                )
+                measurement.frames = sum(len(frames) for frames in streams.values())
+
+            # Store values with their stream so they're moved into place together
+            for key, stream_values in computed.items():
+                self._write_values(partials[key], stream_values)
+
+            # Move finished stores into place, another process may have already
+            # cached the same stream
+            for key, partial in partials.items():
+                try:
+                    partial.rename(self.store_path(key))
+                except OSError:
+                    if not self.contains(key):
+                        raise
+                    shutil.rmtree(partial)
+
+        # Don't leave partial stores behind
+        finally:
+            for partial in partials.values():
+                if partial.exists():
+                    shutil.rmtree(partial, ignore_errors=True)
+
+        log.info(f"Cached {len(streams)} frame stream(s) to {self.cache_dir}")
+
+    def load_or_store(
+        self,
+        streams: Dict[str, Frames],
+        methods: Optional[Dict[str, str]] = None,
+        level: int = 0,
+        values: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, List[da.core.Array]]:
+        """
+        Read every stream from the cache, first computing and storing any streams, or
+        pyramid levels of streams, that aren't cached yet.
+
+        Parameters
+        ----------
+        streams: Dict[str, List[Union[da.core.Array, np.ndarray]]]
+            The lazy raw projected frames of each stream, by stream key. Only the
+            streams missing from the cache are computed.
+        methods: Optional[Dict[str, str]]
+            The pyramid method of each stream, by stream key.
+            See projection.pyramid.get_pyramid_method.
+            Default: None ("mean" for every stream)
+        level: int
+            The pyramid level of the frames to return, each level downsampled by 2
+            from the level before it.
+            Default: 0 (full resolution frames)
+        values: Optional[Dict[str, Dict[str, Any]]]
+            Lazy values computed from the source data of each stream, by stream key
+            then value name. Only computed for the streams missing from the cache,
+            together with their frames, and stored with them. See
+            FrameCache.load_values.
+            Default: None (store no values)
+
+        Returns
+        -------
+        cached: Dict[str, List[da.core.Array]]
+            The frames of each stream at the requested level, read from the cache.
+        """
+        methods = methods or {}
+        values = values or {}
+        n_levels = max(self.pyramid_levels, level + 1)
+
+        # Build lower levels from cached full resolution frames when available so the
+        # source data is only read for streams that aren't cached yet
+        missing = {}
+        for key, frames in streams.items():
+            if self.contains(key):
+                frames = self.load(key)
+            else:
+                missing[key] = frames
+
+            # Every level is built from the one before it in the same pass
+            method = methods.get(key, "mean")
+            pyramids = [build_pyramid(frame, n_levels, method) for frame in frames]
+            for level_index in range(1, n_levels):
+                level_key = self.level_key(key, level_index, method)
+                if not self.contains(level_key):
+                    missing[level_key] = [pyramid[level_index] for pyramid in pyramids]
+
+        if len(missing) > 0:
+            self._store(missing, values)
+
+        return {
+            key: self.load(self.level_key(key, level, methods.get(key, "mean")))
+            for key in streams
+        }
@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from dask.callbacks import Callback
+from dask.utils import key_split
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class Stages:
+    # Opening CZI files
+    CziOpen = "czi_open"
+    # Reading and decoding planes, in Dask tasks that may be shared by many movies
+    Read = "read"
+    # Computing normalization values, and any frames computed along with them
+    Normalize = "normalize"
+    # Computing and storing cached frames
+    Cache = "cache"
+    # Computing batches of frames
+    Compute = "compute"
+    # Converting computed frames to uint8
+    Cast = "cast"
+    # Appending frames to movie writers
+    Encode = "encode"
+
+
+# Stages only totaled for the whole run. Files are opened and read in Dask tasks
+# shared by every movie of a file, on whichever worker thread runs them, so their
+# timings can't be attributed to a single movie
+RUN_STAGES = {Stages.CziOpen, Stages.Read}
+
+# Default name of the run report written next to the movies
+RUN_REPORT_NAME = "run_report.json"
+
+###############################################################################
+
+
+def peak_memory() -> Optional[int]:
+    """
+    Get the peak resident memory of this process.
+
+    Returns
+    -------
+    peak_memory: Optional[int]
+        The peak resident set size in bytes, or None where it isn't available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Linux reports kilobytes, macOS reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+class Measurement:
+    """
+    A single timed stage. Set `nbytes` and `frames` on the measurement from within
+    the timed block to record how much data the stage handled.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.nbytes = 0
+        self.frames = 0
+        self.seconds = 0.0
+
+
+def _new_stage_totals() -> Dict[str, float]:
+    return {"seconds": 0.0, "calls": 0, "bytes": 0, "frames": 0}
+
+
+def _add_measurement(totals: Dict[str, float], measurement: Measurement):
+    totals["seconds"] += measurement.seconds
+    totals["calls"] += 1
+    totals["bytes"] += measurement.nbytes
+    totals["frames"] += measurement.frames
+
+
+def _per_second(count: float, seconds: float) -> Optional[float]:
+    return count / seconds if seconds > 0 else None
+
+
+class RunRecorder:
+    """
+    Collects the stage timings, data volumes, and per movie timings of a run.
+
+    Stage totals are summed over every thread, so concurrent stages can add up to more
+    than the wall time of the run. Opening and reading files are only totaled for the
+    whole run, see RUN_STAGES.
+
+    The operating system only reports the peak resident memory of the whole process, so
+    the peak when the recorder was created is reported along with it. A process peak
+    above the starting peak was reached during the run, otherwise the run's own peak is
+    unknown but no higher.
+    """
+
+    def __init__(self):
+        self.started = datetime.now()
+        self.finished = None
+        self._start_time = time.perf_counter()
+        self._start_peak_memory = peak_memory()
+        self._end_time = None
+        self._lock = threading.Lock()
+        self._stages = defaultdict(_new_stage_totals)
+        self._tasks = defaultdict(lambda: {"seconds": 0.0, "calls": 0})
+        self._movies = {}
+        self._values = defaultdict(list)
+
+    def add(self, measurement: Measurement, movie: Optional[str] = None):
+        with self._lock:
+            _add_measurement(self._stages[measurement.stage], measurement)
+            if movie is not None and measurement.stage not in RUN_STAGES:
+                stages = self._movie(movie)["stages"]
+                if measurement.stage not in stages:
+                    stages[measurement.stage] = _new_stage_totals()
+                _add_measurement(stages[measurement.stage], measurement)
+
+    def add_task(self, name: str, seconds: float):
+        with self._lock:
+            self._tasks[name]["seconds"] += seconds
+            self._tasks[name]["calls"] += 1
+
+    def add_value(self, name: str, value: Any, movie: Optional[str] = None):
+        with self._lock:
+            self._values[name].append({"movie": movie, "value": value})
+
+    def add_movie(self, movie: str, seconds: float):
+        with self._lock:
+            record = self._movie(movie)
+            record["wall_seconds"] += seconds
+
+    def _movie(self, movie: str) -> Dict[str, Any]:
+        if movie not in self._movies:
+            self._movies[movie] = {"wall_seconds": 0.0, "stages": {}}
+        return self._movies[movie]
+
+    def finish(self):
+        self.finished = datetime.now()
+        self._end_time = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the structured report of the run so far.
+
+        Returns
+        -------
+        report: Dict[str, Any]
+            The run wall time, peak resident memory of the process when the run started
+            and so far, bytes read, and frames written, totals for every stage and Dask
+            task name, the timings of every movie, and every recorded value. See
+            record_value.
+        """
+        end_time = self._end_time or time.perf_counter()
+        wall_seconds = end_time - self._start_time
+
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.items()}
+            tasks = {name: dict(totals) for name, totals in self._tasks.items()}
+            values = {name: list(entries) for name, entries in self._values.items()}
+            movies = {}
+            for movie, record in self._movies.items():
+                frames = record["stages"].get(Stages.Encode, {}).get("frames", 0)
+                movies[movie] = {
+                    **record,
+                    "stages": {
+                        stage: dict(totals)
+                        for stage, totals in record["stages"].items()
+                    },
+                    "frames": frames,
+                    "frames_per_second": _per_second(frames, record["wall_seconds"]),
+                }
+
+        # Add throughput to every stage
+        for totals in stages.values():
+            totals["bytes_per_second"] = _per_second(totals["bytes"], totals["seconds"])
+            totals["frames_per_second"] = _per_second(
+                totals["frames"], totals["seconds"]
+            )
+
+        frames = stages.get(Stages.Encode, {}).get("frames", 0)
+        return {
+            "started": self.started.isoformat(),
+            "finished": self.finished.isoformat() if self.finished else None,
+            "wall_seconds": wall_seconds,
+            "start_peak_memory_bytes": self._start_peak_memory,
+            "process_peak_memory_bytes": peak_memory(),
+            "bytes_read": stages.get(Stages.Read, {}).get("bytes", 0),
+            "frames": frames,
+            "frames_per_second": _per_second(frames, wall_seconds),
+            "stages": stages,
+            "tasks": tasks,
+            "movies": movies,
+            "values": values,
+        }
+
+    def write(self, report_path: Path) -> Path:
+        """
+        Atomically write the report of the run as JSON.
+
+        Parameters
+        ----------
+        report_path: Path
+            The path to write the report to.
+
+        Returns
+        -------
+        report_path: Path
+            The path to the written report.
+        """
+        report_path = Path(report_path).expanduser().resolve()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=report_path.parent, prefix=f".{report_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as write_out:
+                json.dump(self.report(), write_out, indent=4)
+            os.replace(tmp_path, report_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        log.info(f"Wrote run report to {report_path}")
+        return report_path
+
+
+###############################################################################
+
+# Recorders of every active run, stage timers are free when there are none
+_recorders: List[RunRecorder] = []
+_recorders_lock = threading.Lock()
+
+# The movie being generated by each thread
+_local = threading.local()
+
+
+class _TaskTimer(Callback):
+    # Times every task run by a local Dask scheduler, grouped by task name
+    def __init__(self, recorder: RunRecorder):
+        super().__init__(pretask=self._pretask, posttask=self._posttask)
+        self._recorder = recorder
+        self._starts = {}
+
+    def _pretask(self, key, dsk, state):
+        self._starts[(id(state), key)] = time.perf_counter()
+
+    def _posttask(self, key, result, dsk, state, worker_id):
+        start = self._starts.pop((id(state), key), None)
+        if start is not None:
+            self._recorder.add_task(key_split(key), time.perf_counter() - start)
+
+
+def is_recording() -> bool:
+    return len(_recorders) > 0
+
+
+@contextmanager
+def record_run() -> Iterator[RunRecorder]:
+    """
+    Record stage timings of everything run within the context, in any thread.
+
+    Dask task timings are only recorded for the local (synchronous, threaded, and
+    process) schedulers, tasks run on a distributed cluster are only reflected in the
+    stage timings of the threads waiting on them.
+
+    Yields
+    ------
+    recorder: RunRecorder
+        The recorder of the run. See RunRecorder.report.
+
+    Examples
+    --------
+    >>> with record_run() as recorder:
+    ...     generate_movies("my_file.czi")
+    >>> report = recorder.report()
+    """
+    recorder = RunRecorder()
+    with _recorders_lock:
+        _recorders.append(recorder)
+
+    try:
+        with _TaskTimer(recorder):
+            yield recorder
+
+    finally:
+        with _recorders_lock:
+            _recorders.remove(recorder)
+        recorder.finish()
+
+
+@contextmanager
+def optional_record_run(record: bool) -> Iterator[Optional[RunRecorder]]:
+    """
+    Record a run only when requested or when an outer run is already recording, so
+    that runs nothing reports on don't pay for the Dask task timing callbacks.
+
+    Parameters
+    ----------
+    record: bool
+        Whether the caller needs a report of the run.
+
+    Yields
+    ------
+    recorder: Optional[RunRecorder]
+        The recorder of the run, None when not recording.
+    """
+    if not record and not is_recording():
+        yield None
+        return
+
+    with record_run() as recorder:
+        yield recorder
+
+
+def current_movie() -> Optional[str]:
+    return getattr(_local, "movie", None)
+
+
+@contextmanager
+def in_movie(movie: Optional[str]) -> Iterator[None]:
+    """
+    Attribute the stages timed by this thread within the context to a movie. Used to
+    carry the movie of a thread over to the helper threads it starts.
+    """
+    previous = current_movie()
+    _local.movie = movie
+    try:
+        yield
+    finally:
+        _local.movie = previous
+
+
+@contextmanager
+def movie_timer(movie: str) -> Iterator[None]:
+    """
+    Time the generation of a movie and attribute the stages timed by this thread
+    within the context to it.
+
+    Parameters
+    ----------
+    movie: str
+        The name of the movie in the run report.
+    """
+    if not is_recording():
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        with in_movie(movie):
+            yield
+    finally:
+        seconds = time.perf_counter() - start
+        with _recorders_lock:
+            recorders = list(_recorders)
+        for recorder in recorders:
+            recorder.add_movie(movie, seconds)
+
+
+@contextmanager
+def timer(stage: str) -> Iterator[Measurement]:
+    """
+    Time a stage and add it to every active run, attributed to the current movie of
+    this thread. Does nothing more than yield a measurement when no run is recording.
+
+    Parameters
+    ----------
+    stage: str
+        The stage name. One of the Stages values.
+
+    Yields
+    ------
+    measurement: Measurement
+        The measurement of the stage, set its `nbytes` and `frames` to record the
+        amount of data handled.
+    """
+    measurement = Measurement(stage)
+    if not is_recording():
+        yield measurement
+        return
+
+    start = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement.seconds = time.perf_counter() - start
+        movie = current_movie()
+        with _recorders_lock:
+            recorders = list(_recorders)
+        for recorder in recorders:
+            recorder.add(measurement, movie)
+
+
+def record_value(name: str, value: Any):
+    """
+    Add a value computed on the client, such as an estimate of a sampling error, to
+    every active run, attributed to the current movie of this thread. Does nothing
+    when no run is recording.
+
+    Parameters
+    ----------
+    name: str
+        The name to list the value under in the run report's "values".
+    value: Any
+        The JSON serializable value.
+    """
+    with _recorders_lock:
+        recorders = list(_recorders)
+    for recorder in recorders:
+        recorder.add_value(name, value, current_movie())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Directory under a save path holding a record for every movie
+MANIFEST_DIR = ".manifest"
+
+
+class MovieStatus:
+    InProgress = "in_progress"
+    Complete = "complete"
+    Failed = "failed"
+
+
+###############################################################################
+
+
+def _json_default(obj: Any) -> str:
+    # Functions are identified by where they are defined rather than their address
+    if callable(obj) and hasattr(obj, "__qualname__"):
+        return f"{obj.__module__}.{obj.__qualname__}"
+
+    return repr(obj)
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    """
+    Hash the parameters used to generate a movie.
+
+    Parameters
+    ----------
+    params: Dict[str, Any]
+        The parameters to hash. Functions are hashed by their module and qualified
+        name, any other value that can't be stored as JSON by its repr.
+
+    Returns
+    -------
+    digest: str
+        The SHA-256 hex digest of the parameters.
+    """
+    serialized = json.dumps(params, sort_keys=True, default=_json_default)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def source_fingerprint(img: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Get the values used to detect a changed source file.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        The source file.
+
+    Returns
+    -------
+    fingerprint: Dict[str, Any]
+        The resolved path, modification time in nanoseconds, and size in bytes.
+    """
+    img = Path(img).expanduser().resolve(strict=True)
+    stat = img.stat()
+    return {"path": str(img), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def read_record(record_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read a movie's manifest record.
+
+    Parameters
+    ----------
+    record_path: Path
+        The path to the record.
+
+    Returns
+    -------
+    record: Optional[Dict[str, Any]]
+        The record, or None if there is no record or it can't be read.
+    """
+    try:
+        with open(record_path, "r") as read_in:
+            return json.load(read_in)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring unreadable manifest record {record_path}: {e}")
+        return None
+
+
+def write_record(
+    record_path: Path,
+    source: Dict[str, Any],
+    params_digest: str,
+    status: str,
+    outputs: List[Union[str, Path]],
+) -> Dict[str, Any]:
+    """
+    Atomically write a movie's manifest record.
+
+    The record is written to a temporary file next to the record path and then moved
+    into place so an interrupted write never leaves a partial record.
+
+    Parameters
+    ----------
+    record_path: Path
+        The path to write the record to.
+    source: Dict[str, Any]
+        The source file fingerprint. See source_fingerprint.
+    params_digest: str
+        The hash of the parameters used to generate the movie. See params_hash.
+    status: str
+        The movie status. One of the MovieStatus values.
+    outputs: List[Union[str, Path]]
+        The movie files produced, stored by name.
+
+    Returns
+    -------
+    record: Dict[str, Any]
+        The written record.
+    """
+    record = {
+        "source": source,
+        "params_hash": params_digest,
+        "status": status,
+        "outputs": [Path(output).name for output in outputs],
+        "updated": datetime.now().isoformat(),
+    }
+
+    # Write to a temporary file in the same directory then replace the record
+    record_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=record_path.parent, prefix=f".{record_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as write_out:
+            json.dump(record, write_out, indent=4)
+        os.replace(tmp_path, record_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return record
+
+
+def is_complete(
+    record_path: Path,
+    source: Dict[str, Any],
+    params_digest: str,
+    outputs: List[Path],
+) -> bool:
+    """
+    Check if a movie was already generated from the same source file and parameters.
+
+    Parameters
+    ----------
+    record_path: Path
+        The path to the movie's manifest record.
+    source: Dict[str, Any]
+        The current source file fingerprint. See source_fingerprint.
+    params_digest: str
+        The hash of the current parameters. See params_hash.
+    outputs: List[Path]
+        The movie files that should exist.
+
+    Returns
+    -------
+    complete: bool
+        True if the record is complete, matches the source and parameters, and every
+        output file exists.
+    """
+    record = read_record(record_path)
+    if record is None:
+        return False
+
+    return (
+        record.get("status") == MovieStatus.Complete
+        and record.get("source") == source
+        and record.get("params_hash") == params_digest
+        and record.get("outputs") == [output.name for output in outputs]
+        and all(output.is_file() for output in outputs)
+    )
@@ -0,0 +1,602 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import queue
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import dask
+import dask.array as da
+import imageio
+import numpy as np
+
+from . import instrumentation
+from .instrumentation import Stages, timer
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Marks the end of the frames put on an encoder queue
+_END_OF_FRAMES = object()
+
+# Marks movies that are still being written
+PARTIAL_MARKER = "partial"
+
+# Encoder options that can be provided for movie writing
+ENCODER_OPTIONS = set(
+    (
+        "codec",
+        "preset",
+        "crf",
+        "bitrate",
+        "threads",
+        "pixelformat",
+        "macro_block_size",
+        "output_params",
+    )
+)
+
+# Most codecs and players need frame dimensions divisible by this
+DEFAULT_MACRO_BLOCK_SIZE = 16
+
+###############################################################################
+
+
+def write_frames(
+    writer: Any,
+    frames: List[Union[da.core.Array, np.ndarray]],
+    batch_size: int = 8,
+    queue_depth: int = 16,
+) -> int:
+    """
+    Compute and append frames to a movie writer, overlapping frame computation with
+    encoding.
+
+    Frames are computed in batches with a single dask.compute call per batch and
+    handed to a dedicated encoder thread through a bounded queue. While the encoder
+    thread appends frames to the writer the next batch is being computed.
+
+    Parameters
+    ----------
+    writer: Any
+        An open writer with an `append_data` method, such as the writer returned by
+        imageio.get_writer.
+    frames: List[Union[da.core.Array, np.ndarray]]
+        The frames to write, in order. Each frame is cast to uint8 before writing.
+    batch_size: int
+        The number of frames to compute together.
+        Default: 8
+    queue_depth: int
+        The maximum number of computed frames waiting to be encoded. Once the queue is
+        full frame computation blocks until the encoder catches up, capping memory use
+        at roughly queue_depth + batch_size frames.
+        Default: 16
+
+    Returns
+    -------
+    n_frames: int
+        The number of frames written.
+    """
+    return write_frame_streams(
+        writers=[writer],
+        streams=[frames],
+        batch_size=batch_size,
+        queue_depth=queue_depth,
+    )
+
+
+def write_frame_streams(
+    writers: List[Any],
+    streams: List[List[Union[da.core.Array, np.ndarray]]],
+    batch_size: int = 8,
+    queue_depth: int = 16,
+) -> int:
+    """
+    Compute and append multiple streams of frames to their own movie writers.
+
+    The same batch of frames from every stream is computed with a single dask.compute
+    call, so streams built from the same data (e.g. different projections) read the
+    data once. Each writer has its own encoder thread and bounded queue.
+
+    Parameters
+    ----------
+    writers: List[Any]
+        An open writer for each stream.
+    streams: List[List[Union[da.core.Array, np.ndarray]]]
+        The frames of each stream, in order. Every stream must have the same number of
+        frames.
+    batch_size: int
+        The number of frames of each stream to compute together.
+        Default: 8
+    queue_depth: int
+        The maximum number of computed frames of each stream waiting to be encoded.
+        Default: 16
+
+    Returns
+    -------
+    n_frames: int
+        The number of frames written to each writer.
+    """
+    if batch_size < 1 or queue_depth < 1:
+        raise ValueError(
+            f"The frame batch size and queue depth must be positive integers. "
+            f"Received batch_size: {batch_size}, queue_depth: {queue_depth}."
+        )
+    if len(writers) != len(streams):
+        raise ValueError(
+            f"Every stream of frames needs a writer. "
+            f"Received {len(writers)} writers and {len(streams)} streams."
+        )
+    n_stream_frames = set(len(frames) for frames in streams)
+    if len(n_stream_frames) > 1:
+        raise ValueError(
+            f"Every stream must have the same number of frames. "
+            f"Received streams with frame counts: {n_stream_frames}."
+        )
+
+    frame_queues = [queue.Queue(maxsize=queue_depth) for writer in writers]
+    encoder_errors = []
+
+    # Encoding time is attributed to the movie of the calling thread
+    movie = instrumentation.current_movie()
+
+    def _encode(writer: Any, frame_queue: queue.Queue):
+        with instrumentation.in_movie(movie):
+            while True:
+                frame = frame_queue.get()
+                if frame is _END_OF_FRAMES:
+                    return
+
+                # Keep draining the queue after a failure so the producer never
+                # blocks
+                if not encoder_errors:
+                    try:
+                        with timer(Stages.Encode) as measurement:
+                            writer.append_data(frame)
+                            measurement.frames = 1
+                    except Exception as e:
+                        encoder_errors.append(e)
+
+    # Start encoding
+    encoders = [
+        threading.Thread(
+            target=_encode,
+            args=(writer, frame_queue),
+            name="movie-encoder",
+            daemon=True,
+        )
+        for writer, frame_queue in zip(writers, frame_queues)
+    ]
+    for encoder in encoders:
+        encoder.start()
+
+    # Compute batches of frames and hand them off to the encoders
+    n_frames = 0
+    n_total_frames = n_stream_frames.pop() if n_stream_frames else 0
+    try:
+        for batch_start in range(0, n_total_frames, batch_size):
+            if encoder_errors:
+                break
+
+            batch_end = min(batch_start + batch_size, n_total_frames)
+            with timer(Stages.Compute) as measurement:
+                batch = dask.compute(
+                    *[frames[batch_start:batch_end] for frames in streams]
+                )
+                measurement.frames = (batch_end - batch_start) * len(streams)
+            for stream_batch, frame_queue in zip(batch, frame_queues):
+                for frame in stream_batch:
+                    with timer(Stages.Cast) as measurement:
+                        frame = np.asarray(frame).astype(np.uint8, copy=False)
+                        measurement.nbytes = frame.nbytes
+                        measurement.frames = 1
+                    frame_queue.put(frame)
+
+            n_frames += batch_end - batch_start
+
+    # Always let the encoders finish
+    finally:
+        for frame_queue in frame_queues:
+            frame_queue.put(_END_OF_FRAMES)
+        for encoder in encoders:
+            encoder.join()
+
+    if encoder_errors:
+        raise encoder_errors[0]
+
+    return n_frames
+
+
+def get_writer_kwargs(
+    quality: Optional[float] = 6, encoder_options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the keyword arguments for an imageio ffmpeg movie writer.
+
+    Parameters
+    ----------
+    quality: Optional[float]
+        ImageIO's variable bitrate quality. 0 is high compression, 10 is no
+        compression. Ignored when a "crf" or "bitrate" encoder option is provided.
+        Default: 6
+    encoder_options: Optional[Dict[str, Any]]
+        Any of:
+        "codec" (e.g. "libx264", "libx265", "mpeg4"),
+        "preset" (e.g. "ultrafast" to "veryslow" for libx264 and libx265),
+        "crf" (constant rate factor, lower is higher quality),
+        "bitrate" (constant bitrate, e.g. 4000000),
+        "threads" (the number of ffmpeg encoding threads),
+        "pixelformat" (e.g. "yuv420p"),
+        "macro_block_size" (frames are padded to a multiple of this size),
+        "output_params" (a list of any other ffmpeg output parameters).
+        Default: None (imageio defaults)
+
+    Returns
+    -------
+    writer_kwargs: Dict[str, Any]
+        The keyword arguments to pass to imageio.get_writer alongside fps.
+    """
+    encoder_options = encoder_options or {}
+    unknown = set(encoder_options) - ENCODER_OPTIONS
+    if unknown:
+        raise ValueError(
+            f"Invalid encoder options provided. "
+            f"Provided: {sorted(unknown)}. "
+            f"Valid encoder options: {sorted(ENCODER_OPTIONS)}."
+        )
+    if "crf" in encoder_options and "bitrate" in encoder_options:
+        raise ValueError(
+            "Only one of the 'crf' and 'bitrate' encoder options may be set."
+        )
+
+    writer_kwargs = {
+        "quality": quality,
+        "macro_block_size": encoder_options.get(
+            "macro_block_size", DEFAULT_MACRO_BLOCK_SIZE
+        ),
+    }
+    for option in ["codec", "bitrate", "pixelformat"]:
+        if encoder_options.get(option) is not None:
+            writer_kwargs[option] = encoder_options[option]
+
+    # Options without an imageio argument are passed straight to ffmpeg
+    output_params = []
+    if encoder_options.get("preset") is not None:
+        output_params += ["-preset", str(encoder_options["preset"])]
+    if encoder_options.get("crf") is not None:
+        output_params += ["-crf", str(encoder_options["crf"])]
+    if encoder_options.get("threads") is not None:
+        output_params += ["-threads", str(encoder_options["threads"])]
+    output_params += [str(param) for param in encoder_options.get("output_params", [])]
+    if output_params:
+        writer_kwargs["output_params"] = output_params
+
+    # Rate control was set explicitly so don't let imageio add its own
+    if encoder_options.get("crf") is not None or "bitrate" in writer_kwargs:
+        writer_kwargs["quality"] = None
+
+    return writer_kwargs
+
+
+def pad_frame(
+    frame: Union[da.core.Array, np.ndarray], macro_block_size: int
+) -> Union[da.core.Array, np.ndarray]:
+    """
+    Pad the bottom and right edges of a YX (or YX RGB) frame with zeros so that its
+    height and width are divisible by the macro block size.
+
+    Padding keeps every pixel as is where letting the writer resize the frame would
+    resample it.
+
+    Parameters
+    ----------
+    frame: Union[da.core.Array, np.ndarray]
+        The frame to pad.
+    macro_block_size: int
+        The size the frame height and width should be divisible by.
+
+    Returns
+    -------
+    padded: Union[da.core.Array, np.ndarray]
+        The padded frame, or the frame itself if no padding was needed.
+    """
+    if macro_block_size is None or macro_block_size <= 1:
+        return frame
+
+    pad_width = [(0, -size % macro_block_size) for size in frame.shape[:2]]
+    if not any(after for before, after in pad_width):
+        return frame
+
+    pad_width += [(0, 0)] * (frame.ndim - 2)
+    if isinstance(frame, da.core.Array):
+        return da.pad(frame, pad_width, mode="constant")
+
+    return np.pad(frame, pad_width, mode="constant")
+
+
+def partial_file(output_file: Path) -> Path:
+    """
+    Get a unique temporary path to write a movie to before moving it to its output
+    path.
+
+    The temporary file is hidden, in the same directory as the output file so that it
+    can be atomically renamed, and keeps the output file's extension so the movie
+    format is still inferred from it.
+
+    Parameters
+    ----------
+    output_file: Path
+        The path the finished movie should be saved to.
+
+    Returns
+    -------
+    partial: Path
+        The temporary path, e.g. ".dims-S_0_C_0.<token>.partial.mp4".
+    """
+    return output_file.parent / (
+        f".{output_file.stem}.{uuid.uuid4().hex[:12]}.{PARTIAL_MARKER}"
+        f"{output_file.suffix}"
+    )
+
+
+def clean_partial_files(directory: Path) -> List[Path]:
+    """
+    Remove any temporary movie files left in a directory by interrupted writes.
+
+    Parameters
+    ----------
+    directory: Path
+        The directory to clean.
+
+    Returns
+    -------
+    removed: List[Path]
+        The removed files.
+    """
+    removed = []
+    for partial in Path(directory).glob(f".*.{PARTIAL_MARKER}.*"):
+        if partial.is_file():
+            partial.unlink()
+            removed.append(partial)
+
+    if removed:
+        log.info(f"Removed {len(removed)} partially written movie(s) from {directory}")
+
+    return removed
+
+
+def _segment_file(movie_file: Path, segment: int) -> Path:
+    # Hidden next to the movie and named after it so that it is cleaned up with it
+    return movie_file.parent / (
+        f".{movie_file.stem}.segment_{segment:05d}.{PARTIAL_MARKER}{movie_file.suffix}"
+    )
+
+
+def write_movies(
+    movie_files: List[Path],
+    streams: List[List[Union[da.core.Array, np.ndarray]]],
+    fps: int,
+    writer_kwargs: Dict[str, Any] = {},
+    batch_size: int = 8,
+    queue_depth: int = 16,
+) -> int:
+    """
+    Write each stream of frames to its movie file, opening a writer for every movie
+    and closing them all once the frames are written or writing fails.
+
+    Parameters
+    ----------
+    movie_files: List[Path]
+        The path to save each stream's movie to.
+    streams: List[List[Union[da.core.Array, np.ndarray]]]
+        The frames of each stream, in order.
+    fps: int
+        Frames per second of each movie.
+    writer_kwargs: Dict[str, Any]
+        Any other imageio.get_writer arguments. See get_writer_kwargs.
+        Default: {}
+    batch_size: int
+        The number of frames of each stream to compute together.
+        Default: 8
+    queue_depth: int
+        The maximum number of computed frames of each stream waiting to be encoded.
+        Default: 16
+
+    Returns
+    -------
+    n_frames: int
+        The number of frames written to each movie. See write_frame_streams.
+    """
+    writers = []
+    try:
+        for movie_file in movie_files:
+            writers.append(imageio.get_writer(movie_file, fps=fps, **writer_kwargs))
+
+        return write_frame_streams(
+            writers=writers,
+            streams=streams,
+            batch_size=batch_size,
+            queue_depth=queue_depth,
+        )
+
+    # Close writers
+    finally:
+        for writer in writers:
+            writer.close()
+
+
+def _write_movie_segment(movie: Optional[str], *args) -> int:
+    # Attribute the segment's stages to the movie it belongs to
+    with instrumentation.in_movie(movie):
+        return write_movies(*args)
+
+
+def concat_movies(segment_files: List[Path], movie_file: Path):
+    """
+    Concatenate movie segments into a single movie without re-encoding them.
+
+    Uses ffmpeg's concat demuxer so every segment must have been encoded with the same
+    codec, frame shape, and frame rate.
+
+    Parameters
+    ----------
+    segment_files: List[Path]
+        The movie segments, in order.
+    movie_file: Path
+        The path to save the concatenated movie to.
+    """
+    import imageio_ffmpeg
+
+    # List the segments for the concat demuxer, quoting any quotes in the paths
+    list_file = movie_file.parent / f".{movie_file.name}.segments.txt"
+    with open(list_file, "w") as write_out:
+        for segment_file in segment_files:
+            quoted = str(Path(segment_file).resolve()).replace("'", "'\\''")
+            write_out.write(f"file '{quoted}'\n")
+
+    # Copy the segment streams into the movie
+    try:
+        result = subprocess.run(
+            [
+                imageio_ffmpeg.get_ffmpeg_exe(),
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(list_file),
+                "-c",
+                "copy",
+                str(movie_file),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    finally:
+        list_file.unlink()
+
+    if result.returncode != 0:
+        raise IOError(
+            f"Failed to concatenate {len(segment_files)} movie segments into "
+            f"{movie_file}: {result.stderr.decode(errors='replace')}"
+        )
+
+
+def write_segmented_frame_streams(
+    movie_files: List[Path],
+    streams: List[List[Union[da.core.Array, np.ndarray]]],
+    segment_size: int,
+    fps: int,
+    writer_kwargs: Dict[str, Any] = {},
+    batch_size: int = 8,
+    queue_depth: int = 16,
+    max_workers: Optional[int] = None,
+) -> int:
+    """
+    Write each stream of frames to its movie file by encoding segments of the frames
+    concurrently and concatenating them.
+
+    Every segment is an independent movie with its own encoder, so long movies are
+    encoded across multiple cores rather than by a single ffmpeg process. The
+    segments are joined with concat_movies without re-encoding.
+
+    Parameters
+    ----------
+    movie_files: List[Path]
+        The path to save each stream's movie to.
+    streams: List[List[Union[da.core.Array, np.ndarray]]]
+        The frames of each stream, in order. Every stream must have the same number of
+        frames.
+    segment_size: int
+        The number of frames in each segment.
+    fps: int
+        Frames per second of each movie.
+    writer_kwargs: Dict[str, Any]
+        Any other imageio.get_writer arguments. See get_writer_kwargs.
+        Default: {}
+    batch_size: int
+        The number of frames of each segment to compute together.
+        Default: 8
+    queue_depth: int
+        The maximum number of computed frames of each segment waiting to be encoded.
+        Default: 16
+    max_workers: Optional[int]
+        The maximum number of segments to encode at the same time.
+        Default: None (the ThreadPoolExecutor default)
+
+    Returns
+    -------
+    n_frames: int
+        The number of frames written to each movie.
+    """
+    if segment_size < 1:
+        raise ValueError(
+            f"The segment size must be a positive integer. Received: {segment_size}."
+        )
+    if len(movie_files) != len(streams):
+        raise ValueError(
+            f"Every stream of frames needs a movie file. "
+            f"Received {len(movie_files)} movie files and {len(streams)} streams."
+        )
+
+    # Short movies don't need to be split
+    n_total_frames = max([len(frames) for frames in streams], default=0)
+    if n_total_frames <= segment_size:
+        return write_movies(
+            movie_files, streams, fps, writer_kwargs, batch_size, queue_depth
+        )
+
+    # Plan the segments of every movie
+    segment_starts = list(range(0, n_total_frames, segment_size))
+    segment_files = [
+        [_segment_file(movie_file, i) for movie_file in movie_files]
+        for i in range(len(segment_starts))
+    ]
+    log.debug(f"Encoding {len(segment_starts)} segments of {movie_files}")
+
+    try:
+        # Encode every segment
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="movie-segment"
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _write_movie_segment,
+                    instrumentation.current_movie(),
+                    this_segment_files,
+                    [frames[start : start + segment_size] for frames in streams],
+                    fps,
+                    writer_kwargs,
+                    batch_size,
+                    queue_depth,
+                )
+                for start, this_segment_files in zip(segment_starts, segment_files)
+            ]
+            n_frames = sum(future.result() for future in futures)
+
+        # Join each movie's segments
+        for i, movie_file in enumerate(movie_files):
+            concat_movies(
+                [this_segment_files[i] for this_segment_files in segment_files],
+                movie_file,
+            )
+
+    # Remove the segments
+    finally:
+        for this_segment_files in segment_files:
+            for segment_file in this_segment_files:
+                if segment_file.exists():
+                    segment_file.unlink()
+
+    return n_frames
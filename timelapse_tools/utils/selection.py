@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import dask.array as da
+
+from ..constants import Dimensions
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+def select_dimension(
+    img: da.core.Array,
+    dims: str,
+    dim_name: str,
+    dim_indicies_selected: Optional[Union[int, slice]] = None,
+) -> Tuple[da.core.Array, str]:
+    """
+    Select down a dimension of an image.
+
+    Parameters
+    ----------
+    img: da.core.Array
+        The image data.
+    dims: str
+        The dimension order of the image data.
+    dim_name: str
+        The dimension to select down.
+    dim_indicies_selected: Optional[Union[int, slice]]
+        A specific integer or slice to select. Selecting an integer removes the
+        dimension. Ignored, with a warning, if the dimension isn't in the image.
+        Default: None (keep the whole dimension)
+
+    Returns
+    -------
+    img: da.core.Array
+        The selected image data.
+    dims: str
+        The dimension order of the selected image data.
+    """
+    # Select which dimensions to process
+    if dim_name in dims:
+        # If specific dimension indicies were provided select them
+        if dim_indicies_selected is not None:
+            if not isinstance(dim_indicies_selected, (int, slice)):
+                raise TypeError(
+                    f"{dim_name} selection may only be done by providing either an "
+                    f"integer or slice. Received: {type(dim_indicies_selected)}."
+                )
+
+            # Generate operations required to select the data
+            ops = []
+            for dim in dims:
+                if dim == dim_name:
+                    ops.append(dim_indicies_selected)
+                else:
+                    ops.append(slice(None, None, None))
+
+            # Select the specified data
+            img = img[tuple(ops)]
+
+            # Remove the dimension from the dims if a specific integer was requested
+            if isinstance(dim_indicies_selected, int):
+                dims = dims.replace(dim_name, "")
+
+    # Dimension not present dims
+    else:
+        if dim_indicies_selected is not None:
+            log.warn(
+                f"Ignoring the specified {dim_name} dimension(s) "
+                f"({dim_indicies_selected}) as it was not found in the file."
+            )
+
+    return img, dims
+
+
+def generate_getitem_indicies(
+    img_shape: tuple, dims: str, split_channels: bool = True, split_scenes: bool = True
+) -> List[Tuple[Union[int, slice]]]:
+    """
+    Get the getitem operations selecting the data of every movie of an image, one for
+    every scene and channel pair.
+
+    Parameters
+    ----------
+    img_shape: tuple
+        The shape of the image data.
+    dims: str
+        The dimension order of the image data.
+    split_channels: bool
+        Whether every channel gets its own movie.
+        Default: True
+    split_scenes: bool
+        Whether every scene gets its own movie.
+        Default: True
+
+    Returns
+    -------
+    getitem_indicies: List[Tuple[Union[int, slice]]]
+        The getitem operations of every movie.
+    """
+    getitem_indicies = []
+
+    # Keep all channels or scenes together when not splitting them into separate
+    # movies
+    split_channels = split_channels and Dimensions.Channel in dims
+    split_scenes = split_scenes and Dimensions.Scene in dims
+
+    # Generate getitem ops to process for each scene x channel pair
+    if split_scenes and split_channels:
+        sc_indicies = list(
+            product(
+                range(img_shape[dims.index(Dimensions.Scene)]),
+                range(img_shape[dims.index(Dimensions.Channel)]),
+            )
+        )
+        for sc_index_pair in sc_indicies:
+            this_pair_getitem_indices = []
+            for dim in dims:
+                if dim == Dimensions.Scene:
+                    this_pair_getitem_indices.append(sc_index_pair[0])
+                elif dim == Dimensions.Channel:
+                    this_pair_getitem_indices.append(sc_index_pair[1])
+                else:
+                    this_pair_getitem_indices.append(slice(None, None, None))
+
+            getitem_indicies.append(tuple(this_pair_getitem_indices))
+
+    # Generate getitem ops to process for each scene
+    elif split_scenes:
+        s_indicies = list(range(img_shape[dims.index(Dimensions.Scene)]))
+        for s_index in s_indicies:
+            this_index_getitem_indices = []
+            for dim in dims:
+                if dim == Dimensions.Scene:
+                    this_index_getitem_indices.append(s_index)
+                else:
+                    this_index_getitem_indices.append(slice(None, None, None))
+
+            getitem_indicies.append(tuple(this_index_getitem_indices))
+
+    # Generate getitem ops to process for each channel
+    elif split_channels:
+        c_indicies = list(range(img_shape[dims.index(Dimensions.Channel)]))
+        for c_index in c_indicies:
+            this_index_getitem_indices = []
+            for dim in dims:
+                if dim == Dimensions.Channel:
+                    this_index_getitem_indices.append(c_index)
+                else:
+                    this_index_getitem_indices.append(slice(None, None, None))
+
+            getitem_indicies.append(tuple(this_index_getitem_indices))
+
+    # Just pass through a list of a single getitem all
+    else:
+        getitem_indicies.append(tuple([slice(None, None, None) for dim in dims]))
+
+    return getitem_indicies
+
+
+def generate_selected_dims_list(
+    dims: str, getitem_indicies: List[Tuple[Union[int, slice]]]
+) -> List[Dict[str, int]]:
+    """
+    Get the dimension indices selected by every movie's getitem operation.
+
+    Parameters
+    ----------
+    dims: str
+        The dimension order of the image data.
+    getitem_indicies: List[Tuple[Union[int, slice]]]
+        The getitem operations of every movie. See generate_getitem_indicies.
+
+    Returns
+    -------
+    selected_dims: List[Dict[str, int]]
+        The index of every dimension selected by each movie, by dimension name.
+    """
+    selected_dims = []
+    for getitem_selection in getitem_indicies:
+        this_set_dims = {}
+        for i, dim in enumerate(dims):
+            if isinstance(getitem_selection[i], int):
+                this_set_dims[dim] = getitem_selection[i]
+
+        selected_dims.append(this_set_dims)
+
+    return selected_dims
+
+
+def get_output_file(
+    save_path: Path,
+    selected_indices: Dict[str, int],
+    save_format: str,
+    suffix: Optional[str] = None,
+) -> Path:
+    """
+    Get the path of a movie named after the dimension indices it shows.
+
+    Parameters
+    ----------
+    save_path: Path
+        The directory of the movie.
+    selected_indices: Dict[str, int]
+        The index of every dimension selected for the movie, by dimension name.
+    save_format: str
+        The movie format, with or without a leading period.
+    suffix: Optional[str]
+        A suffix to add to the name, such as a projection name.
+        Default: None
+
+    Returns
+    -------
+    output_file: Path
+        The movie path, e.g. "dims-S_0_C_1-max.mp4" under the save_path.
+    """
+    # Generate output file name
+    this_file = []
+    for dim, selected in selected_indices.items():
+        this_file.append(dim),
+        this_file.append(str(selected))
+    this_file = "_".join(this_file)
+
+    # Add any suffix
+    if suffix is not None:
+        this_file = f"{this_file}-{suffix}" if this_file else suffix
+
+    # Remove any leading period from save format
+    if save_format[0] == ".":
+        save_format = save_format[1:]
+
+    return save_path / f"dims-{this_file}.{save_format}"
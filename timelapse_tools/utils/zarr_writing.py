@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Any, Optional, Union
+
+###############################################################################
+
+# Blosc compressors that can be selected by name
+BLOSC_COMPRESSORS = ("zstd", "lz4", "lz4hc", "blosclz", "zlib")
+
+###############################################################################
+
+
+def import_zarr() -> Any:
+    """
+    Import zarr, which is only installed with the "zarr" extra.
+
+    Returns
+    -------
+    zarr: module
+        The zarr module.
+    """
+    try:
+        import zarr
+    except ImportError:
+        raise ImportError(
+            "Writing Zarr stores requires zarr. "
+            "Install it with: pip install timelapse_tools[zarr]"
+        )
+
+    return zarr
+
+
+def get_compressor(
+    compressor: Optional[Union[str, Any]] = "zstd", compression_level: int = 5
+) -> Optional[Any]:
+    """
+    Get the numcodecs compressor to write Zarr chunks with.
+
+    Parameters
+    ----------
+    compressor: Optional[Union[str, Any]]
+        The name of a Blosc compressor (see BLOSC_COMPRESSORS), any numcodecs codec,
+        or None for no compression.
+        Default: "zstd"
+    compression_level: int
+        The Blosc compression level, from 0 (none) to 9 (most). Ignored for codecs.
+        Default: 5
+
+    Returns
+    -------
+    compressor: Optional[numcodecs.abc.Codec]
+        The compressor.
+    """
+    if compressor is None or not isinstance(compressor, str):
+        return compressor
+
+    if compressor not in BLOSC_COMPRESSORS:
+        raise ValueError(
+            f"Invalid compressor provided. "
+            f"Provided: '{compressor}'. "
+            f"Valid compressors: {BLOSC_COMPRESSORS}, a numcodecs codec, or None."
+        )
+    if not 0 <= compression_level <= 9:
+        raise ValueError(
+            f"The compression level must be between 0 and 9. "
+            f"Received: {compression_level}."
+        )
+
+    # numcodecs is installed with zarr
+    import_zarr()
+    from numcodecs import Blosc
+
+    return Blosc(cname=compressor, clevel=compression_level, shuffle=Blosc.BITSHUFFLE)
@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import shutil
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+import dask
+import dask.array as da
+import numpy as np
+
+from .constants import Dimensions
+from .projection.pyramid import downsample_frame
+from .utils import czi_metadata
+from .utils.czi_reading import CZI_PIXEL_TYPES, daread, get_czi_file
+from .utils.zarr_writing import get_compressor, import_zarr
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Dimension order of every OME-Zarr image
+OME_ZARR_DIMS = "TCZYX"
+
+OME_ZARR_AXES = [
+    {"name": "t", "type": "time"},
+    {"name": "c", "type": "channel"},
+    {"name": "z", "type": "space", "unit": "micrometer"},
+    {"name": "y", "type": "space", "unit": "micrometer"},
+    {"name": "x", "type": "space", "unit": "micrometer"},
+]
+
+# One YX plane per chunk
+DEFAULT_ZARR_CHUNKS = {
+    Dimensions.Time: 1,
+    Dimensions.Channel: 1,
+    Dimensions.SpatialZ: 1,
+    Dimensions.SpatialY: -1,
+    Dimensions.SpatialX: -1,
+}
+
+# The subblock bounding box of a plane, see OmeZarrFile.get_tile_bounding_box
+BBox = namedtuple("BBox", ["x", "y", "w", "h"])
+
+###############################################################################
+
+
+class OmeZarrFile:
+    """
+    A reader of OME-Zarr stores written by convert_to_zarr, implementing the parts of
+    the aicspylibczi.CziFile interface used by daread.
+
+    Passing it as the reader of generate_movies makes movies from a converted store,
+    so a single read of a CZI file produces both the analysis-ready store and the
+    preview movies:
+
+    >>> store = convert_to_zarr("my_very_large_image.czi")
+    >>> generate_movies(store, reader=OmeZarrFile)
+
+    Every image of the store is read as a scene, at full resolution. The physical
+    pixel sizes and channel names of the store are exposed as CZI metadata.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        Path to an OME-Zarr store written by convert_to_zarr.
+    """
+
+    def __init__(self, img: Union[str, Path]):
+        zarr = import_zarr()
+        root = zarr.open_group(str(img), mode="r")
+
+        # Every image is a scene, stored in order
+        scenes = sorted((int(key) for key in root.group_keys() if key.isdigit()))
+        if len(scenes) == 0:
+            raise ValueError(f"No OME-Zarr images found in the store: {img}")
+        self._images = [root[str(scene)]["0"] for scene in scenes]
+        shapes = {image.shape for image in self._images}
+        if len(shapes) > 1:
+            raise ValueError(
+                f"Every image of the store must have the same shape to be read as "
+                f"scenes. Received shapes: {shapes}."
+            )
+
+        self.dims = "BS" + OME_ZARR_DIMS
+        self.size = (1, len(self._images)) + self._images[0].shape
+        self.pixel_type = {dtype: name for name, dtype in CZI_PIXEL_TYPES.items()}.get(
+            self._images[0].dtype
+        )
+        self.meta = self._get_meta(root[str(scenes[0])].attrs.asdict())
+
+    @staticmethod
+    def _get_meta(attrs: Dict[str, Any]) -> ElementTree.Element:
+        # Build the CZI metadata elements read by czi_metadata
+        meta = ElementTree.Element("ImageDocument")
+        metadata = ElementTree.SubElement(meta, "Metadata")
+
+        # Physical sizes are stored in micrometers, CZI files store meters
+        items = ElementTree.SubElement(
+            ElementTree.SubElement(metadata, "Scaling"), "Items"
+        )
+        multiscales = attrs.get("multiscales", [{}])[0]
+        for transform in multiscales.get("datasets", [{}])[0].get(
+            "coordinateTransformations", []
+        ):
+            if transform.get("type") != "scale":
+                continue
+            for axis, scale in zip(multiscales["axes"], transform["scale"]):
+                if axis.get("type") == "space":
+                    distance = ElementTree.SubElement(
+                        items, "Distance", Id=axis["name"].upper()
+                    )
+                    ElementTree.SubElement(distance, "Value").text = str(scale * 1e-6)
+
+        # Channel names
+        channels = ElementTree.SubElement(
+            ElementTree.SubElement(
+                ElementTree.SubElement(
+                    ElementTree.SubElement(metadata, "Information"), "Image"
+                ),
+                "Dimensions",
+            ),
+            "Channels",
+        )
+        for channel in attrs.get("omero", {}).get("channels", []):
+            ElementTree.SubElement(channels, "Channel", Name=channel.get("label", ""))
+
+        return meta
+
+    def is_mosaic(self) -> bool:
+        return False
+
+    def dims_shape(self) -> Dict[str, Tuple[int, int]]:
+        return {dim: (0, size) for dim, size in zip(self.dims[:-2], self.size[:-2])}
+
+    def get_tile_bounding_box(self, **read_dims) -> BBox:
+        return BBox(0, 0, self.size[-1], self.size[-2])
+
+    def read_image(self, **read_dims) -> Tuple[np.ndarray, List[Tuple[str, int]]]:
+        # Read the full range of every dimension not provided, keeping every
+        # dimension
+        selection = {
+            dim: (
+                slice(read_dims[dim], read_dims[dim] + 1)
+                if dim in read_dims
+                else slice(None)
+            )
+            for dim in self.dims
+        }
+        images = self._images[selection[Dimensions.Scene]]
+        data = np.stack(
+            [image[tuple(selection[dim] for dim in OME_ZARR_DIMS)] for image in images]
+        )[np.newaxis]
+
+        return data, list(zip(self.dims, data.shape))
+
+
+def _select(
+    data: da.core.Array, dims: str, dim: str, selection: Optional[Union[int, slice]]
+) -> da.core.Array:
+    # Keep the dimension when selecting a single index
+    if dim not in dims or selection is None:
+        return data
+    if isinstance(selection, int):
+        selection = slice(selection, selection + 1)
+
+    return data[(slice(None),) * dims.index(dim) + (selection,)]
+
+
+def _to_ome_zarr_dims(data: da.core.Array, dims: str) -> da.core.Array:
+    # Add any missing dimensions then reorder them
+    for dim in OME_ZARR_DIMS:
+        if dim not in dims:
+            data = data[..., np.newaxis]
+            dims += dim
+
+    return data.transpose([dims.index(dim) for dim in OME_ZARR_DIMS])
+
+
+def _get_physical_scale(img: Path) -> Optional[Dict[str, float]]:
+    # Physical pixel sizes are stored in meters
+    try:
+        sizes = czi_metadata.physical_pixel_sizes(get_czi_file(img))
+        return {dim: size * 1e6 for dim, size in sizes.items()}
+    except Exception as e:
+        log.warning(f"Physical pixel sizes unavailable for {img}: {e}")
+        return None
+
+
+def _get_channel_names(img: Path) -> Optional[List[str]]:
+    try:
+        return czi_metadata.channel_names(get_czi_file(img))
+    except Exception as e:
+        log.warning(f"Channel names unavailable for {img}: {e}")
+        return None
+
+
+def _get_multiscales(
+    name: str,
+    n_levels: int,
+    downscale: int,
+    scale_factor: int,
+    physical_scale: Optional[Dict[str, float]],
+) -> List[Dict[str, Any]]:
+    physical_scale = physical_scale or {}
+    datasets = []
+    for level in range(n_levels):
+        yx_scale = scale_factor * downscale**level
+        datasets.append(
+            {
+                "path": str(level),
+                "coordinateTransformations": [
+                    {
+                        "type": "scale",
+                        "scale": [
+                            1.0,
+                            1.0,
+                            physical_scale.get(Dimensions.SpatialZ, 1.0),
+                            physical_scale.get(Dimensions.SpatialY, 1.0) * yx_scale,
+                            physical_scale.get(Dimensions.SpatialX, 1.0) * yx_scale,
+                        ],
+                    }
+                ],
+            }
+        )
+
+    return [
+        {
+            "version": "0.4",
+            "name": name,
+            "axes": OME_ZARR_AXES,
+            "datasets": datasets,
+            "type": "mean",
+        }
+    ]
+
+
+def convert_to_zarr(
+    img: Union[str, Path],
+    save_path: Optional[Union[str, Path]] = None,
+    overwrite: bool = False,
+    chunks: Optional[Dict[str, int]] = None,
+    compressor: Optional[Union[str, Any]] = "zstd",
+    compression_level: int = 5,
+    scale_levels: int = 1,
+    downscale: int = 2,
+    S: Optional[Union[int, slice]] = None,
+    C: Optional[Union[int, slice]] = None,
+    B: int = 0,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    scale_factor: int = 1,
+) -> Path:
+    """
+    Convert a file to an OME-Zarr store, with a multiscale TCZYX image for every
+    scene.
+
+    Every chunk of every scale level is written from a single read of the file, in
+    parallel, using the active Dask scheduler. Preview movies can then be generated
+    from the store, rather than by reading the file again, with
+    generate_movies(save_path, reader=OmeZarrFile). Scenes are stored as the images "0",
+    "1", ... of the store, following the bioformats2raw layout, and each image's scale
+    levels are stored as the arrays "0", "1", ... of the image.
+
+    Parameters
+    ----------
+    img: Union[str, Path]
+        Path to a CZI file to read and convert.
+    save_path: Optional[Union[str, Path]]
+        A specific path to save the store to.
+        Default: A store in the current directory named after the provided file.
+    overwrite: bool
+        Should an existing store at the save path be overwritten.
+        Default: False
+    chunks: Optional[Dict[str, int]]
+        The size of each stored chunk along any of the T, C, Z, Y, and X dimensions, -1
+        for the full dimension.
+        Default: None (DEFAULT_ZARR_CHUNKS, a chunk for every YX plane)
+    compressor: Optional[Union[str, Any]]
+        The name of a Blosc compressor ("zstd", "lz4", "lz4hc", "blosclz", or "zlib"),
+        any numcodecs codec, or None for no compression.
+        Default: "zstd"
+    compression_level: int
+        The Blosc compression level, from 0 (none) to 9 (most).
+        Default: 5
+    scale_levels: int
+        The number of scale levels of each image, including the full resolution level.
+        Each level after the first averages blocks of `downscale` pixels along Y and X
+        of the previous level.
+        Default: 1 (only the full resolution level)
+    downscale: int
+        The number of pixels along Y and X of each level averaged into a single pixel
+        of the next level.
+        Default: 2
+    S: Optional[Union[int, slice]]
+        A specific integer or slice to use for selecting down the scenes to convert.
+        Default: None (convert all scenes)
+    C: Optional[Union[int, slice]]
+        A specific integer or slice to use for selecting down the channels to convert.
+        Default: None (convert all channels)
+    B: int
+        A specific integer to use for selecting the 'B' data to convert.
+        Default: 0
+    roi: Optional[Tuple[int, int, int, int]]
+        Only convert this region of interest of each YX plane, as (x, y, width,
+        height) in pixels from the top left of the plane.
+        Default: None (convert the full plane)
+    scale_factor: int
+        Downsample each YX plane by averaging blocks of this many pixels along Y and X
+        as it is read.
+        Default: 1 (no downsampling)
+
+    Returns
+    -------
+    save_path: Path
+        The path to the produced store.
+    """
+    zarr = import_zarr()
+
+    # Convert img to Path
+    img = Path(img).expanduser().resolve(strict=True)
+
+    # Check arguments before reading any data
+    codec = get_compressor(compressor, compression_level)
+    if scale_levels < 1:
+        raise ValueError(
+            f"The number of scale levels must be a positive integer. "
+            f"Received: {scale_levels}."
+        )
+    if downscale < 2:
+        raise ValueError(
+            f"The downscale factor must be an integer of at least 2. "
+            f"Received: {downscale}."
+        )
+    chunks = {**DEFAULT_ZARR_CHUNKS, **(chunks or {})}
+    invalid_chunk_dims = set(chunks) - set(OME_ZARR_DIMS)
+    if len(invalid_chunk_dims) > 0:
+        raise ValueError(
+            f"Chunks can only be provided for the dimensions: {OME_ZARR_DIMS}. "
+            f"Received chunks for: {invalid_chunk_dims}."
+        )
+
+    # Determine save path
+    if save_path is None:
+        save_path = Path(f"{img.with_suffix('').name}.zarr")
+    save_path = Path(save_path).expanduser().resolve()
+    if save_path.exists():
+        if not overwrite:
+            raise FileExistsError(
+                f"The save path provided already points to an existing resource and "
+                f"overwrite was not specified. "
+                f"Provided: {save_path}"
+            )
+        shutil.rmtree(save_path)
+
+    # Read the file a plane at a time
+    data, dims = daread(img, roi=roi, scale_factor=scale_factor)
+
+    # Select the 'B' data, scenes, and channels
+    if Dimensions.B in dims:
+        data = data[(slice(None),) * dims.index(Dimensions.B) + (B,)]
+        dims = dims.replace(Dimensions.B, "")
+    data = _select(data, dims, Dimensions.Scene, S)
+    data = _select(data, dims, Dimensions.Channel, C)
+
+    # Every other dimension must be stored as an OME-Zarr dimension
+    unsupported_dims = set(dims) - set(OME_ZARR_DIMS) - {Dimensions.Scene}
+    if len(unsupported_dims) > 0:
+        raise ValueError(
+            f"OME-Zarr images only store the dimensions: {OME_ZARR_DIMS}. "
+            f"The file has the unsupported dimensions: {unsupported_dims}."
+        )
+
+    # Split out every scene
+    if Dimensions.Scene in dims:
+        axis = dims.index(Dimensions.Scene)
+        scenes = [data[(slice(None),) * axis + (i,)] for i in range(data.shape[axis])]
+        dims = dims.replace(Dimensions.Scene, "")
+    else:
+        scenes = [data]
+
+    # Check every scale level has at least one pixel
+    yx_shape = scenes[0].shape[-2:]
+    if min(yx_shape) // downscale ** (scale_levels - 1) < 1:
+        raise ValueError(
+            f"Too many scale levels requested. Downscaling planes of {yx_shape} "
+            f"pixels {scale_levels - 1} times by {downscale} leaves no pixels."
+        )
+
+    # Create the store
+    root = zarr.open_group(str(save_path), mode="w")
+    root.attrs["bioformats2raw.layout"] = 3
+    physical_scale = _get_physical_scale(img)
+    channel_names = _get_channel_names(img)
+    if channel_names is not None and C is not None:
+        channel_names = _select(np.array(channel_names), "C", "C", C).tolist()
+
+    # Build every scale level of every scene from the same read of the data
+    writes = []
+    for i, scene in enumerate(scenes):
+        scene = _to_ome_zarr_dims(scene, dims)
+        scene_chunks = tuple(chunks[dim] for dim in OME_ZARR_DIMS)
+
+        level = scene
+        for level_index in range(scale_levels):
+            if level_index > 0:
+                level = downsample_frame(level, downscale, "mean")
+            writes.append(
+                da.to_zarr(
+                    level.rechunk(scene_chunks),
+                    str(save_path),
+                    component=f"{i}/{level_index}",
+                    compressor=codec,
+                    overwrite=True,
+                    compute=False,
+                )
+            )
+
+        # Describe the image
+        image = root.require_group(str(i))
+        image.attrs["multiscales"] = _get_multiscales(
+            name=f"{img.with_suffix('').name} scene {i}",
+            n_levels=scale_levels,
+            downscale=downscale,
+            scale_factor=scale_factor,
+            physical_scale=physical_scale,
+        )
+        if channel_names is not None and len(channel_names) == scene.shape[1]:
+            image.attrs["omero"] = {
+                "channels": [{"label": name} for name in channel_names]
+            }
+
+    # Write every chunk
+    dask.compute(*writes)
+    log.info(f"Converted {img} to {save_path}")
+
+    return save_path